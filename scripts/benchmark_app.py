@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+"""
+Catalyst Center Templates Web Application Benchmarks
+Drives the Flask application in-process through its WSGI test client and
+records per-endpoint timings as JSON, so runs can be compared between commits.
+"""
+
+import os
+import sys
+import json
+import logging
+import argparse
+import platform
+import statistics
+import subprocess
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Any
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+sys.path.insert(0, str(REPO_ROOT / 'scripts'))
+
+import app as webapp  # noqa: E402
+from generate_corpus import generate_corpus  # noqa: E402
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+# Keep the application's per-file logging out of the timings
+logging.getLogger('app').setLevel(logging.ERROR)
+
+DEFAULT_SIZES = [1000, 10000, 50000]
+BULK_DOWNLOAD_SIZE = 50
+
+
+def pick_targets(template_dirs: Dict[str, str]) -> Dict[str, Any]:
+    """
+    Pick the templates the per-template endpoints are exercised with.
+
+    Args:
+        template_dirs: Category name -> directory mapping of the corpus
+
+    Returns:
+        Render target and parameters, preview target and bulk download ids
+    """
+    render_target = None
+    preview_target = None
+    bulk_ids = []
+    for category, directory in template_dirs.items():
+        for path in sorted(Path(directory).iterdir()):
+            if path.suffix not in ('.yaml', '.json'):
+                continue
+            if render_target is None and path.suffix == '.yaml':
+                render_target = (category, path.stem)
+            if preview_target is None and path.suffix == '.json':
+                preview_target = (category, path.stem)
+            if len(bulk_ids) < BULK_DOWNLOAD_SIZE:
+                bulk_ids.append(f"{category}:{path.stem}")
+
+    # Render with the template's own parameter defaults
+    render_category, render_name = render_target
+    template = webapp.load_template(Path(template_dirs[render_category]) / f"{render_name}.yaml")
+    render_parameters = {param['name']: param.get('default')
+                         for param in template.get('parameters') or []}
+
+    return {
+        'render': render_target,
+        'render_parameters': render_parameters,
+        'preview': preview_target or render_target,
+        'bulk': bulk_ids
+    }
+
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    """Summarize a list of timings, in milliseconds."""
+    ordered = sorted(samples)
+    p95_index = max(0, int(round(0.95 * len(ordered))) - 1)
+    return {
+        'min_ms': round(ordered[0], 3),
+        'max_ms': round(ordered[-1], 3),
+        'mean_ms': round(statistics.mean(ordered), 3),
+        'median_ms': round(statistics.median(ordered), 3),
+        'p95_ms': round(ordered[p95_index], 3),
+        'stdev_ms': round(statistics.stdev(ordered), 3) if len(ordered) > 1 else 0.0,
+        'iterations': len(ordered)
+    }
+
+
+def run_endpoint(client, name: str, request_args: Dict[str, Any],
+                 iterations: int, warmup: int) -> Dict[str, Any]:
+    """
+    Time one endpoint.
+
+    Args:
+        client: Flask test client
+        name: Endpoint name used in the report
+        request_args: Keyword arguments for client.open()
+        iterations: Number of timed requests
+        warmup: Number of untimed requests sent first
+
+    Returns:
+        Timing summary for the endpoint
+    """
+    for _ in range(warmup):
+        client.open(**request_args)
+
+    samples = []
+    status_code = None
+    response_bytes = 0
+    for _ in range(iterations):
+        start = time.perf_counter()
+        response = client.open(**request_args)
+        response_bytes = len(response.get_data())
+        samples.append((time.perf_counter() - start) * 1000)
+        status_code = response.status_code
+
+    result = summarize(samples)
+    result.update({'status_code': status_code, 'response_bytes': response_bytes})
+    logger.info(f"  {name}: median {result['median_ms']} ms, p95 {result['p95_ms']} ms "
+                f"(HTTP {status_code})")
+    return result
+
+
+def benchmark_corpus(label: str, template_dirs: Dict[str, str],
+                     iterations: int, warmup: int) -> Dict[str, Any]:
+    """
+    Run every endpoint benchmark against one corpus.
+
+    Args:
+        label: Corpus label used in the report
+        template_dirs: Category name -> directory mapping of the corpus
+        iterations: Number of timed requests per endpoint
+        warmup: Number of untimed requests per endpoint
+
+    Returns:
+        Corpus report with per-endpoint results
+    """
+    saved_dirs = dict(webapp.TEMPLATE_DIRS)
+    webapp.TEMPLATE_DIRS.clear()
+    webapp.TEMPLATE_DIRS.update(template_dirs)
+    try:
+        template_count = sum(
+            1 for directory in template_dirs.values() if Path(directory).exists()
+            for path in Path(directory).iterdir() if path.suffix in ('.yaml', '.json')
+        )
+        targets = pick_targets(template_dirs)
+        logger.info(f"Corpus '{label}': {template_count} templates")
+
+        client = webapp.app.test_client()
+        with client.session_transaction() as session:
+            session['authenticated'] = True
+
+        render_category, render_name = targets['render']
+        preview_category, preview_name = targets['preview']
+        endpoints = {
+            'index': {'path': '/'},
+            'search_templates': {'path': '/search', 'query_string': {'q': 'switch'}},
+            'api_templates': {'path': '/api/templates'},
+            'render_template_endpoint': {
+                'path': '/render',
+                'method': 'POST',
+                'json': {
+                    'template_name': render_name,
+                    'category': render_category,
+                    'parameters': targets['render_parameters']
+                }
+            },
+            'preview_template': {'path': f'/preview/{preview_category}/{preview_name}'},
+            'bulk_download': {
+                'path': '/bulk-download',
+                'method': 'POST',
+                'json': {'templates': targets['bulk']}
+            }
+        }
+
+        results = {}
+        for name, request_args in endpoints.items():
+            results[name] = run_endpoint(client, name, request_args, iterations, warmup)
+    finally:
+        webapp.TEMPLATE_DIRS.clear()
+        webapp.TEMPLATE_DIRS.update(saved_dirs)
+
+    return {'corpus': label, 'template_count': template_count, 'endpoints': results}
+
+
+def git_revision() -> Optional[str]:
+    """Return the current git commit, if the repository is available."""
+    try:
+        return subprocess.check_output(['git', 'rev-parse', 'HEAD'], cwd=REPO_ROOT,
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare_reports(baseline: Dict[str, Any], current: Dict[str, Any],
+                    threshold: float) -> List[str]:
+    """
+    Compare two benchmark reports by median time.
+
+    Args:
+        baseline: Previously saved report
+        current: Report of this run
+        threshold: Relative slowdown that counts as a regression, e.g. 0.10
+
+    Returns:
+        Human readable regression lines, empty when nothing regressed
+    """
+    regressions = []
+    baseline_runs = {run['corpus']: run for run in baseline.get('runs', [])}
+    for run in current['runs']:
+        previous = baseline_runs.get(run['corpus'])
+        if not previous:
+            continue
+        for name, result in run['endpoints'].items():
+            before = previous['endpoints'].get(name)
+            if not before or not before['median_ms']:
+                continue
+            ratio = result['median_ms'] / before['median_ms']
+            if ratio > 1 + threshold:
+                regressions.append(f"{run['corpus']}/{name}: {before['median_ms']} ms -> "
+                                   f"{result['median_ms']} ms ({ratio:.2f}x)")
+    return regressions
+
+
+def main():
+    """Run the web application benchmarks."""
+    parser = argparse.ArgumentParser(description='Benchmark the Catalyst Center Templates web application')
+    parser.add_argument('--sizes', type=int, nargs='*', default=DEFAULT_SIZES,
+                        help='Synthetic corpus sizes to benchmark (default: 1000 10000 50000)')
+    parser.add_argument('--skip-real', action='store_true', help='Skip the real templates/ corpus')
+    parser.add_argument('--seed', type=int, default=0, help='Seed for the synthetic corpus generator')
+    parser.add_argument('--iterations', type=int, default=5, help='Timed requests per endpoint')
+    parser.add_argument('--warmup', type=int, default=1, help='Untimed requests per endpoint')
+    parser.add_argument('--output', default='output/benchmark_app.json', help='JSON report path')
+    parser.add_argument('--compare', help='Baseline JSON report to compare against')
+    parser.add_argument('--threshold', type=float, default=0.10,
+                        help='Relative median slowdown reported as a regression')
+    args = parser.parse_args()
+
+    os.chdir(REPO_ROOT)
+    report = {
+        'benchmark': 'app',
+        'timestamp': datetime.now().isoformat(),
+        'git_revision': git_revision(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'iterations': args.iterations,
+        'runs': []
+    }
+
+    if not args.skip_real:
+        real_dirs = {category: str(REPO_ROOT / directory)
+                     for category, directory in webapp.TEMPLATE_DIRS.items()}
+        report['runs'].append(benchmark_corpus('real', real_dirs, args.iterations, args.warmup))
+
+    for size in args.sizes:
+        with tempfile.TemporaryDirectory(prefix=f'corpus-{size}-') as tmp_dir:
+            template_dirs = generate_corpus(Path(tmp_dir), size, seed=args.seed)
+            report['runs'].append(benchmark_corpus(f'synthetic-{size}', template_dirs,
+                                                   args.iterations, args.warmup))
+
+    output_path = Path(args.output)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(output_path, 'w') as f:
+        json.dump(report, f, indent=2)
+    logger.info(f"Saved benchmark report to {output_path}")
+
+    if args.compare:
+        with open(args.compare, 'r') as f:
+            baseline = json.load(f)
+        regressions = compare_reports(baseline, report, args.threshold)
+        if regressions:
+            logger.warning('Regressions against baseline:')
+            for line in regressions:
+                logger.warning(f"  {line}")
+            return 1
+        logger.info('No regressions against baseline')
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Catalyst Center Inventory Benchmarks
+Times device inventory collection strategies against the local mock controller
+and records wall time and request counts as JSON.
+"""
+
+import os
+import sys
+import json
+import time
+import logging
+import asyncio
+import argparse
+import platform
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Callable, Any
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT / 'scripts'))
+
+from benchmark_app import git_revision  # noqa: E402
+from mock_catalyst_center import MockCatalystCenter  # noqa: E402
+from catalyst_center_session import CatalystCenterSession, TOKEN_PATH  # noqa: E402
+from catalyst_center_inventory import (DEVICE_DETAIL_PATH, DEVICE_PATH, get_sites,  # noqa: E402
+                                       inventory_record, iter_device_pages, iter_devices)
+from catalyst_center_async import AsyncCatalystCenterSession, collect_inventory_async  # noqa: E402
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+logging.getLogger('catalyst_center_inventory').setLevel(logging.WARNING)
+
+
+def sequential(controller: MockCatalystCenter, args) -> int:
+    """The original loop: one page after another, nothing fetched ahead."""
+    count = 0
+    for page in sync_session(controller).iter_pages(DEVICE_PATH, prefetch=False):
+        time.sleep(args.process_ms / 1000)
+        count += len(page)
+    return count
+
+
+def prefetch(controller: MockCatalystCenter, args) -> int:
+    """Streamed pages with the next page fetched while the current one is processed."""
+    count = 0
+    for page in iter_device_pages(sync_session(controller)):
+        time.sleep(args.process_ms / 1000)
+        count += len(page)
+    return count
+
+
+def parallel(controller: MockCatalystCenter, args) -> int:
+    """All pages fanned out to a worker pool using the device count."""
+    count = 0
+    for page in iter_device_pages(sync_session(controller), workers=args.workers):
+        time.sleep(args.process_ms / 1000)
+        count += len(page)
+    return count
+
+
+def detail_sync(controller: MockCatalystCenter, args) -> int:
+    """Per-device device detail lookups, one at a time."""
+    session = sync_session(controller)
+    sites_by_name = {site['siteNameHierarchy']: site for site in get_sites(session)}
+    records = []
+    for device in iter_devices(session):
+        response = session.get(DEVICE_DETAIL_PATH, {'identifier': 'uuid', 'searchBy': device['id']})
+        records.append(inventory_record(device, sites_by_name.get(response['response']['location'])))
+    return len(records)
+
+
+def detail_async(controller: MockCatalystCenter, args) -> int:
+    """Per-device device detail lookups on the asyncio collector."""
+    async def collect():
+        async with AsyncCatalystCenterSession(controller.base_url, controller.username, controller.password,
+                                              concurrency=args.concurrency,
+                                              connections_per_host=args.connections,
+                                              rate_limit=args.client_rate_limit) as session:
+            device_inventory, ap_inventory = await collect_inventory_async(session, device_detail=True)
+        return len(device_inventory) + len(ap_inventory)
+    return asyncio.run(collect())
+
+
+STRATEGIES: Dict[str, Callable[[MockCatalystCenter, Any], int]] = {
+    'sequential': sequential,
+    'prefetch': prefetch,
+    'parallel': parallel,
+    'detail_sync': detail_sync,
+    'detail_async': detail_async,
+}
+# Strategies making one call per device, run against the smaller --detail-devices fleet
+DETAIL_STRATEGIES = ('detail_sync', 'detail_async')
+
+
+def sync_session(controller: MockCatalystCenter) -> CatalystCenterSession:
+    """Return a new session on the mock controller."""
+    return CatalystCenterSession(controller.base_url, controller.username, controller.password)
+
+
+def run_strategy(controller: MockCatalystCenter, name: str, args) -> Dict[str, Any]:
+    """
+    Time one collection strategy on a fresh session.
+
+    Args:
+        controller: Running mock controller
+        name: Strategy name
+        args: Parsed command line arguments
+
+    Returns:
+        Wall time, device count and controller request counts
+    """
+    with controller.lock:
+        controller.stats.clear()
+
+    start = time.perf_counter()
+    devices = STRATEGIES[name](controller, args)
+    wall_time = time.perf_counter() - start
+
+    with controller.lock:
+        requests_made = sum(count for key, count in controller.stats.items()
+                            if key not in ('401', '429', f'POST {TOKEN_PATH}'))
+        throttled = controller.stats['429']
+    logger.info(f"  {name}: {wall_time:.3f} s, {devices} devices, {requests_made} requests, {throttled} x 429")
+    return {'wall_time_s': round(wall_time, 4), 'devices': devices,
+            'requests': requests_made, 'throttled': throttled}
+
+
+def main():
+    """Run the inventory benchmarks."""
+    parser = argparse.ArgumentParser(description='Benchmark inventory collection against the mock controller')
+    parser.add_argument('--devices', type=int, default=10000, help='Mock fleet size')
+    parser.add_argument('--latency', type=float, default=0.05, help='Mock response latency, seconds')
+    parser.add_argument('--rate-limit', type=float, default=0.0, help='Mock requests per second before HTTP 429')
+    parser.add_argument('--burst', type=int, default=0, help='Mock rate limiter bucket size')
+    parser.add_argument('--workers', type=int, default=8, help='Workers for the parallel strategies')
+    parser.add_argument('--detail-devices', type=int, default=300,
+                        help='Mock fleet size for the per-device detail strategies')
+    parser.add_argument('--concurrency', type=int, default=32, help='Requests in flight for the async collector')
+    parser.add_argument('--connections', type=int, default=16, help='Connections per host for the async collector')
+    parser.add_argument('--client-rate-limit', type=float, default=0.0,
+                        help='Client-side token bucket rate for the async collector, requests per second')
+    parser.add_argument('--process-ms', type=float, default=20.0, help='Simulated processing time per page')
+    parser.add_argument('--strategies', nargs='*', default=list(STRATEGIES), choices=list(STRATEGIES),
+                        help='Strategies to run')
+    parser.add_argument('--output', default='output/benchmark_inventory.json', help='JSON report path')
+    args = parser.parse_args()
+
+    os.chdir(REPO_ROOT)
+    report = {
+        'benchmark': 'inventory',
+        'timestamp': datetime.now().isoformat(),
+        'git_revision': git_revision(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'settings': {'devices': args.devices, 'latency_s': args.latency, 'rate_limit': args.rate_limit,
+                     'burst': args.burst, 'workers': args.workers, 'process_ms': args.process_ms,
+                     'detail_devices': args.detail_devices, 'concurrency': args.concurrency,
+                     'connections': args.connections, 'client_rate_limit': args.client_rate_limit},
+        'strategies': {}
+    }
+
+    fleets = {args.devices: [name for name in args.strategies if name not in DETAIL_STRATEGIES],
+              args.detail_devices: [name for name in args.strategies if name in DETAIL_STRATEGIES]}
+    for devices, names in fleets.items():
+        if not names:
+            continue
+        with MockCatalystCenter(devices=devices, latency=args.latency, rate_limit=args.rate_limit,
+                                burst=args.burst) as controller:
+            for name in names:
+                report['strategies'][name] = run_strategy(controller, name, args)
+
+    output_path = Path(args.output)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(output_path, 'w') as f:
+        json.dump(report, f, indent=2)
+    logger.info(f"Saved benchmark report to {output_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Inventory Store Benchmarks
+Compares writing and querying device inventories as YAML (as device_inventory.py
+writes them), JSON and the SQLite inventory store, at several fleet sizes.
+"""
+
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+import platform
+import tempfile
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Any
+
+import yaml
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT / 'scripts'))
+
+from benchmark_app import git_revision  # noqa: E402
+from mock_catalyst_center import MockCatalystCenter  # noqa: E402
+from catalyst_center_inventory import inventory_record  # noqa: E402
+from inventory_store import count_by, write_inventory  # noqa: E402
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+logging.getLogger('mock_catalyst_center').setLevel(logging.WARNING)
+
+DEFAULT_SIZES = [1000, 10000]
+
+
+def build_inventory(size: int, seed: int) -> List[Dict[str, Any]]:
+    """Build {size} inventory records from a generated mock fleet."""
+    controller = MockCatalystCenter(devices=size, sites=max(1, size // 200), seed=seed)
+    return [inventory_record(device, controller.sites[controller.device_site[device['id']]])
+            for device in controller.devices]
+
+
+def timed(function, *args) -> float:
+    """Return the wall time of one call, in milliseconds."""
+    start = time.perf_counter()
+    function(*args)
+    return round((time.perf_counter() - start) * 1000, 3)
+
+
+def write_yaml(path: str, records: List[Dict[str, Any]]):
+    with open(path, 'w') as f:
+        f.write('device_inventory:\n' + yaml.dump(records, sort_keys=False))
+
+
+def query_yaml(path: str) -> Counter:
+    with open(path, 'r') as f:
+        records = yaml.safe_load(f)['device_inventory']
+    return Counter((record['version'], record['site']) for record in records)
+
+
+def write_json(path: str, records: List[Dict[str, Any]]):
+    with open(path, 'w') as f:
+        f.write(json.dumps(records))
+
+
+def query_json(path: str) -> Counter:
+    with open(path, 'r') as f:
+        records = json.load(f)
+    return Counter((record['version'], record['site']) for record in records)
+
+
+def benchmark_size(size: int, seed: int, tmp_dir: str) -> Dict[str, Any]:
+    """
+    Time writes and the "devices per version per site" query for one fleet size.
+
+    Args:
+        size: Number of inventory records
+        seed: Fleet generator seed
+        tmp_dir: Directory for the output files
+
+    Returns:
+        Per-format write and query times, in milliseconds
+    """
+    records = build_inventory(size, seed)
+    paths = {name: os.path.join(tmp_dir, f'inventory-{size}.{name}') for name in ('yaml', 'json', 'db')}
+    result = {
+        'yaml': {'write_ms': timed(write_yaml, paths['yaml'], records),
+                 'query_ms': timed(query_yaml, paths['yaml'])},
+        'json': {'write_ms': timed(write_json, paths['json'], records),
+                 'query_ms': timed(query_json, paths['json'])},
+        'sqlite': {'write_ms': timed(write_inventory, paths['db'], records, []),
+                   'query_ms': timed(count_by, paths['db'], ['version', 'site'])}
+    }
+    for name, path in zip(('yaml', 'json', 'sqlite'), paths.values()):
+        result[name]['bytes'] = os.path.getsize(path)
+        logger.info(f"  {size} records, {name}: write {result[name]['write_ms']} ms, "
+                    f"query {result[name]['query_ms']} ms, {result[name]['bytes']} bytes")
+    return {'records': size, 'formats': result}
+
+
+def main():
+    """Run the inventory store benchmarks."""
+    parser = argparse.ArgumentParser(description='Benchmark YAML/JSON inventories against the SQLite store')
+    parser.add_argument('--sizes', type=int, nargs='*', default=DEFAULT_SIZES,
+                        help='Inventory sizes to benchmark (default: 1000 10000)')
+    parser.add_argument('--seed', type=int, default=0, help='Seed for the generated fleet')
+    parser.add_argument('--output', default='output/benchmark_inventory_store.json', help='JSON report path')
+    args = parser.parse_args()
+
+    os.chdir(REPO_ROOT)
+    report = {
+        'benchmark': 'inventory_store',
+        'timestamp': datetime.now().isoformat(),
+        'git_revision': git_revision(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'runs': []
+    }
+    with tempfile.TemporaryDirectory(prefix='inventory-store-') as tmp_dir:
+        for size in args.sizes:
+            report['runs'].append(benchmark_size(size, args.seed, tmp_dir))
+
+    output_path = Path(args.output)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(output_path, 'w') as f:
+        json.dump(report, f, indent=2)
+    logger.info(f"Saved benchmark report to {output_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+"""
+Catalyst Center Async Inventory
+asyncio variant of the inventory collection pipeline, for controllers where
+per-device calls cannot be avoided: concurrency bounded by a semaphore, a
+per-host connection limit and a token-bucket rate limiter.
+"""
+
+import time
+import asyncio
+import logging
+from collections import deque
+from itertools import islice
+from typing import Dict, List, Optional, Tuple, Any
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+try:
+    from .catalyst_center_session import (CatalystCenterError, DEFAULT_TOKEN_LIFETIME, MAX_PAGE_SIZE,
+                                          REFRESH_MARGIN, TOKEN_PATH, retry_after, token_expiry)
+    from .catalyst_center_inventory import (DEVICE_COUNT_PATH, DEVICE_DETAIL_PATH, DEVICE_PATH,
+                                            MEMBERSHIP_PATH, SITE_PATH, inventory_record)
+except ImportError:
+    from catalyst_center_session import (CatalystCenterError, DEFAULT_TOKEN_LIFETIME, MAX_PAGE_SIZE,
+                                         REFRESH_MARGIN, TOKEN_PATH, retry_after, token_expiry)
+    from catalyst_center_inventory import (DEVICE_COUNT_PATH, DEVICE_DETAIL_PATH, DEVICE_PATH,
+                                           MEMBERSHIP_PATH, SITE_PATH, inventory_record)
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """Token-bucket rate limiter: {rate} requests per second, bursts of up to {capacity}."""
+
+    def __init__(self, rate: float, capacity: Optional[int] = None):
+        self.rate = rate
+        self.capacity = capacity or max(1, int(rate))
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    async def acquire(self):
+        """Wait until a token is available and take it."""
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class AsyncCatalystCenterSession:
+    """httpx-based async counterpart of CatalystCenterSession."""
+
+    def __init__(self, base_url: str, username: str, password: str, verify: bool = True,
+                 concurrency: int = 32, connections_per_host: int = 16, rate_limit: float = 0.0,
+                 burst: Optional[int] = None, timeout: float = 30, max_retries: int = 8):
+        """
+        Initialize the session.
+
+        Args:
+            base_url: Controller URL, e.g. https://10.1.1.1
+            username: Username for authentication
+            password: Password for authentication
+            verify: Whether to verify SSL certificates
+            concurrency: Requests in flight at once (semaphore)
+            connections_per_host: Connection pool size towards the controller
+            rate_limit: Requests per second (0 disables the token bucket)
+            burst: Token bucket size (default: one second of requests)
+            timeout: Per-request timeout, in seconds
+            max_retries: Retries of a request rejected with HTTP 429
+        """
+        if httpx is None:
+            raise ImportError("Please install httpx: pip install httpx")
+        self.base_url = base_url.rstrip('/')
+        self.username = username
+        self.password = password
+        self.max_retries = max_retries
+        self.client = httpx.AsyncClient(
+            verify=verify, timeout=timeout,
+            limits=httpx.Limits(max_connections=connections_per_host,
+                                max_keepalive_connections=connections_per_host)
+        )
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.bucket = TokenBucket(rate_limit, burst) if rate_limit else None
+        self.token_lock = asyncio.Lock()
+        self.token = None
+        self.token_expires = 0.0
+        self.logins = 0
+
+    async def login(self) -> str:
+        """Request a new token from the controller; callers must hold the token lock."""
+        response = await self.client.post(self.base_url + TOKEN_PATH, auth=(self.username, self.password),
+                                          headers={'content-type': 'application/json'})
+        if response.status_code != 200:
+            raise CatalystCenterError(f"Authentication failed: HTTP {response.status_code}",
+                                      response.status_code, response)
+        self.token = response.json()['Token']
+        self.token_expires = token_expiry(self.token) or time.time() + DEFAULT_TOKEN_LIFETIME
+        self.logins += 1
+        return self.token
+
+    async def get_token(self) -> str:
+        """Return the cached token, logging in when there is none or it is about to expire."""
+        async with self.token_lock:
+            if self.token is None or time.time() >= self.token_expires - REFRESH_MARGIN:
+                await self.login()
+            return self.token
+
+    async def refresh_token(self, stale_token: str) -> str:
+        """Replace a rejected token; only the first caller holding {stale_token} logs in again."""
+        async with self.token_lock:
+            if self.token == stale_token:
+                await self.login()
+            return self.token
+
+    async def get(self, path: str, params: Optional[Dict[str, Any]] = None) -> Any:
+        """
+        GET {path} and return the decoded JSON body.
+
+        Retries once with a fresh token on HTTP 401 and after Retry-After on HTTP 429.
+
+        Raises:
+            CatalystCenterError: If the controller returns an error status
+        """
+        token = await self.get_token()
+        refreshed = False
+        attempt = 0
+        async with self.semaphore:
+            while True:
+                if self.bucket:
+                    await self.bucket.acquire()
+                response = await self.client.get(self.base_url + path, params=params,
+                                                 headers={'content-type': 'application/json',
+                                                          'x-auth-token': token})
+                if response.status_code == 429 and attempt < self.max_retries:
+                    attempt += 1
+                    await asyncio.sleep(retry_after(response) or 0.05 * 2 ** attempt)
+                    continue
+                if response.status_code == 401 and not refreshed:
+                    refreshed = True
+                    token = await self.refresh_token(token)
+                    continue
+                break
+        if response.status_code >= 400:
+            raise CatalystCenterError(f"GET {path} failed: HTTP {response.status_code} "
+                                      f"{response.text[:200]}", response.status_code, response)
+        return response.json()
+
+    async def get_all(self, path: str, page_size: int = MAX_PAGE_SIZE) -> List[Any]:
+        """Fetch an offset/limit API page after page until a short page, for when no count is available."""
+        items = []
+        offset = 1
+        while True:
+            page = (await self.get(path, {'offset': offset, 'limit': page_size}))['response']
+            items.extend(page)
+            if len(page) < page_size:
+                return items
+            offset += page_size
+
+    async def get_pages(self, path: str, total: int, page_size: int = MAX_PAGE_SIZE,
+                        window: int = 16) -> List[Any]:
+        """
+        Fetch the pages of an offset/limit API concurrently and return the items in order.
+
+        Offsets come from {total}, at most {window} pages are in flight or waiting
+        to be read at a time; items added after {total} was read are picked up
+        page by page until a short page, as CatalystCenterSession.fetch_pages() does.
+        """
+        async def fetch(offset):
+            return (await self.get(path, {'offset': offset, 'limit': page_size}))['response']
+
+        items = []
+        offsets = iter(range(1, total + 1, page_size))
+        pending = deque((offset, asyncio.ensure_future(fetch(offset))) for offset in islice(offsets, window))
+        last_offset, last_size = 1 - page_size, page_size
+        try:
+            while pending:
+                last_offset, task = pending.popleft()
+                page = await task
+                last_size = len(page)
+                items.extend(page)
+                offset = next(offsets, None)
+                if offset is not None:
+                    pending.append((offset, asyncio.ensure_future(fetch(offset))))
+        finally:
+            for _, task in pending:
+                task.cancel()
+
+        # The inventory grew while it was being read
+        offset = last_offset + page_size
+        while last_size == page_size:
+            page = await fetch(offset)
+            last_size = len(page)
+            offset += page_size
+            items.extend(page)
+        return items
+
+    async def close(self):
+        """Close the connection pool."""
+        await self.client.aclose()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+
+async def collect_inventory_async(session: AsyncCatalystCenterSession, device_detail: bool = False
+                                  ) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """
+    Collect the device and access point inventories with their sites.
+
+    Same result as catalyst_center_inventory.collect_inventory(): the site hierarchy
+    and device pages are fetched once, memberships per site, all concurrently.
+
+    Args:
+        session: Async controller session
+        device_detail: Look up every device's site with a device detail call, for
+            controllers without the membership API; otherwise only devices missing
+            from every membership get one
+
+    Returns:
+        (device inventory, access point inventory)
+    """
+    count_response, sites = await asyncio.gather(session.get(DEVICE_COUNT_PATH), session.get_all(SITE_PATH))
+    sites_by_name = {site['siteNameHierarchy']: site for site in sites}
+    devices = await session.get_pages(DEVICE_PATH, count_response['response'])
+
+    device_sites = {}
+    if not device_detail:
+        memberships = await asyncio.gather(*(session.get(MEMBERSHIP_PATH.format(site['id'])) for site in sites))
+        for site, response in zip(sites, memberships):
+            for group in response.get('device') or []:
+                for device in group.get('response') or []:
+                    device_sites[device.get('instanceUuid') or device['id']] = site
+
+    async def locate(device):
+        site = device_sites.get(device['id'])
+        if site is None:
+            response = await session.get(DEVICE_DETAIL_PATH, {'identifier': 'uuid', 'searchBy': device['id']})
+            site = sites_by_name.get(response['response'].get('location'))
+        return inventory_record(device, site)
+
+    records = await asyncio.gather(*(locate(device) for device in devices))
+    device_inventory = [record for device, record in zip(devices, records) if device['family'] != 'Unified AP']
+    ap_inventory = [record for device, record in zip(devices, records) if device['family'] == 'Unified AP']
+    logger.info(f"Collected {len(device_inventory)} devices and {len(ap_inventory)} access points")
+    return device_inventory, ap_inventory
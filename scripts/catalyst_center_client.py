@@ -7,16 +7,20 @@ A Python client for interacting with Cisco Catalyst Center (DNA Center) APIs.
 import os
 import json
 import logging
-from typing import Dict, List, Optional, Any
+from typing import Dict, Iterator, List, Optional, Any
 from urllib3.exceptions import InsecureRequestWarning
 import urllib3
 
 try:
-    from dnacentersdk import DNACenterAPI
-    from dnacentersdk.exceptions import ApiError
+    from .catalyst_center_session import CatalystCenterSession, CatalystCenterError
+    from .catalyst_center_inventory import iter_devices
+    from .catalyst_center_tasks import DEFAULT_TIMEOUT, task_id_of, wait_for_task
+    from .catalyst_center_templates import DEPLOY_PATH, device_statuses
 except ImportError:
-    print("Please install dnacentersdk: pip install dnacentersdk")
-    exit(1)
+    from catalyst_center_session import CatalystCenterSession, CatalystCenterError
+    from catalyst_center_inventory import iter_devices
+    from catalyst_center_tasks import DEFAULT_TIMEOUT, task_id_of, wait_for_task
+    from catalyst_center_templates import DEPLOY_PATH, device_statuses
 
 # Suppress SSL warnings if needed
 urllib3.disable_warnings(InsecureRequestWarning)
@@ -33,7 +37,8 @@ class CatalystCenterClient:
     """Client for interacting with Catalyst Center APIs."""
     
     def __init__(self, host: str, username: str, password: str, 
-                 port: int = 443, verify_ssl: bool = True):
+                 port: int = 443, verify_ssl: bool = True, scheme: str = 'https',
+                 pool_size: int = 20):
         """
         Initialize the Catalyst Center client.
         
@@ -43,6 +48,8 @@ class CatalystCenterClient:
             password: Password for authentication
             port: Port number (default: 443)
             verify_ssl: Whether to verify SSL certificates
+            scheme: URL scheme (default: https)
+            pool_size: Maximum number of pooled keep-alive connections
         """
         self.host = host
         self.username = username
@@ -50,78 +57,117 @@ class CatalystCenterClient:
         self.port = port
         self.verify_ssl = verify_ssl
         
-        # Initialize the API client
-        self.api = DNACenterAPI(
-            base_url=f"https://{host}:{port}",
+        # One pooled session with a cached token serves every call
+        self.session = CatalystCenterSession(
+            base_url=f"{scheme}://{host}:{port}",
             username=username,
             password=password,
-            verify=verify_ssl
+            verify=verify_ssl,
+            pool_size=pool_size
         )
         
         logger.info(f"Connected to Catalyst Center at {host}:{port}")
     
-    def get_devices(self) -> List[Dict[str, Any]]:
+    def iter_devices(self, workers: int = 1) -> Iterator[Dict[str, Any]]:
+        """
+        Iterate over all devices, fetching the device list page by page.
+        
+        Args:
+            workers: 1 prefetches the next page while the current one is consumed;
+                more fetches all pages concurrently (still yielded in order)
+        """
+        return iter_devices(self.session, workers=workers)
+    
+    def get_devices(self, workers: int = 1) -> List[Dict[str, Any]]:
         """Get all devices from Catalyst Center."""
         try:
-            devices = self.api.devices.get_device_list()
-            logger.info(f"Retrieved {len(devices.response)} devices")
-            return devices.response
-        except ApiError as e:
+            devices = list(self.iter_devices(workers=workers))
+            logger.info(f"Retrieved {len(devices)} devices")
+            return devices
+        except CatalystCenterError as e:
             logger.error(f"Error retrieving devices: {e}")
             return []
     
     def get_sites(self) -> List[Dict[str, Any]]:
         """Get all sites from Catalyst Center."""
         try:
-            sites = self.api.sites.get_sites()
-            logger.info(f"Retrieved {len(sites.response)} sites")
-            return sites.response
-        except ApiError as e:
+            sites = self.session.get('/dna/intent/api/v1/site')['response']
+            logger.info(f"Retrieved {len(sites)} sites")
+            return sites
+        except CatalystCenterError as e:
             logger.error(f"Error retrieving sites: {e}")
             return []
     
     def get_network_health(self) -> Dict[str, Any]:
         """Get network health information."""
         try:
-            health = self.api.clients.get_overall_network_health()
+            health = self.session.get('/dna/intent/api/v1/network-health')
             logger.info("Retrieved network health information")
-            return health.response
-        except ApiError as e:
+            return health['response']
+        except CatalystCenterError as e:
             logger.error(f"Error retrieving network health: {e}")
             return {}
     
     def deploy_template(self, template_id: str, target_devices: List[str], 
-                       parameters: Dict[str, Any]) -> Dict[str, Any]:
+                       parameters: Dict[str, Any],
+                       device_parameters: Optional[Dict[str, Dict[str, Any]]] = None) -> Dict[str, Any]:
         """
-        Deploy a template to target devices.
+        Deploy a template to target devices in a single request.
         
         Args:
             template_id: ID of the template to deploy
             target_devices: List of device IDs to deploy to
-            parameters: Template parameters
+            parameters: Template parameters shared by every device
+            device_parameters: Per-device parameters (device ID -> parameters), merged over {parameters}
             
         Returns:
-            Deployment result
+            Deployment result; pass it to get_deployment_results() for the per-device outcome
         """
+        device_parameters = device_parameters or {}
         try:
-            deployment = self.api.configuration_templates.deploy_template(
-                template_id=template_id,
-                target_info=target_devices,
-                params=parameters
+            deployment = self.session.post(
+                DEPLOY_PATH,
+                {
+                    'templateId': template_id,
+                    'forcePushTemplate': True,
+                    'targetInfo': [{'id': device_id, 'type': 'MANAGED_DEVICE_UUID',
+                                    'params': dict(parameters, **device_parameters.get(device_id, {}))}
+                                   for device_id in target_devices]
+                }
             )
-            logger.info(f"Template {template_id} deployment initiated")
+            logger.info(f"Template {template_id} deployment to {len(target_devices)} devices initiated")
             return deployment
-        except ApiError as e:
+        except CatalystCenterError as e:
             logger.error(f"Error deploying template: {e}")
             return {}
     
+    def get_deployment_results(self, deployment: Dict[str, Any],
+                               timeout: float = DEFAULT_TIMEOUT) -> Dict[str, Dict[str, Any]]:
+        """
+        Wait for a deployment and return its outcome per device.
+        
+        Args:
+            deployment: Result of deploy_template()
+            timeout: Overall deadline, in seconds
+            
+        Returns:
+            Device ID -> {'status', 'detailedStatusMessage', ...}
+        """
+        try:
+            task = wait_for_task(self.session, task_id_of(deployment), timeout=timeout)
+            return {key: device for key, device in device_statuses(self.session, task).items()
+                    if key == device.get('deviceId')}
+        except (CatalystCenterError, KeyError) as e:
+            logger.error(f"Error retrieving deployment results: {e}")
+            return {}
+    
     def get_templates(self) -> List[Dict[str, Any]]:
         """Get all configuration templates."""
         try:
-            templates = self.api.configuration_templates.get_templates()
-            logger.info(f"Retrieved {len(templates.response)} templates")
-            return templates.response
-        except ApiError as e:
+            templates = self.session.get('/dna/intent/api/v1/template-programmer/template')
+            logger.info(f"Retrieved {len(templates)} templates")
+            return templates
+        except CatalystCenterError as e:
             logger.error(f"Error retrieving templates: {e}")
             return []
 
@@ -133,13 +179,15 @@ def main():
     username = os.getenv('DNAC_USERNAME', 'your-username')
     password = os.getenv('DNAC_PASSWORD', 'your-password')
     verify_ssl = os.getenv('DNAC_VERIFY_SSL', 'true').lower() == 'true'
+    port = int(os.getenv('DNAC_PORT', '443'))
+    scheme = os.getenv('DNAC_SCHEME', 'https')
     
     if host == 'your-catalyst-center-host.com':
         print("Please configure your Catalyst Center credentials in the environment variables")
         return
     
     # Initialize client
-    client = CatalystCenterClient(host, username, password, verify_ssl=verify_ssl)
+    client = CatalystCenterClient(host, username, password, port=port, verify_ssl=verify_ssl, scheme=scheme)
     
     # Example operations
     print("Getting devices...")
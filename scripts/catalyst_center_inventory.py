@@ -0,0 +1,320 @@
+#!/usr/bin/env python3
+"""
+Catalyst Center Inventory
+Device inventory collection on top of CatalystCenterSession: streams the
+network-device list page by page instead of buffering the whole fleet, and
+resolves device sites in bulk instead of per device; optionally as an
+incremental snapshot that only revisits devices the controller changed, and
+joins compliance state to the inventory on device id.
+"""
+
+import os
+import json
+import logging
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterator, List, Optional, Tuple, Any
+
+try:
+    from .catalyst_center_session import CatalystCenterSession, MAX_PAGE_SIZE
+except ImportError:
+    from catalyst_center_session import CatalystCenterSession, MAX_PAGE_SIZE
+
+logger = logging.getLogger(__name__)
+
+DEVICE_PATH = '/dna/intent/api/v1/network-device'
+DEVICE_COUNT_PATH = '/dna/intent/api/v1/network-device/count'
+SITE_PATH = '/dna/intent/api/v1/site'
+MEMBERSHIP_PATH = '/dna/intent/api/v1/membership/{}'
+DEVICE_DETAIL_PATH = '/dna/intent/api/v1/device-detail'
+COMPLIANCE_PATH = '/dna/intent/api/v1/compliance/detail'
+COMPLIANCE_TYPES = ['IMAGE', 'RUNNING_CONFIG', 'PSIRT', 'EOX']
+
+
+def get_device_count(session: CatalystCenterSession) -> int:
+    """Return the number of devices managed by the controller."""
+    return session.get(DEVICE_COUNT_PATH)['response']
+
+
+def iter_device_pages(session: CatalystCenterSession, workers: int = 1,
+                      page_size: int = MAX_PAGE_SIZE,
+                      device_count: Optional[int] = None) -> Iterator[list]:
+    """
+    Yield the device list one page at a time.
+
+    Args:
+        session: Controller session
+        workers: 1 streams pages with the next one prefetched; more fetches all
+            pages concurrently, sized by the device count, still yielded in order
+        page_size: Devices per page, at most MAX_PAGE_SIZE
+        device_count: Device count, if the caller already has it
+
+    Yields:
+        Lists of device records
+    """
+    if workers > 1:
+        if device_count is None:
+            device_count = get_device_count(session)
+        logger.info(f"Fetching {device_count} devices with {workers} workers")
+        yield from session.fetch_pages(DEVICE_PATH, device_count, page_size=page_size, workers=workers)
+    else:
+        yield from session.iter_pages(DEVICE_PATH, page_size=page_size)
+
+
+def iter_devices(session: CatalystCenterSession, workers: int = 1, page_size: int = MAX_PAGE_SIZE,
+                 device_count: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+    """Yield every managed device; see iter_device_pages() for the arguments."""
+    for page in iter_device_pages(session, workers=workers, page_size=page_size, device_count=device_count):
+        yield from page
+
+
+def get_sites(session: CatalystCenterSession) -> List[Dict[str, Any]]:
+    """Return the whole site hierarchy, fetched page by page."""
+    return [site for page in session.iter_pages(SITE_PATH) for site in page]
+
+
+def get_site_membership(session: CatalystCenterSession, sites: List[Dict[str, Any]],
+                        workers: int = 8) -> Dict[str, Dict[str, Any]]:
+    """
+    Map every device assigned to a site to that site.
+
+    Args:
+        session: Controller session
+        sites: Site hierarchy, as returned by get_sites()
+        workers: Concurrent membership requests
+
+    Returns:
+        Device id -> site record, one membership call per site
+    """
+    def members(site):
+        response = session.get(MEMBERSHIP_PATH.format(site['id']))
+        return site, [device for group in response.get('device') or [] for device in group.get('response') or []]
+
+    device_sites = {}
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for site, devices in pool.map(members, sites):
+            for device in devices:
+                device_sites[device.get('instanceUuid') or device['id']] = site
+    logger.info(f"Mapped {len(device_sites)} devices to {len(sites)} sites")
+    return device_sites
+
+
+def locate_device(session: CatalystCenterSession, device: Dict[str, Any],
+                  sites_by_name: Dict[str, Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """
+    Find the site of a device missing from the membership map.
+
+    The device detail call gives the site name; {sites_by_name}, built from the
+    one hierarchy fetch, turns it into the site without another lookup.
+    """
+    response = session.get(DEVICE_DETAIL_PATH, {'identifier': 'uuid', 'searchBy': device['id']})
+    return sites_by_name.get(response['response'].get('location'))
+
+
+def inventory_record(device: Dict[str, Any], site: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Build the inventory entry the device_inventory reports use for one device."""
+    return {
+        'hostname': device['hostname'],
+        'device_ip': device['managementIpAddress'],
+        'device_id': device['id'],
+        'version': device['softwareVersion'],
+        'device_family': device['type'],
+        'role': device['role'],
+        'site': site['siteNameHierarchy'] if site else None,
+        'site_id': site['id'] if site else None
+    }
+
+
+def collect_inventory(session: CatalystCenterSession, workers: int = 8,
+                      device_count: Optional[int] = None) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """
+    Collect the device and access point inventories with their sites.
+
+    Sites come from one hierarchy fetch plus one membership call per site, so
+    collection costs O(pages + sites) requests instead of two per device; only
+    devices missing from every site's membership get a device detail call, made
+    on the worker pool once paging is done.
+
+    Args:
+        session: Controller session
+        workers: Concurrent page and membership requests
+        device_count: Device count, if the caller already has it
+
+    Returns:
+        (device inventory, access point inventory)
+    """
+    sites = get_sites(session)
+    sites_by_name = {site['siteNameHierarchy']: site for site in sites}
+    device_sites = get_site_membership(session, sites, workers=workers)
+
+    devices = list(iter_devices(session, workers=workers, device_count=device_count))
+    # devices missing from every membership are located after paging, concurrently
+    missing = [device for device in devices if device['id'] not in device_sites]
+    if missing:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            located = pool.map(lambda device: locate_device(session, device, sites_by_name), missing)
+            device_sites = dict(device_sites, **{device['id']: site for device, site in zip(missing, located)})
+        logger.info(f"Located {len(missing)} devices without a site membership")
+
+    device_inventory = []
+    ap_inventory = []
+    for device in devices:
+        record = inventory_record(device, device_sites.get(device['id']))
+        if device['family'] != 'Unified AP':
+            device_inventory.append(record)
+        else:
+            ap_inventory.append(record)
+    return device_inventory, ap_inventory
+
+
+def device_stamp(device: Dict[str, Any]) -> Any:
+    """Return the value that changes whenever the controller updates a device record, None if it has none."""
+    return device.get('lastUpdateTime') or device.get('lastUpdated') or None
+
+
+def device_unchanged(previous: Optional[Dict[str, Any]], device: Dict[str, Any]) -> bool:
+    """Return True when a snapshot entry is still current; a device without a stamp always counts as changed."""
+    stamp = device_stamp(device)
+    return previous is not None and stamp is not None and previous.get('last_update') == stamp
+
+
+def load_snapshot(path: str) -> Dict[str, Dict[str, Any]]:
+    """Load a rolling inventory snapshot (device id -> entry); empty if there is none yet."""
+    if not os.path.exists(path):
+        return {}
+    with open(path, 'r') as f:
+        return json.load(f)['devices']
+
+
+def save_snapshot(path: str, snapshot: Dict[str, Dict[str, Any]]) -> str:
+    """Write the rolling inventory snapshot, replacing the previous one atomically."""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump({'updated': datetime.now().isoformat(), 'devices': snapshot}, f, separators=(',', ':'))
+    os.replace(tmp_path, path)
+    return path
+
+
+def collect_inventory_delta(session: CatalystCenterSession, snapshot: Dict[str, Dict[str, Any]],
+                            workers: int = 8, device_count: Optional[int] = None
+                            ) -> Tuple[Dict[str, Any], Dict[str, Dict[str, Any]]]:
+    """
+    Bring an inventory snapshot up to date, resolving sites only for devices that changed.
+
+    The device pages are read as usual; a device whose lastUpdateTime (or lastUpdated)
+    matches the snapshot keeps its entry; a device with neither is always refreshed.
+    Sites of new and changed devices come from one device detail call each, or from
+    the per-site memberships once that is cheaper.
+
+    Args:
+        session: Controller session
+        snapshot: Previous snapshot, device id -> entry (see load_snapshot())
+        workers: Concurrent page and membership requests
+        device_count: Device count, if the caller already has it
+
+    Returns:
+        (delta with 'added', 'changed' and 'removed', updated snapshot)
+    """
+    current = {}
+    changed_devices = []
+    for device in iter_devices(session, workers=workers, device_count=device_count):
+        previous = snapshot.get(device['id'])
+        if device_unchanged(previous, device):
+            current[device['id']] = previous
+        else:
+            changed_devices.append(device)
+
+    if changed_devices:
+        sites = get_sites(session)
+        sites_by_name = {site['siteNameHierarchy']: site for site in sites}
+        device_sites = {}
+        if len(changed_devices) > len(sites):
+            device_sites = get_site_membership(session, sites, workers=workers)
+
+        def locate(device):
+            return device_sites.get(device['id']) or locate_device(session, device, sites_by_name)
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for device, site in zip(changed_devices, pool.map(locate, changed_devices)):
+                current[device['id']] = dict(inventory_record(device, site), family=device['family'],
+                                             last_update=device_stamp(device))
+
+    delta = {
+        'timestamp': datetime.now().isoformat(),
+        'added': [current[device['id']] for device in changed_devices if device['id'] not in snapshot],
+        'changed': [current[device['id']] for device in changed_devices if device['id'] in snapshot],
+        'removed': sorted(set(snapshot) - set(current))
+    }
+    logger.info(f"Inventory delta: {len(delta['added'])} added, {len(delta['changed'])} changed, "
+                f"{len(delta['removed'])} removed, {len(current) - len(changed_devices)} unchanged")
+    return delta, current
+
+
+def split_inventory(snapshot: Dict[str, Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """Turn a snapshot back into the (device inventory, access point inventory) record lists."""
+    device_inventory = []
+    ap_inventory = []
+    for entry in snapshot.values():
+        record = {key: value for key, value in entry.items() if key not in ('family', 'last_update')}
+        if entry['family'] != 'Unified AP':
+            device_inventory.append(record)
+        else:
+            ap_inventory.append(record)
+    return device_inventory, ap_inventory
+
+
+def get_compliance_details(session: CatalystCenterSession, compliance_types: Optional[List[str]] = None,
+                           workers: int = 4) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Fetch the compliance detail records of several compliance types concurrently.
+
+    Args:
+        session: Controller session
+        compliance_types: Types to fetch (default: IMAGE, RUNNING_CONFIG, PSIRT, EOX)
+        workers: Concurrent compliance types
+
+    Returns:
+        Compliance type -> records ({'deviceUuid', 'complianceType', 'status', ...})
+    """
+    compliance_types = compliance_types or COMPLIANCE_TYPES
+
+    def fetch(compliance_type):
+        return [record for page in session.iter_pages(COMPLIANCE_PATH, {'complianceType': compliance_type})
+                for record in page]
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return dict(zip(compliance_types, pool.map(fetch, compliance_types)))
+
+
+def compliance_matrix(inventory: List[Dict[str, Any]],
+                      compliance: Dict[str, List[Dict[str, Any]]]) -> Dict[str, Dict[str, Any]]:
+    """
+    Join compliance records to inventory records on device id.
+
+    One pass over each list through a device id index, instead of a nested loop.
+
+    Args:
+        inventory: Inventory records with 'device_id'
+        compliance: Compliance type -> records, from get_compliance_details()
+
+    Returns:
+        Device id -> {'hostname', 'site', <compliance type>: status, ...}; types without a
+        record for a device are None
+    """
+    matrix = {record['device_id']: dict({'hostname': record['hostname'], 'site': record['site']},
+                                        **{compliance_type: None for compliance_type in compliance})
+              for record in inventory}
+    for compliance_type, records in compliance.items():
+        for record in records:
+            row = matrix.get(record['deviceUuid'])
+            if row is not None:
+                row[compliance_type] = record['status']
+    return matrix
+
+
+def non_compliant(inventory: List[Dict[str, Any]], compliance: Dict[str, List[Dict[str, Any]]],
+                  compliance_type: str = 'IMAGE') -> List[Dict[str, Any]]:
+    """Return the inventory records that are NON_COMPLIANT for {compliance_type}, in compliance record order."""
+    records_by_id = {record['device_id']: record for record in inventory}
+    return [records_by_id[record['deviceUuid']] for record in compliance.get(compliance_type, [])
+            if record['status'] == 'NON_COMPLIANT' and record['deviceUuid'] in records_by_id]
@@ -0,0 +1,691 @@
+#!/usr/bin/env python3
+"""
+Catalyst Center Provisioning
+Day-0 provisioning from a design settings CSV as one dependency graph: the
+CSV is parsed once and every site gets its own chain of steps (hierarchy,
+then settings and credentials, then discovery, then site assignment, then
+template deployment). Each step starts as soon as the steps it depends on
+have finished, so independent sites proceed concurrently and nothing waits
+on a fixed sleep. provision_pods() runs one such graph per controller at
+once, for lab pods that each have their own controller.
+"""
+
+import re
+import json
+import time
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Any
+
+try:
+    from .catalyst_center_session import CatalystCenterError, CatalystCenterSession
+    from .catalyst_center_tasks import DEFAULT_TIMEOUT, TaskPoller, backoff_delays, task_id_of, wait_for_task
+    from .catalyst_center_sites import SiteIndex, create_site, row_site_path, row_sites, wait_for_execution
+    from .catalyst_center_templates import DeploymentScheduler, TemplateIndex, sync_template
+except ImportError:
+    from catalyst_center_session import CatalystCenterError, CatalystCenterSession
+    from catalyst_center_tasks import DEFAULT_TIMEOUT, TaskPoller, backoff_delays, task_id_of, wait_for_task
+    from catalyst_center_sites import SiteIndex, create_site, row_site_path, row_sites, wait_for_execution
+    from catalyst_center_templates import DeploymentScheduler, TemplateIndex, sync_template
+
+logger = logging.getLogger(__name__)
+
+SITE_SETTINGS_PATH = '/dna/intent/api/v1/site/{}'
+CREDENTIALS_PATH = '/dna/intent/api/v1/device-credential'
+GLOBAL_CREDENTIAL_PATH = '/dna/intent/api/v1/global-credential'
+CREDENTIAL_TO_SITE_PATH = '/dna/intent/api/v1/credential-to-site/{}'
+DISCOVERY_PATH = '/dna/intent/api/v1/discovery'
+DISCOVERY_ID_PATH = '/dna/intent/api/v1/discovery/{}'
+DISCOVERY_DEVICES_PATH = '/dna/intent/api/v1/discovery/{}/network-device'
+DEVICE_BY_IP_PATH = '/dna/intent/api/v1/network-device/ip-address/{}'
+SITE_DEVICE_PATH = '/dna/system/api/v1/site/{}/device'
+# discoveries run for minutes: poll every 2 s at first, at most every 15 s, for up to 30 minutes
+DISCOVERY_INITIAL_DELAY = 2.0
+DISCOVERY_MAX_DELAY = 15.0
+DISCOVERY_TIMEOUT = 1800.0
+# a device still collecting inventory this long after the discovery found it is given up on
+DEVICE_TIMEOUT = 600.0
+# inventoryCollectionStatus values of a device the discovery is still working on
+DISCOVERY_PENDING_STATUSES = ('In Progress', 'Syncing', 'Not Started', '', None)
+
+
+class Pipeline:
+    """
+    Dependency graph of steps run on a worker pool.
+
+    A step is a callable taking {dependency name: dependency result}; it starts
+    as soon as all its dependencies succeeded and is skipped when one of them
+    failed or was skipped.
+    """
+
+    def __init__(self, workers: int = 16):
+        """
+        Initialize an empty graph.
+
+        Args:
+            workers: Steps running at once
+        """
+        self.workers = workers
+        self.steps: Dict[str, Dict[str, Any]] = OrderedDict()
+
+    def add(self, name: str, func: Callable[[Dict[str, Any]], Any], depends: Iterable[Optional[str]] = ()) -> str:
+        """Add a step; None entries in {depends} are ignored. Returns the step name."""
+        if name in self.steps:
+            raise ValueError(f"Duplicate step {name}")
+        self.steps[name] = {'func': func, 'depends': [step for step in depends if step]}
+        return name
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.steps
+
+    def run(self, on_done: Optional[Callable[[str, Dict[str, Any]], None]] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        Run every step.
+
+        Args:
+            on_done: Called with (name, result) as each step finishes or is skipped
+
+        Returns:
+            Step name -> {'status': SUCCESS, FAILURE or SKIPPED, 'result', 'error', 'seconds'}
+        """
+        for name, step in self.steps.items():
+            unknown = [depend for depend in step['depends'] if depend not in self.steps]
+            if unknown:
+                raise ValueError(f"Step {name} depends on unknown steps {unknown}")
+
+        results: Dict[str, Dict[str, Any]] = {}
+        waiting = OrderedDict((name, step['depends']) for name, step in self.steps.items())
+        running = {}
+
+        def finish(name, result):
+            results[name] = result
+            if on_done:
+                on_done(name, result)
+
+        def timed(name, func, inputs):
+            start = time.monotonic()
+            try:
+                return {'status': 'SUCCESS', 'result': func(inputs), 'error': None,
+                        'seconds': time.monotonic() - start}
+            except Exception as e:
+                logger.debug(f"Step {name} failed", exc_info=True)
+                return {'status': 'FAILURE', 'result': None, 'error': str(e), 'seconds': time.monotonic() - start}
+
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            while waiting or running:
+                progressed = True
+                while progressed:
+                    progressed = False
+                    for name, depends in list(waiting.items()):
+                        failed = [depend for depend in depends
+                                  if depend in results and results[depend]['status'] != 'SUCCESS']
+                        if failed:
+                            del waiting[name]
+                            finish(name, {'status': 'SKIPPED', 'result': None, 'seconds': 0.0,
+                                          'error': f"{failed[0]} did not succeed"})
+                            progressed = True
+                        elif all(depend in results for depend in depends):
+                            del waiting[name]
+                            inputs = {depend: results[depend]['result'] for depend in depends}
+                            running[pool.submit(timed, name, self.steps[name]['func'], inputs)] = name
+                if not running:
+                    break
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    finish(running.pop(future), future.result())
+        return results
+
+
+def row_value(row: Dict[str, str], *columns: str) -> str:
+    """Return the first non-empty value of {columns} in a CSV row, stripped, or ''."""
+    for column in columns:
+        value = (row.get(column) or '').strip()
+        if value:
+            return value
+    return ''
+
+
+def row_flag(row: Dict[str, str], column: str) -> bool:
+    """Return True for a 'true' CSV cell."""
+    return row_value(row, column).lower() == 'true'
+
+
+def row_devices(row: Dict[str, str]) -> List[str]:
+    """Return the device IPs of a CSV row's DeviceList."""
+    return [address.strip() for address in row_value(row, 'DeviceList').split(',') if address.strip()]
+
+
+def run_execution(session: CatalystCenterSession, response: Dict[str, Any], action: str,
+                  timeout: float = DEFAULT_TIMEOUT) -> Dict[str, Any]:
+    """
+    Wait for a business API call ({'executionId': ...}) and fail loudly when it fails.
+
+    Raises:
+        CatalystCenterError: If the execution ends in another status than SUCCESS
+        TaskTimeout: If it does not end in time
+    """
+    execution = wait_for_execution(session, response['executionId'], timeout)
+    if execution.get('status') != 'SUCCESS':
+        raise CatalystCenterError(f"{action} failed: {execution.get('bapiError') or execution.get('status')}")
+    return execution
+
+
+def site_settings_payload(row: Dict[str, str]) -> Dict[str, Any]:
+    """Build the network settings of a site from a CSV row (both the v2 and v3 column names are read)."""
+    settings = {
+        'dhcpServer': [server for server in (row_value(row, 'dhcpServer1', 'dhcpServer'),
+                                             row_value(row, 'dhcpServer2')) if server],
+        'dnsServer': {'domainName': row_value(row, 'domainName'),
+                      'primaryIpAddress': row_value(row, 'dnsServer1')},
+        'syslogServer': {'ipAddresses': [row_value(row, 'syslogServer')],
+                         'configureDnacIP': row_flag(row, 'syslogBoolean')},
+        'snmpServer': {'ipAddresses': [row_value(row, 'snmpServer')],
+                       'configureDnacIP': row_flag(row, 'snmpBoolean')},
+        'netflowcollector': {'ipAddress': row_value(row, 'netflowServer'), 'port': row_value(row, 'netflowPort'),
+                             'configureDnacIP': row_flag(row, 'netflowBoolean')},
+        'ntpServer': [server for server in (row_value(row, 'ntpServer1', 'ntpServer'),
+                                            row_value(row, 'ntpServer2')) if server],
+        'timezone': row_value(row, 'timeZone'),
+        'messageOfTheday': {'bannerMessage': row_value(row, 'bannerMessage'),
+                            'retainExistingBanner': row_flag(row, 'bannerBoolean')}
+    }
+    if row_value(row, 'dnsServer2'):
+        settings['dnsServer']['secondaryIpAddress'] = row_value(row, 'dnsServer2')
+    if row_value(row, 'aaaEndpointServer'):
+        settings['clientAndEndpoint_aaa'] = {'servers': row_value(row, 'aaaEndpointServer'),
+                                             'ipAddress': row_value(row, 'aaaEndpointIpAddress'),
+                                             'network': row_value(row, 'aaaEndpointIpAddress'),
+                                             'protocol': row_value(row, 'aaaEndpointProtocol'),
+                                             'sharedSecret': row_value(row, 'aaaEndpointSharedSecret')}
+    return {'settings': settings}
+
+
+def row_credentials(row: Dict[str, str]) -> Dict[str, Dict[str, Any]]:
+    """Return the global credentials a CSV row names, by kind ('cli', 'snmp_v2_read', 'snmp_v2_write')."""
+    credentials = {}
+    user = row_value(row, 'DcloudUser')
+    if user:
+        credentials['cli'] = {'description': user, 'username': user, 'password': row_value(row, 'DcloudPwd'),
+                              'enablePassword': row_value(row, 'DcloudPwd')}
+    if row_value(row, 'DcloudSnmpRO-Desc'):
+        credentials['snmp_v2_read'] = {'description': row_value(row, 'DcloudSnmpRO-Desc'),
+                                       'readCommunity': row_value(row, 'DcloudSnmpRO')}
+    if row_value(row, 'DcloudSnmpRW-Desc'):
+        credentials['snmp_v2_write'] = {'description': row_value(row, 'DcloudSnmpRW-Desc'),
+                                        'writeCommunity': row_value(row, 'DcloudSnmpRW')}
+    return credentials
+
+
+def ensure_credentials(session: CatalystCenterSession, rows: Iterable[Dict[str, str]],
+                       timeout: float = DEFAULT_TIMEOUT) -> Dict[str, Any]:
+    """
+    Create the global credentials the rows name that do not exist yet, in one request.
+
+    Returns:
+        {'cli': {description: id}, 'snmp_v2_read': {...}, 'snmp_v2_write': {...}, 'netconf': id or None}
+    """
+    wanted = {'cli': {}, 'snmp_v2_read': {}, 'snmp_v2_write': {}}
+    for row in rows:
+        for kind, credential in row_credentials(row).items():
+            wanted[kind].setdefault(credential['description'], credential)
+    existing = session.get(CREDENTIALS_PATH)
+    keys = {'cli': 'cliCredential', 'snmp_v2_read': 'snmpV2cRead', 'snmp_v2_write': 'snmpV2cWrite'}
+    missing = {}
+    for kind, credentials in wanted.items():
+        known = {item.get('description') for item in existing.get(kind) or []}
+        new = [credential for description, credential in credentials.items() if description not in known]
+        if new:
+            missing[keys[kind]] = new
+    if missing:
+        run_execution(session, session.post(CREDENTIALS_PATH, {'settings': missing}), 'Create credentials', timeout)
+        existing = session.get(CREDENTIALS_PATH)
+        logger.info(f"Created credentials: {sorted(item['description'] for items in missing.values() for item in items)}")
+    ids = {kind: {item.get('description'): item['id'] for item in existing.get(kind) or []} for kind in wanted}
+    netconf = session.get(GLOBAL_CREDENTIAL_PATH, {'credentialSubType': 'NETCONF'})['response']
+    ids['netconf'] = netconf[0]['id'] if netconf else None
+    return ids
+
+
+def row_credential_ids(row: Dict[str, str], credential_ids: Dict[str, Any]) -> Dict[str, Optional[str]]:
+    """Return {'cli', 'snmp_v2_read', 'snmp_v2_write'} -> id of the credentials a row names (None if not named)."""
+    return {kind: credential_ids.get(kind, {}).get(credential['description'])
+            for kind, credential in row_credentials(row).items()}
+
+
+def discovery_payload(name: str, addresses: List[str], credential_ids: List[str]) -> Dict[str, Any]:
+    """Build a discovery of individual device addresses."""
+    return {'name': name, 'discoveryType': 'Multi Range' if len(addresses) > 1 else 'Range',
+            'ipAddressList': ','.join(f"{address}-{address}" for address in addresses),
+            'protocolOrder': 'ssh', 'timeout': 5, 'retry': 3,
+            'globalCredentialIdList': [credential for credential in credential_ids if credential]}
+
+
+def device_in_inventory(session: CatalystCenterSession, address: str) -> bool:
+    """Return True when a device with this management IP is already managed."""
+    try:
+        session.get(DEVICE_BY_IP_PATH.format(address))
+        return True
+    except CatalystCenterError as e:
+        if e.status_code not in (404, 400):
+            raise
+        return False
+
+
+def discovery_id_of(session: CatalystCenterSession, response: Dict[str, Any],
+                    timeout: float = DEFAULT_TIMEOUT) -> str:
+    """
+    Wait for the task of a create discovery request and return the new discovery id.
+
+    Raises:
+        CatalystCenterError: If the discovery could not be created
+    """
+    task = wait_for_task(session, task_id_of(response), timeout)
+    if task.get('isError'):
+        raise CatalystCenterError(f"Discovery failed to start: {task.get('failureReason')}")
+    # the task's progress (and data) carry the new discovery id
+    return str(task.get('progress') or task.get('data'))
+
+
+def start_discovery(session: CatalystCenterSession, name: str, addresses: List[str],
+                    credential_ids: List[str], timeout: float = DEFAULT_TIMEOUT) -> str:
+    """Create a discovery and return its id."""
+    return discovery_id_of(session, session.post(DISCOVERY_PATH, discovery_payload(name, addresses, credential_ids)),
+                           timeout)
+
+
+def watch_discovery(session: CatalystCenterSession, discovery_id: str, addresses: Iterable[str],
+                    device_timeout: float = DEVICE_TIMEOUT,
+                    timeout: float = DISCOVERY_TIMEOUT) -> Iterator[Dict[str, Any]]:
+    """
+    Follow a discovery device by device.
+
+    Each round reads the discovery and its per-device results (two requests)
+    and yields every device that settled since the last round, so a caller can
+    act on a device as soon as it is managed instead of waiting for the whole
+    discovery. A device that shows up but is still collecting {device_timeout}
+    seconds later is given up on, also when the discovery has completed in the
+    meantime; devices the discovery never listed are reported when it completes.
+
+    Args:
+        session: Controller session
+        discovery_id: Discovery to follow
+        addresses: Management IPs the discovery should find
+        device_timeout: Seconds a device may stay in collection after it shows up
+        timeout: Deadline for the whole discovery, in seconds
+
+    Yields:
+        {'ip', 'status': 'MANAGED', 'FAILURE' or 'TIMEOUT', 'device_id', 'error'}, once per address
+    """
+    pending = OrderedDict((address, None) for address in addresses)
+    deadline = time.monotonic() + timeout
+    for delay in backoff_delays(DISCOVERY_INITIAL_DELAY, DISCOVERY_MAX_DELAY):
+        time.sleep(max(0.0, min(delay, deadline - time.monotonic())))
+        discovery = session.get(DISCOVERY_ID_PATH.format(discovery_id))['response']
+        complete = discovery.get('discoveryCondition') == 'Complete' or discovery.get('discoveryStatus') == 'Inactive'
+        now = time.monotonic()
+        for device in session.get(DISCOVERY_DEVICES_PATH.format(discovery_id))['response']:
+            address = device.get('managementIpAddress')
+            if address not in pending:
+                continue
+            status = device.get('inventoryCollectionStatus')
+            result = {'ip': address, 'device_id': device.get('id'), 'error': None}
+            if status == 'Managed':
+                result['status'] = 'MANAGED'
+            elif status not in DISCOVERY_PENDING_STATUSES:
+                result.update(status='FAILURE', error=f"{status}, {device.get('reachabilityStatus')}")
+            elif now - (pending[address] or now) >= device_timeout:
+                result.update(status='TIMEOUT', error=f"Still {status} after {device_timeout:g} s")
+            else:
+                pending[address] = pending[address] or now
+                continue
+            del pending[address]
+            yield result
+        if complete:
+            # devices listed but still collecting keep their own device_timeout
+            for address in [address for address, seen in pending.items() if seen is None]:
+                del pending[address]
+                yield {'ip': address, 'status': 'FAILURE', 'device_id': None, 'error': 'Not found by the discovery'}
+        if not pending:
+            return
+        if now >= deadline:
+            for address in list(pending):
+                del pending[address]
+                yield {'ip': address, 'status': 'TIMEOUT', 'device_id': None,
+                       'error': f"Discovery did not finish within {timeout:g} s"}
+            return
+
+
+class Day0Provisioner:
+    """
+    Builds and runs the provisioning graph of a design settings CSV.
+
+    Steps per CSV row, for the deepest site the row names:
+      site <path>              one per site of the hierarchy, after its parent
+      settings <path>          network settings, after the site
+      site-credentials <path>  credentials assigned to the site, after the site and the global credentials
+      discovery <path>         devices of DeviceList not yet managed, after settings and site credentials
+      assign <path>            managed devices assigned to the site, after discovery
+      deploy <path>            the row's template deployed to its devices, after assign and the template
+    and once per run: 'credentials' (global credentials), 'project' and 'template <name>'.
+    """
+
+    def __init__(self, session: CatalystCenterSession, rows: List[Dict[str, str]],
+                 project_name: str = 'Day0 Provisioning', workers: int = 16,
+                 timeout: float = DEFAULT_TIMEOUT, discovery_timeout: float = DISCOVERY_TIMEOUT,
+                 site_index: Optional[SiteIndex] = None, name: Optional[str] = None):
+        """
+        Initialize the provisioner.
+
+        Args:
+            session: Controller session
+            rows: Design settings CSV rows
+            project_name: Template project for the rows' templates
+            workers: Steps running at once
+            timeout: Per-task deadline, in seconds
+            discovery_timeout: Per-discovery deadline, in seconds
+            site_index: Existing hierarchy, fetched when not given
+            name: Prefix of the log lines, e.g. the pod when several controllers are provisioned at once
+        """
+        self.session = session
+        self.name = name
+        self.rows = rows
+        self.project_name = project_name
+        self.workers = workers
+        self.timeout = timeout
+        self.discovery_timeout = discovery_timeout
+        self.site_index = site_index
+        self.template_index: Optional[TemplateIndex] = None
+        self.poller: Optional[TaskPoller] = None
+        self.lock = threading.Lock()
+
+    # ------------------------------------------------------------------
+    # steps
+    # ------------------------------------------------------------------
+    def ensure_site(self, site: Dict[str, Any]) -> str:
+        """Return the id of a planned site, creating it first when it does not exist."""
+        with self.lock:
+            site_id = self.site_index.site_id(site['path'])
+        if site_id:
+            return site_id
+        result = create_site(self.session, site, self.timeout)
+        if result['status'] != 'SUCCESS' or not result['site']:
+            raise CatalystCenterError(f"Create {site['type']} {site['path']} failed: {result['error']}")
+        with self.lock:
+            self.site_index.add(result['site'])
+        return result['site']['id']
+
+    def site_id(self, path: str) -> str:
+        """Return the id of an existing site."""
+        with self.lock:
+            site_id = self.site_index.site_id(path)
+        if site_id is None:
+            raise CatalystCenterError(f"Site {path} does not exist")
+        return site_id
+
+    def apply_settings(self, row: Dict[str, str], path: str) -> str:
+        """Push the network settings of a row to its site."""
+        response = self.session.put(SITE_SETTINGS_PATH.format(self.site_id(path)), site_settings_payload(row))
+        run_execution(self.session, response, f"Settings of {path}", self.timeout)
+        return path
+
+    def assign_credentials(self, row: Dict[str, str], path: str, credential_ids: Dict[str, Any]) -> Dict[str, Any]:
+        """Assign the credentials a row names to its site."""
+        ids = row_credential_ids(row, credential_ids)
+        payload = {'cliId': ids.get('cli'), 'snmpV2ReadId': ids.get('snmp_v2_read'),
+                   'snmpV2WriteId': ids.get('snmp_v2_write')}
+        response = self.session.post(CREDENTIAL_TO_SITE_PATH.format(self.site_id(path)),
+                                     {key: value for key, value in payload.items() if value})
+        run_execution(self.session, response, f"Credentials of {path}", self.timeout)
+        return ids
+
+    def discover(self, row: Dict[str, str], path: str, credential_ids: Dict[str, Any]) -> List[str]:
+        """Discover the row's devices that are not managed yet; returns the managed device IPs."""
+        addresses = row_devices(row)
+        missing = [address for address in addresses if not device_in_inventory(self.session, address)]
+        if not missing:
+            return addresses
+        ids = row_credential_ids(row, credential_ids)
+        discovery_id = start_discovery(self.session, re.sub(r'\s', '', path), missing,
+                                       [ids.get('cli'), ids.get('snmp_v2_read'), ids.get('snmp_v2_write'),
+                                        credential_ids.get('netconf')], self.timeout)
+        failed = []
+        for result in watch_discovery(self.session, discovery_id, missing, timeout=self.discovery_timeout):
+            if result['status'] != 'MANAGED':
+                failed.append(result['ip'])
+                logger.error(f"Discovery of {path}: {result['ip']} {result['status']}, {result['error']}")
+        if failed:
+            raise CatalystCenterError(f"Discovery {discovery_id} of {path} did not manage {failed}")
+        return addresses
+
+    def assign_devices(self, path: str, addresses: List[str]) -> List[str]:
+        """Assign devices to a site."""
+        response = self.session.post(SITE_DEVICE_PATH.format(self.site_id(path)),
+                                     {'device': [{'ip': address} for address in addresses]})
+        run_execution(self.session, response, f"Assign devices to {path}", self.timeout)
+        return addresses
+
+    def ensure_project(self) -> str:
+        """Return the id of the template project, creating it when needed."""
+        self.template_index = TemplateIndex(self.session)
+        return self.template_index.ensure_project(self.project_name, self.timeout)
+
+    def sync_row_template(self, row: Dict[str, str], project_id: str) -> str:
+        """Create or update the template a row defines; returns its id."""
+        name = row_value(row, 'TemplateName')
+        text = (row['Template'].replace('{{TemplateName}}', name).replace('{{ProjectId}}', project_id)
+                .replace('{{ProjectName}}', self.project_name))
+        with self.lock:
+            template_id = self.template_index.template_id(self.project_name, name)
+        result = sync_template(self.session, project_id, json.loads(text), template_id,
+                               comments='Day-0 provisioning', timeout=self.timeout)
+        if result['action'] == 'created':
+            with self.lock:
+                self.template_index.add_template(self.project_name, name, result['id'])
+        return result['id']
+
+    def deploy(self, template_id: str, addresses: List[str]) -> List[Dict[str, Any]]:
+        """Deploy a template to the devices of a row."""
+        scheduler = DeploymentScheduler(self.session, poller=self.poller, timeout=self.timeout, grouped=True)
+        results = scheduler.run([{'device': address, 'template_id': template_id} for address in addresses])
+        failed = [result['device'] for result in results if result['status'] != 'SUCCESS']
+        if failed:
+            raise CatalystCenterError(f"Template deployment failed on {failed}")
+        return results
+
+    # ------------------------------------------------------------------
+    # graph
+    # ------------------------------------------------------------------
+    def build(self) -> Pipeline:
+        """Build the step graph of every row."""
+        if self.site_index is None:
+            self.site_index = SiteIndex.fetch(self.session)
+        pipeline = Pipeline(self.workers)
+
+        # hierarchy: one step per site, after its parent's step when the parent is planned too
+        sites = OrderedDict()
+        for row in self.rows:
+            for site in row_sites(row):
+                sites.setdefault(site['path'], site)
+        for path, site in sites.items():
+            pipeline.add(f"site {path}", lambda inputs, site=site: self.ensure_site(site),
+                         [f"site {site['parent']}" if site['parent'] in sites else None])
+
+        credentials = None
+        if any(row_credentials(row) for row in self.rows):
+            credentials = pipeline.add('credentials', lambda inputs: ensure_credentials(self.session, self.rows,
+                                                                                           self.timeout))
+        project = None
+        templates = {}
+        for row in self.rows:
+            name = row_value(row, 'TemplateName')
+            if name and row_value(row, 'Template') and name not in templates:
+                project = project or pipeline.add('project', lambda inputs: self.ensure_project())
+                templates[name] = pipeline.add(
+                    f"template {name}", lambda inputs, row=row: self.sync_row_template(row, inputs['project']),
+                    [project])
+
+        for number, row in enumerate(self.rows, start=2):
+            path = row_site_path(row)
+            suffix = '' if f"settings {path}" not in pipeline else f" (row {number})"
+            site_step = f"site {path}" if path in sites else None
+            settings = pipeline.add(f"settings {path}{suffix}",
+                                    lambda inputs, row=row, path=path: self.apply_settings(row, path), [site_step])
+            site_credentials = None
+            if row_credentials(row):
+                site_credentials = pipeline.add(
+                    f"site-credentials {path}{suffix}",
+                    lambda inputs, row=row, path=path: self.assign_credentials(row, path, inputs['credentials']),
+                    [site_step, credentials])
+            if not row_devices(row):
+                continue
+            discovery = pipeline.add(
+                f"discovery {path}{suffix}",
+                # no 'credentials' step when no row names credentials: discover with the existing ones
+                lambda inputs, row=row, path=path: self.discover(row, path, inputs.get('credentials') or {}),
+                [settings, site_credentials, credentials])
+            assign = pipeline.add(f"assign {path}{suffix}",
+                                  lambda inputs, path=path, step=discovery: self.assign_devices(path, inputs[step]),
+                                  [discovery])
+            name = row_value(row, 'TemplateName')
+            if name in templates and row_flag(row, 'DeployTemplate'):
+                pipeline.add(f"deploy {path}{suffix}",
+                             lambda inputs, step=assign, template=templates[name]: self.deploy(inputs[template],
+                                                                                               inputs[step]),
+                             [assign, templates[name]])
+        return pipeline
+
+    def run(self, pipeline: Optional[Pipeline] = None,
+            on_done: Optional[Callable[[str, Dict[str, Any]], None]] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        Provision every row.
+
+        Args:
+            pipeline: Graph from build() (default: built here)
+            on_done: Also called with (name, result) as each step finishes or is skipped
+
+        Returns:
+            Step name -> {'status': SUCCESS, FAILURE or SKIPPED, 'result', 'error', 'seconds'}
+        """
+        pipeline = pipeline or self.build()
+        prefix = f"{self.name}: " if self.name else ''
+        logger.info(f"{prefix}Provisioning {len(self.rows)} rows in {len(pipeline.steps)} steps")
+
+        def log(name, result):
+            if result['status'] == 'SUCCESS':
+                logger.info(f"  {prefix}{name}: done in {result['seconds']:.1f} s")
+            else:
+                logger.error(f"  {prefix}{name}: {result['status']}, {result['error']}")
+            if on_done:
+                on_done(name, result)
+
+        # one poller follows the deployment tasks of every row
+        with TaskPoller(self.session, timeout=self.timeout) as self.poller:
+            results = pipeline.run(on_done=log)
+        failed = sum(result['status'] != 'SUCCESS' for result in results.values())
+        logger.info(f"{prefix}Provisioned {len(results) - failed} of {len(results)} steps")
+        return results
+
+
+class ProvisioningProgress:
+    """Step counts of several provisioning runs at once, logged as one aggregate line."""
+
+    def __init__(self, interval: float = 10.0):
+        """
+        Initialize the counters.
+
+        Args:
+            interval: Seconds between progress lines while steps finish
+        """
+        self.interval = interval
+        self.totals: Dict[str, int] = OrderedDict()
+        self.done: Dict[str, int] = {}
+        self.failed: Dict[str, int] = {}
+        self.finished = set()
+        self.start = time.monotonic()
+        self.logged = self.start
+        self.lock = threading.Lock()
+
+    def add(self, run: str, total: int):
+        """Register a run and its number of steps."""
+        with self.lock:
+            self.totals[run] = total
+            self.done[run] = self.failed[run] = 0
+
+    def step_done(self, run: str, result: Dict[str, Any]):
+        """Count a finished step of a run, logging the aggregate every {interval} seconds."""
+        with self.lock:
+            self.done[run] += 1
+            self.failed[run] += result['status'] != 'SUCCESS'
+            due = time.monotonic() - self.logged >= self.interval
+            if due:
+                self.logged = time.monotonic()
+        if due:
+            self.log()
+
+    def finish(self, run: str, failed: bool = False):
+        """Mark a run as finished, e.g. when it stopped before building its graph."""
+        with self.lock:
+            self.finished.add(run)
+            if failed:
+                self.failed[run] = self.failed.get(run, 0) + 1
+        self.log()
+
+    def summary(self) -> str:
+        """Return the aggregate progress line."""
+        with self.lock:
+            done, total = sum(self.done.values()), sum(self.totals.values())
+            failed = sum(1 for run in self.failed if self.failed[run])
+            return (f"{len(self.finished)} of {len(self.totals)} finished, {done} of {total} steps done, "
+                    f"{failed} with failures, {time.monotonic() - self.start:.0f} s")
+
+    def log(self):
+        logger.info(f"Progress: {self.summary()}")
+
+
+def provision_pods(pods: Dict[str, Dict[str, Any]], project_name: str = 'Day0 Provisioning', workers: int = 16,
+                   timeout: float = DEFAULT_TIMEOUT, discovery_timeout: float = DISCOVERY_TIMEOUT,
+                   interval: float = 10.0) -> Dict[str, Dict[str, Dict[str, Any]]]:
+    """
+    Provision several controllers at once, one Day0Provisioner each.
+
+    Every pod runs in its own thread with its own session, so token, connection
+    pool and 429 backoff stay per controller and a slow or failing pod does not
+    hold up the others; the run takes about as long as its slowest pod.
+
+    Args:
+        pods: Pod name -> {'session': CatalystCenterSession, 'rows': design settings CSV rows}
+        project_name: Template project on every controller
+        workers: Steps running at once, per pod
+        timeout: Per-task deadline, in seconds
+        discovery_timeout: Per-discovery deadline, in seconds
+        interval: Seconds between aggregate progress lines
+
+    Returns:
+        Pod name -> step results as from Day0Provisioner.run(); a pod that could not
+        start has a single 'setup' step with its error
+    """
+    progress = ProvisioningProgress(interval)
+
+    def provision(pod):
+        provisioner = Day0Provisioner(pods[pod]['session'], pods[pod]['rows'], project_name, workers, timeout,
+                                      discovery_timeout, name=pod)
+        try:
+            pipeline = provisioner.build()
+        except Exception as e:
+            # e.g. an unreachable controller or a rejected login: only this pod stops
+            logger.error(f"{pod}: could not start: {e}")
+            progress.finish(pod, failed=True)
+            return {'setup': {'status': 'FAILURE', 'result': None, 'error': str(e), 'seconds': 0.0}}
+        progress.add(pod, len(pipeline.steps))
+        results = provisioner.run(pipeline, on_done=lambda name, result: progress.step_done(pod, result))
+        progress.finish(pod)
+        return results
+
+    for pod in pods:
+        progress.add(pod, 0)
+    with ThreadPoolExecutor(max_workers=max(1, len(pods))) as pool:
+        results = dict(zip(pods, pool.map(provision, pods)))
+    logger.info(f"Provisioned {len(pods)} pods: {progress.summary()}")
+    return results
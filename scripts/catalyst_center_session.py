@@ -0,0 +1,345 @@
+#!/usr/bin/env python3
+"""
+Catalyst Center Session
+Shared HTTP core for the Catalyst Center (DNA Center) REST API: one pooled
+keep-alive requests.Session per controller, with the auth token cached until
+shortly before it expires and refreshed once when concurrent callers hit a 401.
+"""
+
+import json
+import time
+import base64
+import random
+import logging
+import threading
+from collections import deque
+from itertools import islice
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterator, List, Optional, Any
+
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+TOKEN_PATH = '/dna/system/api/v1/auth/token'
+# Catalyst Center tokens are valid for 60 minutes unless the token says otherwise
+DEFAULT_TOKEN_LIFETIME = 3600
+# Refresh this many seconds before the token expires
+REFRESH_MARGIN = 60
+# Largest page the controller returns for offset/limit APIs
+MAX_PAGE_SIZE = 500
+
+
+class CatalystCenterError(Exception):
+    """Error response from the Catalyst Center API."""
+
+    def __init__(self, message: str, status_code: Optional[int] = None,
+                 response: Optional[requests.Response] = None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.response = response
+
+
+def token_expiry(token: str) -> Optional[float]:
+    """Return the 'exp' claim of a JWT token as a UNIX timestamp, if it carries one."""
+    try:
+        payload = token.split('.')[1]
+        payload += '=' * (-len(payload) % 4)
+        return float(json.loads(base64.urlsafe_b64decode(payload))['exp'])
+    except (IndexError, KeyError, TypeError, ValueError):
+        return None
+
+
+def retry_after(response: requests.Response) -> Optional[float]:
+    """Return the Retry-After delay of a response in seconds, if it carries one."""
+    try:
+        return float(response.headers['Retry-After'])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+class AdaptiveBackoff:
+    """
+    Shared pacing for every thread of a session.
+
+    An HTTP 429 doubles the delay all callers wait before their next request
+    (or jumps to the controller's Retry-After), at most once per delay period so
+    a burst of rejections from concurrent workers counts once; each success
+    shrinks it again, so a worker pool settles just under the controller's rate limit.
+    """
+
+    def __init__(self, initial: float = 0.05, maximum: float = 30.0, decay: float = 0.8):
+        self.initial = initial
+        self.maximum = maximum
+        self.decay = decay
+        self.delay = 0.0
+        self.lock = threading.Lock()
+        self.throttled_count = 0
+        self.increased = 0.0
+
+    def wait(self):
+        """Sleep for the current delay, with jitter so waiting threads do not retry in lockstep."""
+        delay = self.delay
+        if delay:
+            time.sleep(delay * random.uniform(0.5, 1.0))
+
+    def throttled(self, delay: Optional[float] = None):
+        """Record an HTTP 429 and increase the delay."""
+        with self.lock:
+            self.throttled_count += 1
+            now = time.monotonic()
+            if now - self.increased >= self.delay:
+                self.delay = min(self.maximum, max(self.delay * 2, self.initial))
+                self.increased = now
+            self.delay = min(self.maximum, max(self.delay, delay or 0.0))
+
+    def succeeded(self):
+        """Record a successful request and decrease the delay."""
+        if self.delay:
+            with self.lock:
+                self.delay = self.delay * self.decay if self.delay * self.decay >= self.initial / 4 else 0.0
+
+
+class CatalystCenterSession:
+    """Pooled, token-caching HTTP session for one Catalyst Center controller."""
+
+    def __init__(self, base_url: str, username: str, password: str, verify: bool = True,
+                 timeout: float = 30, pool_size: int = 20, refresh_margin: float = REFRESH_MARGIN,
+                 max_retries: int = 8):
+        """
+        Initialize the session.
+
+        Args:
+            base_url: Controller URL, e.g. https://10.1.1.1
+            username: Username for authentication
+            password: Password for authentication
+            verify: Whether to verify SSL certificates
+            timeout: Per-request timeout, in seconds
+            pool_size: Maximum number of pooled keep-alive connections
+            refresh_margin: Seconds before token expiry at which it is refreshed
+            max_retries: Retries of a request rejected with HTTP 429
+        """
+        self.base_url = base_url.rstrip('/')
+        self.username = username
+        self.password = password
+        self.verify = verify
+        self.timeout = timeout
+        self.refresh_margin = refresh_margin
+        self.max_retries = max_retries
+        self.backoff = AdaptiveBackoff()
+
+        self.http = requests.Session()
+        self.http.verify = verify
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.http.mount('https://', adapter)
+        self.http.mount('http://', adapter)
+
+        self.lock = threading.Lock()
+        self.token = None
+        self.token_expires = 0.0
+        self.logins = 0
+
+    def login(self) -> str:
+        """Request a new token from the controller; callers must hold the lock."""
+        response = self.http.post(self.base_url + TOKEN_PATH, auth=(self.username, self.password),
+                                  headers={'content-type': 'application/json'}, timeout=self.timeout)
+        if response.status_code != 200:
+            raise CatalystCenterError(f"Authentication failed: HTTP {response.status_code}",
+                                      response.status_code, response)
+        self.token = response.json()['Token']
+        self.token_expires = token_expiry(self.token) or time.time() + DEFAULT_TOKEN_LIFETIME
+        self.logins += 1
+        logger.debug(f"Obtained Catalyst Center token, valid until {time.ctime(self.token_expires)}")
+        return self.token
+
+    def get_token(self) -> str:
+        """Return the cached token, logging in when there is none or it is about to expire."""
+        with self.lock:
+            if self.token is None or time.time() >= self.token_expires - self.refresh_margin:
+                self.login()
+            return self.token
+
+    def refresh_token(self, stale_token: str) -> str:
+        """
+        Replace a token the controller rejected.
+
+        Only the first caller holding {stale_token} logs in again; callers that
+        arrive after the refresh get the new token without another login.
+        """
+        with self.lock:
+            if self.token == stale_token:
+                self.login()
+            return self.token
+
+    def request(self, method: str, path: str, params: Optional[Dict[str, Any]] = None,
+                json_body: Any = None, check: bool = True, **kwargs) -> requests.Response:
+        """
+        Send an authenticated request.
+
+        A request rejected with HTTP 401 is retried once with a fresh token; one
+        rejected with HTTP 429 is retried after the shared adaptive backoff.
+
+        Args:
+            method: HTTP method
+            path: API path, e.g. /dna/intent/api/v1/network-device
+            params: Query string parameters
+            json_body: JSON request body
+            check: Raise on an error status; False returns the response, for callers that read the status code
+            **kwargs: Extra arguments for requests.Session.request()
+
+        Returns:
+            The response
+
+        Raises:
+            CatalystCenterError: If the controller returns an error status and {check} is set
+        """
+        url = path if path.startswith('http') else self.base_url + path
+        kwargs.setdefault('timeout', self.timeout)
+        token = self.get_token()
+        refreshed = False
+        attempt = 0
+        while True:
+            self.backoff.wait()
+            response = self.http.request(method, url, params=params, json=json_body,
+                                         headers={'content-type': 'application/json',
+                                                  'x-auth-token': token}, **kwargs)
+            if response.status_code == 429 and attempt < self.max_retries:
+                attempt += 1
+                self.backoff.throttled(retry_after(response))
+                continue
+            if response.status_code == 401 and not refreshed:
+                refreshed = True
+                token = self.refresh_token(token)
+                continue
+            if response.status_code != 429:
+                self.backoff.succeeded()
+            break
+
+        if check and response.status_code >= 400:
+            raise CatalystCenterError(f"{method} {path} failed: HTTP {response.status_code} "
+                                      f"{response.text[:200]}", response.status_code, response)
+        return response
+
+    def get(self, path: str, params: Optional[Dict[str, Any]] = None, **kwargs) -> Any:
+        """GET {path} and return the decoded JSON body."""
+        return self.request('GET', path, params=params, **kwargs).json()
+
+    def post(self, path: str, json_body: Any = None, **kwargs) -> Any:
+        """POST {json_body} to {path} and return the decoded JSON body."""
+        response = self.request('POST', path, json_body=json_body, **kwargs)
+        return response.json() if response.content else None
+
+    def put(self, path: str, json_body: Any = None, **kwargs) -> Any:
+        """PUT {json_body} to {path} and return the decoded JSON body."""
+        response = self.request('PUT', path, json_body=json_body, **kwargs)
+        return response.json() if response.content else None
+
+    def delete(self, path: str, **kwargs) -> Any:
+        """DELETE {path} and return the decoded JSON body."""
+        response = self.request('DELETE', path, **kwargs)
+        return response.json() if response.content else None
+
+    def iter_pages(self, path: str, params: Optional[Dict[str, Any]] = None,
+                   page_size: int = MAX_PAGE_SIZE, prefetch: bool = True) -> Iterator[List[Any]]:
+        """
+        Yield the pages of an offset/limit API one at a time.
+
+        While the caller works on one page the next one is already being fetched,
+        and no more than two pages are held in memory.
+
+        Args:
+            path: API path returning {'response': [...]}
+            params: Extra query string parameters
+            page_size: Items per page, at most MAX_PAGE_SIZE
+            prefetch: Fetch the next page in the background
+
+        Yields:
+            Lists of items, in order
+        """
+        def fetch(offset):
+            return self.get(path, dict(params or {}, offset=offset, limit=page_size))['response']
+
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            offset = 1
+            future = pool.submit(fetch, offset)
+            while future:
+                page = future.result()
+                offset += page_size
+                future = None
+                if len(page) == page_size:
+                    future = pool.submit(fetch, offset) if prefetch else None
+                if page:
+                    yield page
+                if len(page) == page_size and future is None:
+                    future = pool.submit(fetch, offset)
+
+    def fetch_pages(self, path: str, total: int, params: Optional[Dict[str, Any]] = None,
+                    page_size: int = MAX_PAGE_SIZE, workers: int = 8) -> Iterator[List[Any]]:
+        """
+        Fetch the pages of an offset/limit API concurrently, yielding them in order.
+
+        With {total} known up front, every offset is handed to a bounded worker
+        pool; at most 2 x {workers} pages are in flight or buffered at a time.
+        Items added after {total} was read are picked up page by page.
+
+        Args:
+            path: API path returning {'response': [...]}
+            total: Number of items, e.g. from a /count API
+            params: Extra query string parameters
+            page_size: Items per page, at most MAX_PAGE_SIZE
+            workers: Concurrent requests
+
+        Yields:
+            Lists of items, in order
+        """
+        def fetch(offset):
+            return self.get(path, dict(params or {}, offset=offset, limit=page_size))['response']
+
+        offsets = iter(range(1, total + 1, page_size))
+        last_offset, last_size = 1 - page_size, page_size
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            pending = deque((offset, pool.submit(fetch, offset)) for offset in islice(offsets, workers * 2))
+            while pending:
+                last_offset, future = pending.popleft()
+                page = future.result()
+                last_size = len(page)
+                offset = next(offsets, None)
+                if offset is not None:
+                    pending.append((offset, pool.submit(fetch, offset)))
+                if page:
+                    yield page
+
+        # The inventory grew while it was being read
+        offset = last_offset + page_size
+        while last_size == page_size:
+            page = fetch(offset)
+            last_size = len(page)
+            offset += page_size
+            if page:
+                yield page
+
+    def close(self):
+        """Close the pooled connections."""
+        self.http.close()
+
+
+_sessions = {}
+_sessions_lock = threading.Lock()
+
+
+def shared_session(base_url: str, username: str, password: str,
+                   verify: bool = True) -> CatalystCenterSession:
+    """
+    Return the process-wide session for a controller and user, creating it on first use.
+
+    Scripts that pass tokens and URLs around as plain values use this so every
+    call shares one connection pool and one cached token.
+    """
+    key = (base_url.rstrip('/'), username, verify)
+    with _sessions_lock:
+        session = _sessions.get(key)
+        if session is None or session.password != password:
+            session = CatalystCenterSession(base_url, username, password, verify=verify)
+            _sessions[key] = session
+        return session
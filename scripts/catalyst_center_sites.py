@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+"""
+Catalyst Center Sites
+Site hierarchy planning on top of CatalystCenterSession: the hierarchy is
+fetched once into a SiteIndex with exact lookups by path, id and parent,
+the areas, buildings and floors a CSV asks for are checked against it, and
+the missing ones are created level by level, in parallel within a level,
+waiting on each creation's execution status instead of sleeping between
+rows.
+"""
+
+import csv
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Any
+
+try:
+    from .catalyst_center_session import CatalystCenterError, CatalystCenterSession
+    from .catalyst_center_inventory import SITE_PATH, get_sites
+    from .catalyst_center_tasks import DEFAULT_TIMEOUT, TaskTimeout, backoff_delays
+except ImportError:
+    from catalyst_center_session import CatalystCenterError, CatalystCenterSession
+    from catalyst_center_inventory import SITE_PATH, get_sites
+    from catalyst_center_tasks import DEFAULT_TIMEOUT, TaskTimeout, backoff_delays
+
+logger = logging.getLogger(__name__)
+
+EXECUTION_STATUS_PATH = '/dna/platform/management/business-api/v1/execution-status/{}'
+# CSV columns of the design settings sheets, in hierarchy order below the parent
+HIERARCHY_COLUMNS = (('area', 'HierarchyArea'), ('building', 'HierarchyBldg'), ('floor', 'HierarchyFloor'))
+FLOOR_DEFAULTS = {'rfModel': 'Cubes And Walled Offices', 'width': '100', 'length': '100', 'height': '10'}
+
+
+class SiteIndex:
+    """
+    Site hierarchy indexed by exact siteNameHierarchy, by id and by parent id.
+
+    Built from one site listing; every lookup is a dict access, and sites
+    created afterwards are added in place instead of re-fetching the hierarchy.
+    """
+
+    def __init__(self, sites: Iterable[Dict[str, Any]] = ()):
+        """
+        Build the index.
+
+        Args:
+            sites: Site records ({'id', 'siteNameHierarchy', 'parentId', ...}), e.g. from get_sites()
+        """
+        self.by_path: Dict[str, Dict[str, Any]] = {}
+        self.by_id: Dict[str, Dict[str, Any]] = {}
+        self.by_parent: Dict[Optional[str], List[Dict[str, Any]]] = {}
+        for site in sites:
+            self.add(site)
+
+    @classmethod
+    def fetch(cls, session: CatalystCenterSession) -> 'SiteIndex':
+        """Build the index from one listing of the controller's sites."""
+        return cls(get_sites(session))
+
+    def add(self, site: Dict[str, Any]):
+        """Add a site record, replacing an earlier record of the same id."""
+        previous = self.by_id.get(site['id'])
+        if previous is not None:
+            self.by_path.pop(previous['siteNameHierarchy'], None)
+            self.by_parent.get(previous.get('parentId'), []).remove(previous)
+        self.by_path[site['siteNameHierarchy']] = site
+        self.by_id[site['id']] = site
+        self.by_parent.setdefault(site.get('parentId'), []).append(site)
+
+    def load(self, session: CatalystCenterSession, path: str) -> Optional[Dict[str, Any]]:
+        """Fetch one site by its hierarchy path and add it; returns None when the controller does not have it."""
+        try:
+            sites = session.get(SITE_PATH, {'name': path})['response']
+        except CatalystCenterError as e:
+            if e.status_code != 404:
+                raise
+            return None
+        for site in sites:
+            self.add(site)
+        return self.by_path.get(path)
+
+    def __contains__(self, path: str) -> bool:
+        return path in self.by_path
+
+    def __len__(self) -> int:
+        return len(self.by_id)
+
+    def get(self, path: str) -> Optional[Dict[str, Any]]:
+        """Return the site with exactly this siteNameHierarchy, e.g. 'Global/DevNet', or None."""
+        return self.by_path.get(path)
+
+    def site_id(self, path: str) -> Optional[str]:
+        """Return the id of the site with exactly this siteNameHierarchy, or None."""
+        site = self.by_path.get(path)
+        return site['id'] if site else None
+
+    def find(self, session: CatalystCenterSession, path: str) -> Optional[str]:
+        """
+        Return the id of the site with exactly this siteNameHierarchy, fetching it when
+        the index does not have it (created since the index was built, e.g. by another
+        script); None when the controller does not have it either.
+        """
+        if path not in self.by_path:
+            self.load(session, path)
+        return self.site_id(path)
+
+    def get_by_id(self, site_id: str) -> Optional[Dict[str, Any]]:
+        """Return the site with this id, or None."""
+        return self.by_id.get(site_id)
+
+    def children(self, site_id: Optional[str]) -> List[Dict[str, Any]]:
+        """Return the direct children of a site (None: the top-level sites)."""
+        return list(self.by_parent.get(site_id, []))
+
+    def parent(self, site_id: str) -> Optional[Dict[str, Any]]:
+        """Return the parent of a site, or None for the top level."""
+        site = self.by_id.get(site_id)
+        return self.by_id.get(site.get('parentId')) if site else None
+
+
+def read_hierarchy_csv(path: str) -> List[Dict[str, str]]:
+    """Read the rows of a design settings CSV."""
+    with open(path, 'r', newline='') as f:
+        return list(csv.DictReader(f))
+
+
+def row_sites(row: Dict[str, str]) -> List[Dict[str, Any]]:
+    """
+    Return the sites a CSV row describes, top down.
+
+    Args:
+        row: CSV row with HierarchyParent, HierarchyArea, HierarchyBldg, HierarchyFloor, HierarchyBldgAddress
+
+    Returns:
+        [{'type', 'name', 'parent', 'path', 'address'}, ...] for each non-empty level below the parent
+    """
+    parent = (row.get('HierarchyParent') or 'Global').strip().rstrip('/')
+    sites = []
+    for site_type, column in HIERARCHY_COLUMNS:
+        name = (row.get(column) or '').strip()
+        if not name:
+            continue
+        sites.append({'type': site_type, 'name': name, 'parent': parent, 'path': f"{parent}/{name}",
+                      'address': (row.get('HierarchyBldgAddress') or '').strip() if site_type == 'building' else ''})
+        parent = f"{parent}/{name}"
+    return sites
+
+
+def row_site_path(row: Dict[str, str]) -> str:
+    """Return the hierarchy path of the deepest site a CSV row names, e.g. 'Global/California/San Jose'."""
+    sites = row_sites(row)
+    return sites[-1]['path'] if sites else (row.get('HierarchyParent') or 'Global').strip().rstrip('/')
+
+
+def plan_hierarchy(rows: Iterable[Dict[str, str]], index: SiteIndex) -> List[List[Dict[str, Any]]]:
+    """
+    Work out which sites are missing.
+
+    Args:
+        rows: Design settings CSV rows
+        index: Existing hierarchy
+
+    Returns:
+        Missing sites grouped by depth, shallowest first, each site once; a site's
+        parent is always in the index or in an earlier level
+    """
+    missing: Dict[str, Dict[str, Any]] = {}
+    for row in rows:
+        for site in row_sites(row):
+            if site['path'] not in index and site['path'] not in missing:
+                missing[site['path']] = site
+    levels: Dict[int, List[Dict[str, Any]]] = {}
+    for site in missing.values():
+        levels.setdefault(site['path'].count('/'), []).append(site)
+    return [levels[depth] for depth in sorted(levels)]
+
+
+def site_payload(site: Dict[str, Any]) -> Dict[str, Any]:
+    """Build the create site request for a planned site."""
+    details = {'name': site['name'], 'parentName': site['parent']}
+    if site['type'] == 'building':
+        details['address'] = site['address']
+    elif site['type'] == 'floor':
+        details.update(FLOOR_DEFAULTS)
+    return {'type': site['type'], 'site': {site['type']: details}}
+
+
+def wait_for_execution(session: CatalystCenterSession, execution_id: str,
+                       timeout: float = DEFAULT_TIMEOUT) -> Dict[str, Any]:
+    """
+    Poll a business API execution until it ends, with the task backoff schedule.
+
+    Returns:
+        The final execution status ({'status': 'SUCCESS' | 'FAILURE', 'bapiError', ...})
+
+    Raises:
+        TaskTimeout: If the execution is still running at the deadline
+    """
+    deadline = time.monotonic() + timeout
+    for delay in backoff_delays():
+        time.sleep(max(0.0, min(delay, deadline - time.monotonic())))
+        status = session.get(EXECUTION_STATUS_PATH.format(execution_id))
+        if status.get('status') not in ('IN_PROGRESS', 'PENDING', None):
+            return status
+        if time.monotonic() >= deadline:
+            raise TaskTimeout(f"Execution {execution_id} did not finish within {timeout:g} s", status)
+
+
+def create_site(session: CatalystCenterSession, site: Dict[str, Any],
+                timeout: float = DEFAULT_TIMEOUT) -> Dict[str, Any]:
+    """
+    Create one planned site and wait for it.
+
+    Returns:
+        The planned site plus 'status', 'error' and 'site', the controller's record of the new site
+    """
+    result = dict(site, status='FAILURE', error=None, site=None)
+    try:
+        response = session.post(SITE_PATH, site_payload(site))
+        execution = wait_for_execution(session, response['executionId'], timeout)
+        result.update(status=execution['status'], error=execution.get('bapiError'))
+        if result['status'] == 'SUCCESS':
+            # the execution status carries no site id; one lookup by name gives the new record
+            sites = session.get(SITE_PATH, {'name': site['path']})['response']
+            result['site'] = sites[0] if sites else None
+    except CatalystCenterError as e:
+        result['error'] = str(e)
+    return result
+
+
+def create_hierarchy(session: CatalystCenterSession, rows: Iterable[Dict[str, str]], workers: int = 8,
+                     timeout: float = DEFAULT_TIMEOUT, index: Optional[SiteIndex] = None) -> List[Dict[str, Any]]:
+    """
+    Create every site the rows ask for that does not exist yet.
+
+    The hierarchy is read once; each level (areas, then buildings, then floors,
+    or deeper areas first when parents nest) is created in parallel and
+    finishes before the next level starts. Sites below a failed creation are
+    not attempted.
+
+    Args:
+        session: Controller session
+        rows: Design settings CSV rows
+        workers: Concurrent site creations within a level
+        timeout: Per-site deadline, in seconds
+        index: Existing hierarchy, fetched when not given; created sites are added to it
+
+    Returns:
+        One result per missing site: the planned site plus 'status' (SUCCESS,
+        FAILURE or SKIPPED) and 'error'
+    """
+    if index is None:
+        index = SiteIndex.fetch(session)
+    levels = plan_hierarchy(rows, index)
+    logger.info(f"Site hierarchy: {sum(len(level) for level in levels)} sites to create in {len(levels)} levels")
+
+    results = []
+    failed = set()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for level in levels:
+            blocked = [site for site in level if site['parent'] in failed]
+            ready = [site for site in level if site['parent'] not in failed]
+            for site in blocked:
+                failed.add(site['path'])
+                results.append(dict(site, status='SKIPPED', error=f"Parent {site['parent']} was not created"))
+            for result in pool.map(lambda site: create_site(session, site, timeout), ready):
+                if result['status'] == 'SUCCESS':
+                    if result['site']:
+                        index.add(result['site'])
+                    logger.debug(f"Created {result['type']} {result['path']}")
+                else:
+                    failed.add(result['path'])
+                    logger.debug(f"Failed to create {result['type']} {result['path']}: {result['error']}")
+                results.append(result)
+    return results
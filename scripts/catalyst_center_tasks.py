@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+Catalyst Center Tasks
+Waits for asynchronous Catalyst Center tasks by polling the task API with
+exponential backoff and jitter, returning as soon as the controller reports
+an end time instead of sleeping a fixed interval and reading the task once;
+TaskPoller tracks many tasks at once from a single polling thread.
+"""
+
+import time
+import heapq
+import random
+import logging
+import threading
+from concurrent.futures import Future
+from typing import Dict, List, Optional, Any
+
+try:
+    from .catalyst_center_session import CatalystCenterError, CatalystCenterSession
+except ImportError:
+    from catalyst_center_session import CatalystCenterError, CatalystCenterSession
+
+logger = logging.getLogger(__name__)
+
+TASK_PATH = '/dna/intent/api/v1/task/{}'
+# Default polling schedule: first poll after 0.25 s, growing 1.5x up to 5 s between polls, 10 minutes overall
+DEFAULT_INITIAL_DELAY = 0.25
+DEFAULT_MAX_DELAY = 5.0
+DEFAULT_TIMEOUT = 600.0
+
+
+class TaskTimeout(CatalystCenterError):
+    """A task did not finish before its deadline."""
+
+    def __init__(self, message: str, task: Optional[Dict[str, Any]] = None):
+        super().__init__(message)
+        self.task = task
+
+
+def task_done(task: Dict[str, Any]) -> bool:
+    """Return True once the controller has finished a task, successfully or not."""
+    return bool(task.get('endTime')) or bool(task.get('isError'))
+
+
+def task_id_of(response: Dict[str, Any]) -> str:
+    """Return the task id of an asynchronous API response ({'response': {'taskId': ...}})."""
+    body = response.get('response', response)
+    return body['taskId']
+
+
+def backoff_delays(initial: float = DEFAULT_INITIAL_DELAY, maximum: float = DEFAULT_MAX_DELAY,
+                   factor: float = 1.5, jitter: float = 0.25):
+    """Yield exponentially growing poll delays, capped at {maximum}, each spread by +/- {jitter}."""
+    delay = initial
+    while True:
+        yield delay * random.uniform(1 - jitter, 1 + jitter)
+        delay = min(maximum, delay * factor)
+
+
+def get_task(session: CatalystCenterSession, task_id: str) -> Dict[str, Any]:
+    """Return the current state of a task."""
+    return session.get(TASK_PATH.format(task_id))['response']
+
+
+def wait_for_task(session: CatalystCenterSession, task_id: str, timeout: float = DEFAULT_TIMEOUT,
+                  initial_delay: float = DEFAULT_INITIAL_DELAY,
+                  max_delay: float = DEFAULT_MAX_DELAY) -> Dict[str, Any]:
+    """
+    Poll a task until it ends.
+
+    Args:
+        session: Controller session
+        task_id: Task id, as returned by an asynchronous API call
+        timeout: Overall deadline, in seconds
+        initial_delay: Wait before the first poll, in seconds
+        max_delay: Longest wait between two polls, in seconds
+
+    Returns:
+        The finished task ({'isError', 'progress', 'endTime', 'data', 'failureReason', ...})
+
+    Raises:
+        TaskTimeout: If the task has not ended by the deadline
+        CatalystCenterError: If the controller returns an error status
+    """
+    deadline = time.monotonic() + timeout
+    delays = backoff_delays(initial_delay, max_delay)
+    while True:
+        remaining = deadline - time.monotonic()
+        time.sleep(max(0.0, min(next(delays), remaining)))
+        task = get_task(session, task_id)
+        if task_done(task):
+            return task
+        if time.monotonic() >= deadline:
+            raise TaskTimeout(f"Task {task_id} did not finish within {timeout:g} s "
+                              f"(progress: {task.get('progress')})", task)
+
+
+class TaskPoller:
+    """
+    Shared poller for many concurrent tasks.
+
+    One background thread polls every submitted task on its own backoff
+    schedule and resolves the task's Future when it ends, so callers block on
+    futures instead of each running a polling loop against the controller.
+    """
+
+    def __init__(self, session: CatalystCenterSession, timeout: float = DEFAULT_TIMEOUT,
+                 initial_delay: float = DEFAULT_INITIAL_DELAY, max_delay: float = DEFAULT_MAX_DELAY):
+        """
+        Initialize and start the poller.
+
+        Args:
+            session: Controller session
+            timeout: Default per-task deadline, in seconds
+            initial_delay: Wait before a task's first poll, in seconds
+            max_delay: Longest wait between two polls of one task, in seconds
+        """
+        self.session = session
+        self.timeout = timeout
+        self.initial_delay = initial_delay
+        self.max_delay = max_delay
+        self.condition = threading.Condition()
+        # (next poll time, sequence, task id, future, delay generator, deadline)
+        self.schedule: List[tuple] = []
+        self.sequence = 0
+        self.polls = 0
+        self.closed = False
+        self.thread = threading.Thread(target=self.run, name='task-poller', daemon=True)
+        self.thread.start()
+
+    def submit(self, task_id: str, timeout: Optional[float] = None) -> Future:
+        """Start tracking a task; the returned Future resolves to the finished task or raises TaskTimeout."""
+        future = Future()
+        delays = backoff_delays(self.initial_delay, self.max_delay)
+        now = time.monotonic()
+        with self.condition:
+            if self.closed:
+                raise RuntimeError('TaskPoller is closed')
+            self.sequence += 1
+            heapq.heappush(self.schedule, (now + next(delays), self.sequence, task_id, future, delays,
+                                           now + (timeout or self.timeout)))
+            self.condition.notify()
+        return future
+
+    def wait(self, task_id: str, timeout: Optional[float] = None) -> Dict[str, Any]:
+        """Track a task and block until it ends; see wait_for_task()."""
+        return self.submit(task_id, timeout).result()
+
+    def run(self):
+        """Polling loop: poll the tasks that are due, reschedule the ones still running."""
+        while True:
+            with self.condition:
+                while not self.closed and (not self.schedule or self.schedule[0][0] > time.monotonic()):
+                    self.condition.wait(self.schedule[0][0] - time.monotonic() if self.schedule else None)
+                if self.closed:
+                    return
+                now = time.monotonic()
+                due = []
+                while self.schedule and self.schedule[0][0] <= now:
+                    due.append(heapq.heappop(self.schedule))
+
+            for entry in due:
+                try:
+                    self.poll(entry)
+                except Exception as e:
+                    # one bad task must not stop the thread every other task depends on
+                    if not entry[3].done():
+                        entry[3].set_exception(e)
+
+    def poll(self, entry: tuple):
+        """Poll one due task: resolve its future when it ended, timed out or the poller closed, else reschedule."""
+        _, sequence, task_id, future, delays, deadline = entry
+        task = get_task(self.session, task_id)
+        self.polls += 1
+        if task_done(task):
+            future.set_result(task)
+            return
+        if time.monotonic() >= deadline:
+            future.set_exception(TaskTimeout(f"Task {task_id} did not finish in time "
+                                             f"(progress: {task.get('progress')})", task))
+            return
+        with self.condition:
+            if not self.closed:
+                heapq.heappush(self.schedule, (min(time.monotonic() + next(delays), deadline),
+                                               sequence, task_id, future, delays, deadline))
+                return
+        # close() ran while this batch was being polled and will not see the entry again
+        future.set_exception(TaskTimeout(f"Task {task_id} abandoned: poller closed", task))
+
+    def close(self):
+        """Stop the polling thread; tasks still pending fail with TaskTimeout."""
+        with self.condition:
+            self.closed = True
+            pending, self.schedule = self.schedule, []
+            self.condition.notify()
+        for entry in pending:
+            entry[3].set_exception(TaskTimeout(f"Task {entry[2]} abandoned: poller closed"))
+        self.thread.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,469 @@
+#!/usr/bin/env python3
+"""
+Catalyst Center Templates
+Template programmer operations on top of CatalystCenterSession: projects,
+templates, commits and deployments, each waiting for its task to end through
+the backoff poller instead of a fixed sleep; a name -> id index of projects
+and templates loaded once per run; an idempotent template sync that
+only updates and commits templates whose content changed; and a scheduler running the
+deployments of independent devices concurrently, merging every target of a
+template into one deploy request.
+"""
+
+import os
+import re
+import json
+import hashlib
+import logging
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Any
+
+try:
+    from .catalyst_center_session import CatalystCenterError, CatalystCenterSession
+    from .catalyst_center_tasks import DEFAULT_TIMEOUT, TaskPoller, TaskTimeout, task_id_of, wait_for_task
+except ImportError:
+    from catalyst_center_session import CatalystCenterError, CatalystCenterSession
+    from catalyst_center_tasks import DEFAULT_TIMEOUT, TaskPoller, TaskTimeout, task_id_of, wait_for_task
+
+logger = logging.getLogger(__name__)
+
+PROJECT_PATH = '/dna/intent/api/v1/template-programmer/project'
+PROJECT_TEMPLATE_PATH = '/dna/intent/api/v1/template-programmer/project/{}/template'
+TEMPLATE_PATH = '/dna/intent/api/v1/template-programmer/template'
+TEMPLATE_ID_PATH = '/dna/intent/api/v1/template-programmer/template/{}'
+TEMPLATE_VERSION_PATH = '/dna/intent/api/v1/template-programmer/template/version'
+DEPLOY_PATH = '/dna/intent/api/v2/template-programmer/template/deploy'
+DEPLOY_STATUS_PATH = '/dna/intent/api/v1/template-programmer/template/deploy/status/{}'
+
+
+def run_task(session: CatalystCenterSession, response: Dict[str, Any], action: str,
+             timeout: float = DEFAULT_TIMEOUT, raise_on_error: bool = True) -> Dict[str, Any]:
+    """
+    Wait for the task of an asynchronous call and return it.
+
+    Raises:
+        CatalystCenterError: If the task failed and {raise_on_error} is set
+        TaskTimeout: If the task has not ended within {timeout} seconds
+    """
+    task = wait_for_task(session, task_id_of(response), timeout=timeout)
+    if task.get('isError') and raise_on_error:
+        raise CatalystCenterError(f"{action} failed: {task.get('failureReason') or task.get('progress')}")
+    return task
+
+
+def get_project(session: CatalystCenterSession, name: str) -> Optional[Dict[str, Any]]:
+    """Return the project named {name} with its templates, or None."""
+    projects = session.get(PROJECT_PATH, {'name': name})
+    return projects[0] if projects else None
+
+
+def get_project_by_id(session: CatalystCenterSession, project_id: str) -> Optional[Dict[str, Any]]:
+    """Return the project with id {project_id} with its templates, or None."""
+    return next((project for project in session.get(PROJECT_PATH) if project['id'] == project_id), None)
+
+
+def create_project(session: CatalystCenterSession, name: str, timeout: float = DEFAULT_TIMEOUT) -> Dict[str, Any]:
+    """Create a project, wait for it and return it."""
+    run_task(session, session.post(PROJECT_PATH, {'name': name}), f"Create project {name}", timeout)
+    return get_project(session, name)
+
+
+def create_template(session: CatalystCenterSession, project_id: str, payload: Dict[str, Any],
+                    timeout: float = DEFAULT_TIMEOUT) -> Dict[str, Any]:
+    """Create a template in a project and return the finished task (its 'data' is the template id)."""
+    return run_task(session, session.post(PROJECT_TEMPLATE_PATH.format(project_id), payload),
+                    f"Create template {payload.get('name')}", timeout)
+
+
+def delete_template(session: CatalystCenterSession, template_id: str,
+                    timeout: float = DEFAULT_TIMEOUT) -> Dict[str, Any]:
+    """Delete a template and return the finished task."""
+    return run_task(session, session.delete(TEMPLATE_ID_PATH.format(template_id)),
+                    f"Delete template {template_id}", timeout)
+
+
+def commit_template(session: CatalystCenterSession, template_id: str, comments: str,
+                    timeout: float = DEFAULT_TIMEOUT) -> Dict[str, Any]:
+    """Commit (version) a template and return the finished task."""
+    return run_task(session, session.post(TEMPLATE_VERSION_PATH, {'comments': comments, 'templateId': template_id}),
+                    f"Commit template {template_id}", timeout)
+
+
+class TemplateIndex:
+    """
+    Project and template name -> id index for one run.
+
+    Built from a single project listing and kept current by the create and
+    delete helpers below, so lookups are dict reads instead of a project fetch
+    and a linear template scan each. With {cache_path} the index is persisted as
+    JSON and reused by later runs; that assumes the projects are only changed
+    through this index, a stale template id is recovered by sync_template().
+    """
+
+    def __init__(self, session: CatalystCenterSession, cache_path: Optional[str] = None):
+        """
+        Initialize the index, loading it from {cache_path} or the controller.
+
+        Args:
+            session: Controller session
+            cache_path: JSON file to persist the index to, None to keep it in memory
+        """
+        self.session = session
+        self.cache_path = cache_path
+        # project name -> {'id': project id, 'templates': {template name: template id}}
+        self.projects: Dict[str, Dict[str, Any]] = {}
+        if cache_path and os.path.exists(cache_path):
+            with open(cache_path, 'r') as f:
+                self.projects = json.load(f)
+            logger.info(f"Loaded template index of {len(self.projects)} projects from {cache_path}")
+        else:
+            self.refresh()
+
+    def refresh(self):
+        """Rebuild the whole index from one project listing."""
+        self.projects = {project['name']: self.entry(project) for project in self.session.get(PROJECT_PATH)}
+        self.save()
+
+    @staticmethod
+    def entry(project: Dict[str, Any]) -> Dict[str, Any]:
+        return {'id': project['id'],
+                'templates': {template['name']: template['id'] for template in project.get('templates') or []}}
+
+    def save(self):
+        """Write the index to its cache file, if it has one."""
+        if self.cache_path:
+            tmp_path = f"{self.cache_path}.tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump(self.projects, f, indent=2)
+            os.replace(tmp_path, self.cache_path)
+
+    def project_id(self, project_name: str) -> Optional[str]:
+        """Return the id of a project, or None."""
+        project = self.projects.get(project_name)
+        return project['id'] if project else None
+
+    def templates(self, project_name: str) -> Dict[str, str]:
+        """Return template name -> id for a project (empty for an unknown project)."""
+        return dict(self.projects.get(project_name, {}).get('templates', {}))
+
+    def template_id(self, project_name: str, template_name: str) -> Optional[str]:
+        """Return the id of a template, or None."""
+        return self.projects.get(project_name, {}).get('templates', {}).get(template_name)
+
+    def ensure_project(self, project_name: str, timeout: float = DEFAULT_TIMEOUT) -> str:
+        """Return the id of a project, creating it (and indexing it) when it does not exist."""
+        if project_name not in self.projects:
+            self.projects[project_name] = self.entry(create_project(self.session, project_name, timeout))
+            self.save()
+        return self.projects[project_name]['id']
+
+    def add_template(self, project_name: str, template_name: str, template_id: str):
+        """Record a template created in a project."""
+        self.projects[project_name]['templates'][template_name] = template_id
+        self.save()
+
+    def delete_template(self, project_name: str, template_name: str, timeout: float = DEFAULT_TIMEOUT):
+        """Delete a template from the controller and the index."""
+        template_id = self.projects[project_name]['templates'].pop(template_name)
+        delete_template(self.session, template_id, timeout)
+        self.save()
+
+
+def template_digest(template: Dict[str, Any]) -> str:
+    """
+    Hash what a deployment of the template depends on: its content and its parameters.
+
+    Templates declared without parameters get theirs derived from the content by the
+    controller, so only the content counts for them.
+    """
+    params = sorted((param.get('parameterName'), param.get('dataType'), param.get('defaultValue'),
+                     bool(param.get('required'))) for param in template.get('templateParams') or [])
+    key = {'templateContent': template.get('templateContent') or ''}
+    if params:
+        key['templateParams'] = params
+    return hashlib.sha256(json.dumps(key, sort_keys=True).encode()).hexdigest()
+
+
+def needs_commit(template: Dict[str, Any]) -> bool:
+    """Return True when a template has no committed version or was edited after its last commit."""
+    versions = template.get('versionsInfo') or []
+    if not versions:
+        return True
+    last_commit = max(version.get('versionTime') or 0 for version in versions)
+    return (template.get('lastUpdateTime') or 0) > last_commit
+
+
+def update_template(session: CatalystCenterSession, template: Dict[str, Any],
+                    timeout: float = DEFAULT_TIMEOUT) -> Dict[str, Any]:
+    """Update a template in place (the full template body, with its 'id') and return the finished task."""
+    return run_task(session, session.put(TEMPLATE_PATH, template), f"Update template {template.get('name')}", timeout)
+
+
+def sync_template(session: CatalystCenterSession, project_id: str, payload: Dict[str, Any],
+                  template_id: Optional[str] = None, comments: str = 'committed',
+                  timeout: float = DEFAULT_TIMEOUT) -> Dict[str, Any]:
+    """
+    Make the controller's template match {payload}, doing only the work needed.
+
+    A missing template is created and committed. An existing one is compared with
+    the local one by template_digest(): unchanged content costs one GET and no
+    commit (unless the controller holds uncommitted edits); changed content is
+    updated in place and committed, keeping the template id and its history.
+
+    Args:
+        session: Controller session
+        project_id: Project of the template
+        payload: Template body as for create_template(), with 'name' and 'templateContent'
+        template_id: Id of the existing template of that name, None if there is none
+        comments: Commit comment
+        timeout: Per-task deadline, in seconds
+
+    Returns:
+        {'name', 'id', 'action': 'created', 'updated' or 'unchanged', 'committed': bool,
+        'language': of the controller's template record, else of {payload}, None when neither says}
+    """
+    name = payload['name']
+    current = None
+    if template_id is not None:
+        try:
+            current = session.get(TEMPLATE_ID_PATH.format(template_id))
+        except CatalystCenterError as e:
+            # a stale id, e.g. from a persisted TemplateIndex: the template is gone, create it again
+            if e.status_code != 404:
+                raise
+            logger.info(f"Template {name}: id {template_id} no longer exists")
+            template_id = None
+    if template_id is None:
+        task = create_template(session, project_id, payload, timeout)
+        template_id = task.get('data')
+        if not template_id:
+            template_id = next(template['id'] for template in get_project_by_id(session, project_id)['templates']
+                               if template['name'] == name)
+        action = 'created'
+        commit = True
+    else:
+        if template_digest(current) == template_digest(payload):
+            action = 'unchanged'
+            commit = needs_commit(current)
+        else:
+            update_template(session, dict(current, **payload, id=template_id), timeout)
+            action = 'updated'
+            commit = True
+    if commit:
+        commit_template(session, template_id, comments, timeout)
+    logger.info(f"Template {name}: {action}{', committed' if commit else ''}")
+    language = (current or {}).get('language') or payload.get('language')
+    return {'name': name, 'id': template_id, 'action': action, 'committed': commit, 'language': language}
+
+
+def deploy_template(session: CatalystCenterSession, template_id: str, target_info: List[Dict[str, Any]],
+                    timeout: float = DEFAULT_TIMEOUT) -> Dict[str, Any]:
+    """
+    Deploy a template and wait for the deployment task.
+
+    Args:
+        session: Controller session
+        template_id: Committed template id
+        target_info: Deployment targets, e.g. [{'id': '10.1.1.1', 'type': 'MANAGED_DEVICE_IP'}]
+        timeout: Overall deadline, in seconds
+
+    Returns:
+        The finished task; 'isError' tells whether the deployment failed
+    """
+    return run_task(session, submit_deployment(session, template_id, target_info),
+                    f"Deploy template {template_id}", timeout, raise_on_error=False)
+
+
+def submit_deployment(session: CatalystCenterSession, template_id: str,
+                      target_info: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Start a template deployment and return the task-accepted response, without waiting."""
+    return session.post(DEPLOY_PATH, {'forcePushTemplate': True, 'targetInfo': target_info,
+                                      'templateId': template_id})
+
+
+def target_entry(job: Dict[str, Any]) -> Dict[str, Any]:
+    """Build the targetInfo entry of one (device, template) job."""
+    return {'id': job['device'], 'type': job.get('target_type', 'MANAGED_DEVICE_IP'),
+            'params': job.get('params') or {}}
+
+
+def deployment_id_of(task: Dict[str, Any]) -> Optional[str]:
+    """Return the deployment id of a finished deploy task ('Template Deployment Id: ...' progress, or its data)."""
+    match = re.search(r'Id:\s*([0-9a-fA-F-]{36})', task.get('progress') or '')
+    return match.group(1) if match else task.get('data')
+
+
+def device_statuses(session: CatalystCenterSession, task: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """
+    Return the per-device results of a finished deployment task.
+
+    Returns:
+        Target id (management IP and device id both map) -> {'status', 'detailedStatusMessage', ...};
+        empty when the task carries no deployment id
+    """
+    deployment_id = deployment_id_of(task)
+    if not deployment_id:
+        return {}
+    statuses = {}
+    for device in session.get(DEPLOY_STATUS_PATH.format(deployment_id)).get('devices') or []:
+        for key in ('ipAddress', 'deviceId'):
+            if device.get(key):
+                statuses[device[key]] = device
+    return statuses
+
+
+class DeploymentScheduler:
+    """
+    Runs (device, template) deployments concurrently across devices.
+
+    Deployments for one device run in the order given, one at a time; different
+    devices proceed in parallel with at most {max_in_flight} deployments
+    submitted at once. Every deployment task is tracked by one shared
+    TaskPoller, and {on_complete} is called with each result as it finishes.
+
+    With {grouped}, all jobs at the same position of their device's sequence
+    that use the same template become one deploy request with one targetInfo
+    entry (and its own params) per device, and the per-device statuses of the
+    deployment are fanned back out to the jobs, so requests scale with
+    templates instead of devices.
+
+    A job that already carries a 'task_id' is not submitted again: the
+    scheduler reattaches to that task, e.g. when resuming from a journal.
+    """
+
+    def __init__(self, session: CatalystCenterSession, max_in_flight: int = 8,
+                 poller: Optional[TaskPoller] = None, timeout: float = DEFAULT_TIMEOUT,
+                 on_complete: Optional[Callable[[Dict[str, Any]], None]] = None, grouped: bool = False,
+                 on_submit: Optional[Callable[[List[Dict[str, Any]], str], None]] = None):
+        """
+        Initialize the scheduler.
+
+        Args:
+            session: Controller session
+            max_in_flight: Deployments submitted and not yet finished, at most
+            poller: Shared task poller (default: one owned by the scheduler)
+            timeout: Per-deployment deadline, in seconds
+            on_complete: Called from a worker thread with every finished result
+            grouped: Merge the targets of a template into one deploy request
+            on_submit: Called with the jobs of every deploy request and its task id, once submitted
+        """
+        self.session = session
+        self.max_in_flight = max_in_flight
+        self.poller = poller
+        self.timeout = timeout
+        self.on_complete = on_complete
+        self.grouped = grouped
+        self.on_submit = on_submit
+
+    def submit(self, group: List[Dict[str, Any]]) -> str:
+        """Submit one deploy request for a group of jobs sharing a template and return its task id."""
+        if group[0].get('task_id'):
+            return group[0]['task_id']
+        task_id = task_id_of(submit_deployment(self.session, group[0]['template_id'],
+                                               [target_entry(job) for job in group]))
+        if self.on_submit:
+            self.on_submit(group, task_id)
+        return task_id
+
+    def deploy(self, poller: TaskPoller, job: Dict[str, Any]) -> Dict[str, Any]:
+        """Submit one deployment, wait for its task and return the result."""
+        result = dict(job, task=None, status='FAILURE', error=None)
+        try:
+            task = poller.wait(self.submit([job]), self.timeout)
+            result.update(task=task, status='FAILURE' if task.get('isError') else 'SUCCESS',
+                          error=task.get('failureReason'))
+        except TaskTimeout as e:
+            result.update(task=e.task, status='TIMEOUT', error=str(e))
+        except CatalystCenterError as e:
+            result.update(error=str(e))
+        if self.on_complete:
+            self.on_complete(result)
+        return result
+
+    def deploy_group(self, poller: TaskPoller, group: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Deploy one template to several targets in one request and split the outcome per target."""
+        results = [dict(job, task=None, status='FAILURE', error=None) for job in group]
+        try:
+            task = poller.wait(self.submit(group), self.timeout)
+            statuses = device_statuses(self.session, task)
+            for result in results:
+                device = statuses.get(result['device'])
+                if device is None:
+                    # no per-device breakdown, the task outcome applies to every target
+                    result.update(status='FAILURE' if task.get('isError') else 'SUCCESS',
+                                  error=task.get('failureReason'))
+                else:
+                    result.update(status='SUCCESS' if device.get('status') == 'SUCCESS' else 'FAILURE',
+                                  error=None if device.get('status') == 'SUCCESS'
+                                  else device.get('detailedStatusMessage') or device.get('status'))
+                result['task'] = task
+        except TaskTimeout as e:
+            for result in results:
+                result.update(task=e.task, status='TIMEOUT', error=str(e))
+        except CatalystCenterError as e:
+            for result in results:
+                result.update(error=str(e))
+        if self.on_complete:
+            for result in results:
+                self.on_complete(result)
+        return results
+
+    def run_grouped(self, jobs: List[Dict[str, Any]], poller: TaskPoller) -> List[Dict[str, Any]]:
+        """Deploy level by level: a device's n-th template only starts after its (n-1)-th finished."""
+        positions = {}
+        levels: List[OrderedDict] = []
+        for index, job in enumerate(jobs):
+            level = positions.get(job['device'], 0)
+            positions[job['device']] = level + 1
+            if level == len(levels):
+                levels.append(OrderedDict())
+            levels[level].setdefault((job['template_id'], job.get('task_id')), []).append(index)
+
+        results: List[Optional[Dict[str, Any]]] = [None] * len(jobs)
+        with ThreadPoolExecutor(max_workers=self.max_in_flight) as pool:
+            for level in levels:
+                groups = list(level.values())
+                for indexes, group_results in zip(groups, pool.map(
+                        lambda indexes: self.deploy_group(poller, [jobs[index] for index in indexes]), groups)):
+                    for index, result in zip(indexes, group_results):
+                        results[index] = result
+        logger.info(f"Deployed {len(jobs)} templates with {sum(len(level) for level in levels)} deploy requests")
+        return results
+
+    def run(self, jobs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Deploy every job.
+
+        Args:
+            jobs: Deployments in order, each {'device', 'template_id', ...}; 'device' is the
+                target id (management IP unless 'target_type' says otherwise), optional
+                'params' are the template parameters, 'task_id' reattaches to a deployment
+                submitted earlier, any other keys are passed through
+
+        Returns:
+            One result per job, in the order given: the job plus 'task', 'status'
+            (SUCCESS, FAILURE or TIMEOUT) and 'error'
+        """
+        chains = OrderedDict()
+        for index, job in enumerate(jobs):
+            chains.setdefault(job['device'], []).append(index)
+        results: List[Optional[Dict[str, Any]]] = [None] * len(jobs)
+        poller = self.poller or TaskPoller(self.session, timeout=self.timeout)
+
+        def run_chain(indexes):
+            for index in indexes:
+                results[index] = self.deploy(poller, jobs[index])
+
+        try:
+            if self.grouped:
+                results = self.run_grouped(jobs, poller)
+            else:
+                with ThreadPoolExecutor(max_workers=self.max_in_flight) as pool:
+                    list(pool.map(run_chain, chains.values()))
+        finally:
+            if self.poller is None:
+                poller.close()
+        failed = sum(result['status'] != 'SUCCESS' for result in results)
+        logger.info(f"Deployed {len(jobs)} templates to {len(chains)} devices, {failed} not successful")
+        return results
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Deployment Journal
+Append-only JSONL record of template deployments: every submitted task id and
+every final status, written as they happen, so an interrupted rollout can be
+resumed by reattaching to the tasks still in flight and skipping the
+device/template deployments that already finished with the same template
+content.
+"""
+
+import os
+import json
+import time
+import logging
+import threading
+from typing import Dict, List, Optional, Tuple, Any
+
+logger = logging.getLogger(__name__)
+
+# statuses of a finished pair that a resumed run does not deploy again
+DONE_STATUSES = ('SUCCESS', 'SKIPPED')
+
+
+def journal_key(job: Dict[str, Any]) -> Tuple[str, str, Optional[str]]:
+    """
+    Return the (device, template id, template digest) a journal record is about.
+
+    The digest (see catalyst_center_templates.template_digest()) tells apart two
+    versions of one template, so a template edited between two runs is deployed
+    again on resume; records without one never match a job with one.
+    """
+    return job['device'], job['template_id'], job.get('digest')
+
+
+class DeploymentJournal:
+    """
+    Deployment journal in a JSONL file.
+
+    Records are {'time', 'event', ...}: 'start' opens a run, 'submitted' carries
+    the device, template id, template digest and task id of a deploy request,
+    'completed' the final status and error. Only the records of the latest run count when
+    resuming.
+    """
+
+    def __init__(self, path: str):
+        """
+        Initialize the journal.
+
+        Args:
+            path: JSONL file, created on first write
+        """
+        self.path = path
+        self.lock = threading.Lock()
+        self.file = None
+
+    def write(self, record: Dict[str, Any]):
+        """Append one record and flush it, so it survives the process."""
+        with self.lock:
+            if self.file is None:
+                os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+                self.file = open(self.path, 'a', encoding='utf-8')
+            self.file.write(json.dumps(dict(record, time=time.time())) + '\n')
+            self.file.flush()
+
+    def start(self):
+        """Open a new run; earlier records are ignored by a later resume."""
+        self.write({'event': 'start'})
+
+    def submitted(self, jobs: List[Dict[str, Any]], task_id: str):
+        """Record a deploy request and the task id it returned, for every target it covers."""
+        for job in jobs:
+            self.write({'event': 'submitted', 'device': job['device'], 'template_id': job['template_id'],
+                        'digest': job.get('digest'), 'task_id': task_id})
+
+    def completed(self, result: Dict[str, Any]):
+        """Record the final status of a deployment."""
+        self.write({'event': 'completed', 'device': result['device'], 'template_id': result['template_id'],
+                    'digest': result.get('digest'), 'status': result['status'], 'error': result.get('error')})
+
+    def state(self) -> Dict[Tuple[str, str, Optional[str]], Dict[str, Any]]:
+        """
+        Return the latest record per journal_key() of the latest run.
+
+        A torn last line, from a process killed mid-write, is ignored.
+        """
+        state = {}
+        if not os.path.exists(self.path):
+            return state
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                if record['event'] == 'start':
+                    state = {}
+                else:
+                    state[journal_key(record)] = record
+        return state
+
+    def resume(self, jobs: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """
+        Split a rollout into what is left to do and what already finished.
+
+        Args:
+            jobs: The full rollout, see DeploymentScheduler.run()
+
+        Returns:
+            (pending, done): pending jobs, those still in flight copied with the
+            'task_id' to reattach to; done jobs, copied with their recorded
+            'status' and 'error'
+        """
+        state = self.state()
+        pending, done = [], []
+        for job in jobs:
+            record = state.get(journal_key(job))
+            if record is None:
+                pending.append(job)
+            elif record['event'] == 'submitted':
+                pending.append(dict(job, task_id=record['task_id']))
+            elif record['status'] in DONE_STATUSES:
+                done.append(dict(job, status=record['status'], error=record.get('error')))
+            else:
+                pending.append(job)
+        logger.info(f"Journal {self.path}: {len(done)} of {len(jobs)} deployments done, "
+                    f"{sum('task_id' in job for job in pending)} in flight")
+        return pending, done
+
+    def close(self):
+        """Close the journal file."""
+        with self.lock:
+            if self.file is not None:
+                self.file.close()
+                self.file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,343 @@
+#!/usr/bin/env python3
+"""
+Synthetic Template Corpus Generator
+Generates YAML and Catalyst Center project-JSON templates at scale, modeled on
+templates/network/basic_switch_config.yaml and the exports in templates/JINJA2,
+so catalog, search and render performance can be tested offline.
+"""
+
+import sys
+import json
+import uuid
+import random
+import logging
+import argparse
+from pathlib import Path
+from typing import Dict, List, Optional, Any
+
+import yaml
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+CATEGORIES = ['network', 'security', 'automation', 'monitoring', 'community']
+
+# Parameter count and Jinja block count ranges per template size
+SIZE_PROFILES = {
+    'small': {'params': (0, 3), 'blocks': (2, 6)},
+    'medium': {'params': (3, 10), 'blocks': (6, 20)},
+    'large': {'params': (10, 30), 'blocks': (20, 80)}
+}
+DEFAULT_DISTRIBUTION = {'small': 0.6, 'medium': 0.3, 'large': 0.1}
+
+DEVICE_TYPES = [
+    {'productFamily': 'Switches and Hubs', 'productSeries': 'Cisco Catalyst 9300 Series Switches'},
+    {'productFamily': 'Switches and Hubs', 'productSeries': 'Cisco Catalyst 9200 Series Switches'},
+    {'productFamily': 'Switches and Hubs', 'productSeries': 'Cisco Catalyst 9500 Series Switches'},
+    {'productFamily': 'Switches and Hubs'},
+    {'productFamily': 'Routers', 'productSeries': 'Cisco Catalyst 8000V Edge Software'},
+    {'productFamily': 'Routers'},
+    {'productFamily': 'Wireless Controller', 'productSeries': 'Cisco Catalyst 9800 Wireless Controllers'}
+]
+
+TOPICS = ['AAA', 'ACL', 'AutoName', 'PortAssign', 'Stacking', 'SysMgmt', 'USR', 'VLAN', 'Interfaces',
+          'IBNS2.0', 'SNMP', 'Logging', 'NTP', 'QoS', 'SSID', 'RF', 'Anchor', 'PnP', 'Onboarding', 'Harden']
+PREFIXES = ['Platinum', 'Titanium', 'Aluminum', 'DCLOUD', 'Campus', 'Branch', 'Wifi', 'DNAC-SAMPLE']
+TAG_NAMES = ['CATC-TEMPLATE-BUNDLE', 'DAYN', 'ONBOARDING', 'WIRELESS', 'SECURITY', 'LAB', 'PRODUCTION']
+AUTHORS = ['admin', 'Jenkins', 'Community', 'kebaldwi', 'netops']
+
+# (parameterName, dataType, default) pool for generated templateParams
+PARAMETER_POOL = [
+    ('hostname', 'STRING', 'SW-001'),
+    ('management_vlan', 'INTEGER', 99),
+    ('management_ip', 'IPADDRESS', '192.168.1.100'),
+    ('management_mask', 'STRING', '255.255.255.0'),
+    ('default_gateway', 'IPADDRESS', '192.168.1.1'),
+    ('data_vlan', 'INTEGER', 10),
+    ('voice_vlan', 'INTEGER', 20),
+    ('ap_vlan', 'INTEGER', 30),
+    ('ntp_server', 'IPADDRESS', '198.18.133.1'),
+    ('syslog_server', 'IPADDRESS', '198.18.133.27'),
+    ('snmp_community', 'STRING', 'public'),
+    ('domain_name', 'STRING', 'dcloud.cisco.com'),
+    ('radius_server', 'IPADDRESS', '198.18.133.27'),
+    ('radius_key', 'STRING', 'C1sco12345'),
+    ('uplink_interface', 'STRING', 'GigabitEthernet1/1/1'),
+    ('access_ports', 'STRING', 'GigabitEthernet1/0/1-24'),
+    ('site_code', 'STRING', 'PDX'),
+    ('floor', 'INTEGER', 1),
+    ('stack_priority', 'INTEGER', 15),
+    ('ssid_name', 'STRING', 'CORP'),
+]
+
+
+def jinja_blocks(params: List[str], catalyst: bool = False) -> List[List[str]]:
+    """
+    Return the Jinja snippets a template body is assembled from.
+
+    Args:
+        params: Parameter names the snippets refer to
+        catalyst: Include snippets that only render on Catalyst Center (custom filters, __device)
+
+    Returns:
+        List of snippets, each a list of lines
+    """
+    name = params[0] if params else 'hostname'
+    other = params[1] if len(params) > 1 else name
+    blocks = [
+        ['{# ' + name + ' configuration #}', 'hostname {{ ' + name + ' }}', '!'],
+        ['{% if ' + name + ' is defined %}', '  description {{ ' + name + ' }}', '{% endif %}', '!'],
+        ['{% for vlan in range(10, 20) %}', 'vlan {{ vlan }}', '  name VLAN-{{ vlan }}-{{ ' + other + ' }}',
+         '{% endfor %}', '!'],
+        ['{% macro access_interface(vlan) %}', '  switchport mode access', '  switchport access vlan {{ vlan }}',
+         '  spanning-tree portfast', '{% endmacro %}', '!'],
+        ['interface Vlan{{ ' + other + ' }}', '  ip address {{ ' + name + ' }} 255.255.255.0', '  no shutdown', '!'],
+        ['{% for interface in __interface if interface.portType == "Ethernet Port" %}',
+         'interface {{ interface.portName }}', '  description {{ ' + name + ' }}', '{% endfor %}', '!'],
+        ['ip access-list extended ACL-{{ ' + name + ' }}', '  permit ip any host {{ ' + other + ' }}',
+         '  deny ip any any log', '!'],
+        ['ntp server {{ ' + other + ' }}', 'logging host {{ ' + name + ' }}', 'logging trap informational', '!'],
+        ['aaa new-model', 'radius server {{ ' + name + ' }}', '  address ipv4 {{ ' + other + ' }}', '!'],
+    ]
+    if catalyst:
+        blocks.append(['{% set StackCount = __device.platformId | split(",") %}',
+                       '{% if StackCount | length > 1 %}', '  switch 1 priority {{ ' + other + ' }}',
+                       '{% endif %}', '!'])
+    return blocks
+
+
+def pick_profile(rng: random.Random, distribution: Dict[str, float]) -> str:
+    """Pick a size profile name according to the configured distribution."""
+    return rng.choices(list(distribution), weights=list(distribution.values()))[0]
+
+
+def make_parameters(rng: random.Random, profile: str) -> List[tuple]:
+    """Pick the (name, dataType, default) parameters for one template."""
+    low, high = SIZE_PROFILES[profile]['params']
+    count = rng.randint(low, high)
+    chosen = rng.sample(PARAMETER_POOL, min(count, len(PARAMETER_POOL)))
+    for index in range(len(chosen), count):
+        chosen.append((f'custom_param_{index}', 'STRING', f'value-{index}'))
+    return chosen
+
+
+def make_body(rng: random.Random, profile: str, param_names: List[str], catalyst: bool = False) -> List[str]:
+    """Assemble a Jinja template body as a list of lines."""
+    low, high = SIZE_PROFILES[profile]['blocks']
+    lines = []
+    for _ in range(rng.randint(low, high)):
+        names = rng.sample(param_names, min(2, len(param_names))) if param_names else []
+        lines.extend(rng.choice(jinja_blocks(names, catalyst)))
+    return lines
+
+
+def make_name(rng: random.Random, index: int) -> str:
+    """Build a template name in the style of the community exports."""
+    return f"{rng.choice(PREFIXES)}-{rng.choice(TOPICS)}-Template-{index:06d}"
+
+
+def make_yaml_template(rng: random.Random, index: int, category: str, profile: str) -> Dict[str, Any]:
+    """
+    Build a template in the format of templates/network/basic_switch_config.yaml.
+
+    Args:
+        rng: Random generator
+        index: Template sequence number, used for unique names
+        category: Template category
+        profile: Size profile name
+
+    Returns:
+        Template data ready for yaml.dump
+    """
+    parameters = make_parameters(rng, profile)
+    type_names = {'STRING': 'string', 'INTEGER': 'integer', 'IPADDRESS': 'string'}
+    return {
+        'template_name': make_name(rng, index).replace('-', ' '),
+        'template_description': f"Synthetic {profile} {category} template",
+        'template_type': category,
+        'version': f"1.{rng.randint(0, 9)}",
+        'author': rng.choice(AUTHORS),
+        'tags': rng.sample(TAG_NAMES, rng.randint(0, 3)),
+        'parameters': [
+            {
+                'name': name,
+                'type': type_names[data_type],
+                'description': f"{name.replace('_', ' ').title()}",
+                'required': True,
+                'default': default
+            }
+            for name, data_type, default in parameters
+        ],
+        'configuration': make_body(rng, profile, [name for name, _, _ in parameters])
+    }
+
+
+def make_catalyst_template(rng: random.Random, index: int, profile: str,
+                           project_name: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Build a template in the Catalyst Center export format used by templates/JINJA2.
+
+    Args:
+        rng: Random generator
+        index: Template sequence number, used for unique names
+        profile: Size profile name
+        project_name: Name of the containing project, if any
+
+    Returns:
+        Template data as exported by Catalyst Center
+    """
+    parameters = make_parameters(rng, profile)
+    content = '\n'.join(make_body(rng, profile, [name for name, _, _ in parameters], catalyst=True)) + '\n'
+    template_id = str(uuid.UUID(int=rng.getrandbits(128)))
+    created = 1690000000000 + rng.randint(0, 10 ** 10)
+    template = {
+        'name': make_name(rng, index),
+        'description': f"Synthetic {profile} template",
+        'tags': [{'id': str(uuid.UUID(int=rng.getrandbits(128))), 'name': tag}
+                 for tag in rng.sample(TAG_NAMES, rng.randint(0, 2))],
+        'author': rng.choice(AUTHORS),
+        'deviceTypes': rng.sample(DEVICE_TYPES, rng.randint(1, 2)),
+        'softwareType': 'IOS',
+        'softwareVariant': 'XE',
+        'templateContent': content,
+        'rollbackTemplateContent': '',
+        'templateParams': [
+            {
+                'parameterName': name,
+                'dataType': data_type,
+                'defaultValue': default,
+                'description': None,
+                'required': True,
+                'notParam': False,
+                'paramArray': False,
+                'instructionText': None,
+                'group': None,
+                'order': order,
+                'customOrder': 0,
+                'selection': None,
+                'range': [],
+                'key': None,
+                'provider': None,
+                'binding': '',
+                'sensitiveField': False,
+                'displayName': None
+            }
+            for order, (name, data_type, default) in enumerate(parameters, start=1)
+        ],
+        'rollbackTemplateParams': [],
+        'composite': False,
+        'containingTemplates': [],
+        'language': 'JINJA',
+        'customParamsOrder': False,
+        'createTime': created,
+        'lastUpdateTime': created + rng.randint(0, 10 ** 8),
+        'latestVersionTime': created + rng.randint(0, 10 ** 8),
+        'id': template_id,
+        'documentDatabase': False,
+        'projectAssociated': project_name is not None
+    }
+    if project_name:
+        template['projectName'] = project_name
+    return template
+
+
+def make_project(rng: random.Random, index: int, profile: str, template_count: int) -> List[Dict[str, Any]]:
+    """Build a project export: a one-element list holding the project and its templates."""
+    project_name = f"{rng.choice(PREFIXES)} Template Lab {rng.choice(TOPICS)} {index:06d}"
+    return [{
+        'name': project_name,
+        'tags': [],
+        'templates': [make_catalyst_template(rng, index * 100 + offset, profile, project_name)
+                      for offset in range(template_count)],
+        'isDeletable': True
+    }]
+
+
+def parse_distribution(value: str) -> Dict[str, float]:
+    """Parse a 'small=0.6,medium=0.3,large=0.1' size distribution."""
+    distribution = {}
+    for item in value.split(','):
+        name, _, weight = item.partition('=')
+        if name not in SIZE_PROFILES:
+            raise argparse.ArgumentTypeError(f"Unknown size profile '{name}'")
+        distribution[name] = float(weight)
+    return distribution
+
+
+def generate_corpus(root: Path, count: int, seed: int = 0, yaml_ratio: float = 0.3,
+                    project_ratio: float = 0.3, project_size: int = 8,
+                    distribution: Optional[Dict[str, float]] = None,
+                    categories: Optional[List[str]] = None) -> Dict[str, str]:
+    """
+    Generate a synthetic corpus of template files.
+
+    Args:
+        root: Directory to create the category folders in
+        count: Number of template files to generate
+        seed: Random seed, the same seed always produces the same corpus
+        yaml_ratio: Share of files written as YAML templates
+        project_ratio: Share of JSON files written as multi-template project exports
+        project_size: Templates per project export
+        distribution: Size profile name -> weight
+        categories: Categories to spread the files across
+
+    Returns:
+        Category name -> directory mapping, in the format of TEMPLATE_DIRS
+    """
+    rng = random.Random(seed)
+    distribution = distribution or DEFAULT_DISTRIBUTION
+    categories = categories or CATEGORIES
+
+    template_dirs = {}
+    for category in categories:
+        template_dirs[category] = str(root / category)
+        (root / category).mkdir(parents=True, exist_ok=True)
+
+    for index in range(count):
+        category = categories[index % len(categories)]
+        profile = pick_profile(rng, distribution)
+        if rng.random() < yaml_ratio:
+            template = make_yaml_template(rng, index, category, profile)
+            path = root / category / f"{template['template_name'].replace(' ', '_')}.yaml"
+            with open(path, 'w') as f:
+                yaml.dump(template, f, sort_keys=False)
+        elif rng.random() < project_ratio:
+            project = make_project(rng, index, profile, project_size)
+            path = root / category / f"{project[0]['name'].replace(' ', '_')}-project.json"
+            with open(path, 'w') as f:
+                json.dump(project, f, indent=2)
+        else:
+            template = make_catalyst_template(rng, index, profile)
+            path = root / category / f"{template['name']}.json"
+            with open(path, 'w') as f:
+                json.dump([template], f, indent=2)
+
+    logger.info(f"Generated {count} templates under {root}")
+    return template_dirs
+
+
+def main():
+    """Generate a corpus from the command line."""
+    parser = argparse.ArgumentParser(description='Generate a synthetic Catalyst Center template corpus')
+    parser.add_argument('--output', required=True, help='Directory to write the corpus to')
+    parser.add_argument('--count', type=int, default=1000, help='Number of template files')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed')
+    parser.add_argument('--yaml-ratio', type=float, default=0.3, help='Share of YAML templates')
+    parser.add_argument('--project-ratio', type=float, default=0.3,
+                        help='Share of JSON files written as project exports')
+    parser.add_argument('--project-size', type=int, default=8, help='Templates per project export')
+    parser.add_argument('--distribution', type=parse_distribution,
+                        default=DEFAULT_DISTRIBUTION, help='Size profile weights, e.g. small=0.6,medium=0.3,large=0.1')
+    args = parser.parse_args()
+
+    generate_corpus(Path(args.output), args.count, seed=args.seed, yaml_ratio=args.yaml_ratio,
+                    project_ratio=args.project_ratio, project_size=args.project_size,
+                    distribution=args.distribution)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
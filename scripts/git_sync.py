@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+Git Sync
+Template sync backend on plain git: keeps a local clone of the templates
+repository and uses fetch/fast-forward and the object database for change
+detection, so an up-to-date sync costs a single fetch and pushes only happen
+when the staged tree differs. Works with any remote git understands,
+including a bare repository on disk. The last commit exported to the plain
+template folder is kept in its own ref, so changes are reported against what
+was exported, not against wherever the clone's HEAD happens to be.
+"""
+
+import os
+import logging
+import subprocess
+from typing import Dict, List, Optional, Any
+
+logger = logging.getLogger(__name__)
+
+# last commit whose files export() copied out of the clone
+EXPORTED_REF = 'refs/sync/exported'
+
+
+class GitSyncError(Exception):
+    """Raised when a git command fails."""
+
+
+class GitSync:
+    """Local clone of a templates repository, synced with git fetch and push."""
+
+    def __init__(self, remote_url: str, clone_dir: str, branch: str = 'main',
+                 author: str = 'Jenkins <jenkins@localhost>'):
+        """
+        Initialize the backend.
+
+        Args:
+            remote_url: Repository URL or path, e.g. https://github.com/owner/repo.git or /srv/templates.git
+            clone_dir: Working clone, created on first use
+            branch: Branch to sync
+            author: Author and committer of pushed commits, 'Name <email>'
+        """
+        self.remote_url = remote_url
+        self.clone_dir = clone_dir
+        self.branch = branch
+        self.author = author
+
+    def git(self, *args: str) -> str:
+        """Run a git command in the clone and return its stdout."""
+        name, _, email = self.author.partition(' <')
+        env = dict(os.environ, GIT_AUTHOR_NAME=name, GIT_COMMITTER_NAME=name,
+                   GIT_AUTHOR_EMAIL=email.rstrip('>'), GIT_COMMITTER_EMAIL=email.rstrip('>'),
+                   GIT_TERMINAL_PROMPT='0')
+        result = subprocess.run(['git', '-C', self.clone_dir, *args], capture_output=True, text=True, env=env)
+        if result.returncode != 0:
+            raise GitSyncError(f"git {' '.join(args)} failed: {result.stderr.strip()}")
+        return result.stdout.strip()
+
+    def rev_parse(self, ref: str) -> Optional[str]:
+        """Return the commit a ref points to, or None if it does not exist."""
+        try:
+            return self.git('rev-parse', '--verify', '--quiet', f'{ref}^{{commit}}')
+        except GitSyncError:
+            return None
+
+    def ensure_clone(self) -> bool:
+        """Create the working clone if needed; returns True when it was just created."""
+        if os.path.isdir(os.path.join(self.clone_dir, '.git')):
+            return False
+        os.makedirs(self.clone_dir, exist_ok=True)
+        self.git('init', '--quiet')
+        self.git('remote', 'add', 'origin', self.remote_url)
+        return True
+
+    def fetch(self) -> Optional[str]:
+        """Fetch the branch; returns the remote head commit, or None for an empty remote."""
+        try:
+            self.git('fetch', '--quiet', 'origin', f'+refs/heads/{self.branch}:refs/remotes/origin/{self.branch}')
+        except GitSyncError as e:
+            if "couldn't find remote ref" not in str(e):
+                raise
+            return None
+        return self.rev_parse(f'origin/{self.branch}')
+
+    def update(self) -> Optional[str]:
+        """
+        Fetch and fast-forward the clone to the remote branch.
+
+        Returns:
+            The remote head commit, or None for an empty remote
+
+        Raises:
+            GitSyncError: If a git command fails, e.g. the clone has diverged
+        """
+        self.ensure_clone()
+        remote_head = self.fetch()
+        local_head = self.rev_parse('HEAD')
+        if remote_head is None or remote_head == local_head:
+            return remote_head
+        if local_head is None:
+            self.git('checkout', '--quiet', '-B', self.branch, remote_head)
+        else:
+            self.git('merge', '--quiet', '--ff-only', remote_head)
+        return remote_head
+
+    def pull(self, prefix: str = '') -> Dict[str, Any]:
+        """
+        Bring the clone up to date and report what changed since the last export.
+
+        One fetch; when the remote head is the last exported commit nothing else
+        happens. Otherwise the changed paths come from the object database (git
+        diff between the exported commit and the remote head), or are every file
+        when nothing was exported yet. Commits pushed from this clone in between
+        do not hide upstream edits, since HEAD is not the reference point.
+
+        Args:
+            prefix: Repository folder to report changes for, e.g. 'templates/git_pull'
+
+        Returns:
+            {'changed': [...], 'removed': [...], 'commit': remote head} repository paths under {prefix};
+            pass it to export(), which records {commit} as exported
+
+        Raises:
+            GitSyncError: If a git command fails, e.g. the clone has diverged
+        """
+        remote_head = self.update()
+        exported = self.rev_parse(EXPORTED_REF)
+        if remote_head is None or remote_head == exported:
+            logger.info(f"{self.remote_url}: {self.branch} up to date")
+            return {'changed': [], 'removed': [], 'commit': remote_head}
+
+        paths = [prefix] if prefix else []
+        if exported is None:
+            changed = self.git('ls-tree', '-r', '--name-only', remote_head, '--', *paths).splitlines()
+            removed = []
+        else:
+            changed, removed = [], []
+            for line in self.git('diff', '--name-status', '--no-renames', exported, remote_head,
+                                 '--', *paths).splitlines():
+                status, path = line.split('\t', 1)
+                (removed if status == 'D' else changed).append(path)
+        logger.info(f"{self.remote_url}: {self.branch} at {remote_head[:7]}, "
+                    f"{len(changed)} changed and {len(removed)} removed under '{prefix}' since the last export")
+        return {'changed': changed, 'removed': removed, 'commit': remote_head}
+
+    def push(self, files: Dict[str, bytes], message: str) -> Optional[str]:
+        """
+        Write files into the clone and push them as one commit.
+
+        The clone is brought up to date first; git's index decides what changed,
+        so identical content makes no commit and no push. When the push is
+        rejected the local commit is dropped again, so the clone keeps
+        fast-forwarding on later syncs.
+
+        Args:
+            files: Repository path -> content
+            message: Commit message
+
+        Returns:
+            SHA of the pushed commit, or None when nothing changed
+
+        Raises:
+            GitSyncError: If a git command fails
+        """
+        remote_head = self.update()
+        if self.rev_parse('HEAD') is None:
+            self.git('checkout', '--quiet', '--orphan', self.branch)
+        for path, content in files.items():
+            full_path = os.path.join(self.clone_dir, path)
+            os.makedirs(os.path.dirname(full_path), exist_ok=True)
+            with open(full_path, 'wb') as f:
+                f.write(content)
+        self.git('add', '--', *files)
+        if not self.git('diff', '--cached', '--name-only'):
+            logger.info(f"{self.remote_url}: all {len(files)} files unchanged, nothing to push")
+            return None
+        self.git('commit', '--quiet', '-m', message)
+        try:
+            self.git('push', '--quiet', 'origin', f'HEAD:refs/heads/{self.branch}')
+        except GitSyncError:
+            if remote_head is not None:
+                self.git('reset', '--quiet', '--hard', f'origin/{self.branch}')
+            else:
+                # nothing upstream to go back to: unborn branch, empty index
+                self.git('update-ref', '-d', f'refs/heads/{self.branch}')
+                self.git('read-tree', '--empty')
+            raise
+        commit_sha = self.rev_parse('HEAD')
+        logger.info(f"{self.remote_url}: pushed {commit_sha[:7]} to {self.branch}")
+        return commit_sha
+
+    def export(self, prefix: str, target_dir: str, changes: Dict[str, Any]) -> List[str]:
+        """
+        Copy the files a pull() reported under {prefix} into a plain directory.
+
+        Files are read from the pulled commit, not the working tree, and that
+        commit is recorded in EXPORTED_REF once every file is written.
+
+        Args:
+            prefix: Repository folder given to pull()
+            target_dir: Local directory mirroring {prefix}
+            changes: Result of pull()
+
+        Returns:
+            Copied file names, relative to {target_dir}
+        """
+        prefix = prefix.strip('/') + '/'
+        copied = []
+        for path in changes['changed']:
+            name = path[len(prefix):]
+            os.makedirs(os.path.dirname(os.path.join(target_dir, name)) or target_dir, exist_ok=True)
+            with open(os.path.join(target_dir, name), 'wb') as f:
+                f.write(self.show(changes['commit'], path))
+            copied.append(name)
+        for path in changes['removed']:
+            target = os.path.join(target_dir, path[len(prefix):])
+            if os.path.exists(target):
+                os.remove(target)
+        if changes.get('commit'):
+            self.git('update-ref', EXPORTED_REF, changes['commit'])
+        return copied
+
+    def show(self, commit: str, path: str) -> bytes:
+        """Return the content of a file at a commit, as bytes."""
+        result = subprocess.run(['git', '-C', self.clone_dir, 'show', f'{commit}:{path}'], capture_output=True)
+        if result.returncode != 0:
+            raise GitSyncError(f"git show {commit}:{path} failed: {result.stderr.decode().strip()}")
+        return result.stdout
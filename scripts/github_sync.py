@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+"""
+GitHub Sync
+Pushes a set of files to a GitHub repository as a single commit through the
+Git Data API (one tree, one commit, one ref update), skipping files whose git
+blob SHA already matches the remote tree, instead of a delete and a create
+commit per file through the Contents API; and pulls a folder by downloading
+only the blobs that changed since the last pull, in parallel.
+"""
+
+import os
+import json
+import base64
+import hashlib
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Tuple, Any
+
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+GITHUB_API_URL = 'https://api.github.com'
+FILE_MODE = '100644'
+
+
+class GitHubError(Exception):
+    """Raised when the GitHub API returns an error status."""
+
+    def __init__(self, message: str, status_code: Optional[int] = None, response: Any = None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.response = response
+
+
+def git_blob_sha(content: bytes) -> str:
+    """Return the git object id of a blob, as GitHub reports it in trees."""
+    return hashlib.sha1(b'blob %d\0' % len(content) + content).hexdigest()
+
+
+def repo_full_name(owner: str, repository: str) -> str:
+    """Return 'owner/repository', leaving names that already include the owner alone."""
+    return repository if '/' in repository else f"{owner}/{repository}"
+
+
+def load_manifest(path: str) -> Dict[str, str]:
+    """Load a pull manifest (relative path -> blob SHA); empty if there is none yet."""
+    if not os.path.exists(path):
+        return {}
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
+def save_manifest(path: str, manifest: Dict[str, str]):
+    """Write a pull manifest, replacing the previous one atomically."""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+class GitHubRepo:
+    """One GitHub repository reached through the Git Data API on a pooled session."""
+
+    def __init__(self, full_name: str, token: str, api_url: str = GITHUB_API_URL,
+                 branch: Optional[str] = None, timeout: float = 30, pool_size: int = 8):
+        """
+        Initialize the repository client.
+
+        Args:
+            full_name: Repository as 'owner/name'
+            token: Personal access token
+            api_url: API root, e.g. a GitHub Enterprise or local stand-in URL
+            branch: Branch to read and push (default: the repository default branch)
+            timeout: Per-request timeout, in seconds
+            pool_size: Connection pool size
+        """
+        self.full_name = full_name
+        self.api_url = api_url.rstrip('/')
+        self.timeout = timeout
+        self._branch = branch
+        self.http = requests.Session()
+        self.http.headers.update({'Accept': 'application/vnd.github+json',
+                                  'Authorization': f"token {token}"})
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.http.mount('https://', adapter)
+        self.http.mount('http://', adapter)
+
+    def request(self, method: str, path: str, json_body: Optional[Dict[str, Any]] = None,
+                params: Optional[Dict[str, Any]] = None) -> Any:
+        """
+        Call a repository API path (relative to /repos/{full_name}) and return the decoded JSON.
+
+        Raises:
+            GitHubError: If GitHub returns an error status
+        """
+        response = self.http.request(method, f"{self.api_url}/repos/{self.full_name}{path}",
+                                     json=json_body, params=params, timeout=self.timeout)
+        if response.status_code >= 400:
+            raise GitHubError(f"{method} {path} failed: HTTP {response.status_code} {response.text[:200]}",
+                              response.status_code, response)
+        return response.json() if response.content else None
+
+    @property
+    def branch(self) -> str:
+        """Branch the client works on, looked up once when not given."""
+        if self._branch is None:
+            self._branch = self.request('GET', '')['default_branch']
+        return self._branch
+
+    def head(self):
+        """Return (commit SHA, tree SHA) of the branch head, (None, None) when the branch has no commit yet."""
+        try:
+            commit_sha = self.request('GET', f"/git/ref/heads/{self.branch}")['object']['sha']
+        except GitHubError as e:
+            # 404: no such branch, 409: empty repository
+            if e.status_code not in (404, 409):
+                raise
+            return None, None
+        return commit_sha, self.request('GET', f"/git/commits/{commit_sha}")['tree']['sha']
+
+    def create_file(self, path: str, content: bytes, message: str) -> str:
+        """Commit one file through the Contents API (which works on an empty repository); returns the commit SHA."""
+        response = self.request('PUT', f"/contents/{path}", {'message': message, 'branch': self.branch,
+                                                             'content': base64.b64encode(content).decode()})
+        return response['commit']['sha']
+
+    def read_tree(self, tree: str) -> Tuple[Dict[str, str], bool]:
+        """
+        List every file under a tree (SHA or branch name) with one recursive listing.
+
+        Returns:
+            (path -> blob SHA, truncated): {truncated} is True when the API cut the
+            listing short, so a path missing from it may still exist
+        """
+        tree = self.request('GET', f"/git/trees/{tree}", params={'recursive': '1'})
+        if tree.get('truncated'):
+            logger.warning(f"Tree listing of {self.full_name} was truncated by the API")
+        return {entry['path']: entry['sha'] for entry in tree['tree'] if entry['type'] == 'blob'}, \
+            bool(tree.get('truncated'))
+
+    def list_tree(self, tree: str) -> Dict[str, str]:
+        """Return path -> blob SHA for every file under a tree (SHA or branch name), see read_tree()."""
+        return self.read_tree(tree)[0]
+
+    def tree_entry(self, path: str, content: bytes) -> Dict[str, Any]:
+        """Build a tree entry, inlining UTF-8 text and uploading anything else as a blob."""
+        try:
+            return {'path': path, 'mode': FILE_MODE, 'type': 'blob', 'content': content.decode('utf-8')}
+        except UnicodeDecodeError:
+            blob = self.request('POST', '/git/blobs', {'content': base64.b64encode(content).decode(),
+                                                       'encoding': 'base64'})
+            return {'path': path, 'mode': FILE_MODE, 'type': 'blob', 'sha': blob['sha']}
+
+    def push_files(self, files: Dict[str, bytes], message: str, delete: Iterable[str] = (),
+                   attempts: int = 3) -> Optional[str]:
+        """
+        Commit files to the branch in a single commit.
+
+        Files whose git blob SHA equals the one in the remote tree are left out,
+        and no commit is made when nothing changed. Costs a fixed six requests
+        (plus one per binary file) however many files are pushed. A branch
+        without commits gets a root commit; an empty repository, which the Git
+        Data API refuses, first gets one file through the Contents API.
+
+        Args:
+            files: Repository path -> content
+            message: Commit message
+            delete: Repository paths to remove, if present
+            attempts: Tries when the branch moves between reading the head and updating it
+
+        Returns:
+            SHA of the new commit, or None when the remote already matched
+
+        Raises:
+            GitHubError: If GitHub returns an error status
+        """
+        for attempt in range(1, attempts + 1):
+            commit_sha, tree_sha = self.head()
+            remote = self.list_tree(tree_sha) if tree_sha else {}
+            changed = [path for path, content in files.items() if remote.get(path) != git_blob_sha(content)]
+            removed = [path for path in delete if path in remote]
+            if not changed and not removed:
+                logger.info(f"{self.full_name}: all {len(files)} files unchanged, nothing to commit")
+                return None
+
+            try:
+                entries = [self.tree_entry(path, files[path]) for path in changed]
+                entries += [{'path': path, 'mode': FILE_MODE, 'type': 'blob', 'sha': None} for path in removed]
+                tree = self.request('POST', '/git/trees', dict({'tree': entries},
+                                                               **({'base_tree': tree_sha} if tree_sha else {})))
+            except GitHubError as e:
+                # 409: empty repository, the Git Data API needs a first commit
+                if e.status_code != 409 or commit_sha or attempt == attempts:
+                    raise
+                seed = self.create_file(changed[0], files[changed[0]], message)
+                logger.info(f"{self.full_name}: empty repository, created {changed[0]} to start {self.branch}")
+                if len(changed) == 1:
+                    return seed
+                continue
+            commit = self.request('POST', '/git/commits', {'message': message, 'tree': tree['sha'],
+                                                           'parents': [commit_sha] if commit_sha else []})
+            try:
+                if commit_sha:
+                    self.request('PATCH', f"/git/refs/heads/{self.branch}", {'sha': commit['sha'], 'force': False})
+                else:
+                    self.request('POST', '/git/refs', {'ref': f"refs/heads/{self.branch}", 'sha': commit['sha']})
+            except GitHubError as e:
+                # 422: not a fast-forward (or the branch appeared), someone else pushed in between;
+                # rebuild on the new head
+                if e.status_code != 422 or attempt == attempts:
+                    raise
+                logger.info(f"{self.full_name}: branch {self.branch} moved, retrying")
+                continue
+            logger.info(f"{self.full_name}: committed {commit['sha'][:7]} with {len(changed)} of {len(files)} "
+                        f"files changed and {len(removed)} removed")
+            return commit['sha']
+
+    def download(self, sha: str) -> bytes:
+        """Return the content of a blob."""
+        return base64.b64decode(self.request('GET', f"/git/blobs/{sha}")['content'])
+
+    def pull_files(self, prefix: str, target_dir: str, manifest_path: str,
+                   workers: int = 8) -> Dict[str, List[str]]:
+        """
+        Mirror the files under a repository folder into a local directory.
+
+        One tree listing of the branch gives every blob SHA; only files whose SHA
+        differs from the manifest of the previous pull (or that are missing
+        locally) are downloaded, concurrently. Files removed upstream since the
+        previous pull are removed locally, unless the listing was truncated: then
+        nothing is removed and the entries missing from it stay in the manifest.
+
+        Args:
+            prefix: Repository folder, e.g. 'templates/git_pull'
+            target_dir: Local directory
+            manifest_path: JSON file recording relative path -> blob SHA of the last pull
+            workers: Concurrent blob downloads
+
+        Returns:
+            {'downloaded': [...], 'removed': [...], 'unchanged': [...]} relative paths
+
+        Raises:
+            GitHubError: If GitHub returns an error status
+        """
+        prefix = prefix.strip('/') + '/'
+        listing, truncated = self.read_tree(self.branch)
+        remote = {path[len(prefix):]: sha for path, sha in listing.items() if path.startswith(prefix)}
+        manifest = load_manifest(manifest_path)
+        changed = [name for name, sha in remote.items()
+                   if manifest.get(name) != sha or not os.path.exists(os.path.join(target_dir, name))]
+
+        def fetch(name):
+            content = self.download(remote[name])
+            path = os.path.join(target_dir, name)
+            os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+            with open(path, 'wb') as f:
+                f.write(content)
+            return name
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            downloaded = list(pool.map(fetch, changed))
+        if truncated:
+            # a partial listing says nothing about what was removed upstream
+            removed = []
+            save_manifest(manifest_path, dict(manifest, **remote))
+        else:
+            removed = [name for name in manifest if name not in remote]
+            for name in removed:
+                path = os.path.join(target_dir, name)
+                if os.path.exists(path):
+                    os.remove(path)
+            save_manifest(manifest_path, remote)
+        logger.info(f"{self.full_name}: pulled {len(downloaded)} of {len(remote)} files under {prefix}, "
+                    f"removed {len(removed)}")
+        return {'downloaded': downloaded, 'removed': removed,
+                'unchanged': [name for name in remote if name not in changed]}
+
+    def close(self):
+        """Close the connection pool."""
+        self.http.close()
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Inventory Store
+SQLite store for device inventories, indexed on version, device family, role
+and site, so fleet questions such as "devices per version per site" are one
+indexed query instead of reloading every JSON/YAML inventory. Includes a small
+query CLI.
+"""
+
+import sys
+import json
+import sqlite3
+import logging
+import argparse
+from datetime import datetime
+from typing import Dict, List, Optional, Any
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+COLUMNS = ['device_id', 'hostname', 'device_ip', 'version', 'device_family', 'role', 'site', 'site_id', 'kind']
+INDEXED_COLUMNS = ['version', 'device_family', 'role', 'site_id']
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS devices (
+    device_id TEXT PRIMARY KEY,
+    hostname TEXT,
+    device_ip TEXT,
+    version TEXT,
+    device_family TEXT,
+    role TEXT,
+    site TEXT,
+    site_id TEXT,
+    kind TEXT NOT NULL,
+    collected_at TEXT NOT NULL
+);
+{''.join(f'CREATE INDEX IF NOT EXISTS idx_devices_{column} ON devices ({column});' for column in INDEXED_COLUMNS)}
+"""
+
+
+def connect(path: str) -> sqlite3.Connection:
+    """Open an inventory database, creating the schema if needed."""
+    connection = sqlite3.connect(path)
+    connection.row_factory = sqlite3.Row
+    connection.executescript(SCHEMA)
+    return connection
+
+
+def write_inventory(path: str, device_inventory: List[Dict[str, Any]],
+                    ap_inventory: List[Dict[str, Any]]) -> int:
+    """
+    Replace the stored inventory with a new collection run.
+
+    Args:
+        path: Database file
+        device_inventory: Device records, as built by catalyst_center_inventory.inventory_record()
+        ap_inventory: Access point records
+
+    Returns:
+        Number of stored records
+    """
+    collected_at = datetime.now().isoformat()
+    rows = [tuple(record.get(column) for column in COLUMNS[:-1]) + (kind, collected_at)
+            for kind, records in (('device', device_inventory), ('ap', ap_inventory))
+            for record in records]
+    connection = connect(path)
+    try:
+        with connection:
+            connection.execute('DELETE FROM devices')
+            connection.executemany(
+                f"INSERT OR REPLACE INTO devices ({', '.join(COLUMNS)}, collected_at) "
+                f"VALUES ({', '.join('?' * (len(COLUMNS) + 1))})", rows)
+    finally:
+        connection.close()
+    return len(rows)
+
+
+def count_by(path: str, group_by: List[str], where: Optional[Dict[str, str]] = None) -> List[Dict[str, Any]]:
+    """
+    Count devices grouped by one or more columns.
+
+    Args:
+        path: Database file
+        group_by: Column names, e.g. ['version', 'site']
+        where: Column -> value equality filters
+
+    Returns:
+        Rows with the group columns and 'devices', largest groups first
+    """
+    for column in group_by + list(where or {}):
+        if column not in COLUMNS:
+            raise ValueError(f"Unknown column '{column}', expected one of {', '.join(COLUMNS)}")
+    where = where or {}
+    clause = f"WHERE {' AND '.join(f'{column} = ?' for column in where)}" if where else ''
+    columns = ', '.join(group_by)
+    connection = connect(path)
+    try:
+        rows = connection.execute(
+            f"SELECT {columns}, COUNT(*) AS devices FROM devices {clause} "
+            f"GROUP BY {columns} ORDER BY devices DESC, {columns}", list(where.values())).fetchall()
+    finally:
+        connection.close()
+    return [dict(row) for row in rows]
+
+
+def select(path: str, where: Dict[str, str], columns: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+    """Return the devices matching column -> value equality filters."""
+    columns = columns or COLUMNS
+    for column in columns + list(where):
+        if column not in COLUMNS:
+            raise ValueError(f"Unknown column '{column}', expected one of {', '.join(COLUMNS)}")
+    clause = f"WHERE {' AND '.join(f'{column} = ?' for column in where)}" if where else ''
+    connection = connect(path)
+    try:
+        rows = connection.execute(f"SELECT {', '.join(columns)} FROM devices {clause} ORDER BY hostname",
+                                  list(where.values())).fetchall()
+    finally:
+        connection.close()
+    return [dict(row) for row in rows]
+
+
+def parse_filters(filters: List[str]) -> Dict[str, str]:
+    """Parse ['version=17.9.4a', 'role=ACCESS'] into a filter dict."""
+    parsed = {}
+    for item in filters or []:
+        column, separator, value = item.partition('=')
+        if not separator:
+            raise ValueError(f"Filter '{item}' must look like column=value")
+        parsed[column] = value
+    return parsed
+
+
+def print_table(rows: List[Dict[str, Any]]):
+    """Print rows as an aligned text table."""
+    if not rows:
+        print('No matching devices')
+        return
+    headers = list(rows[0])
+    widths = [max(len(str(header)), *(len(str(row[header])) for row in rows)) for header in headers]
+    print('  '.join(str(header).ljust(width) for header, width in zip(headers, widths)))
+    print('  '.join('-' * width for width in widths))
+    for row in rows:
+        print('  '.join(str(row[header]).ljust(width) for header, width in zip(headers, widths)))
+
+
+def main():
+    """Load inventories into the store or query it."""
+    parser = argparse.ArgumentParser(description='Query the SQLite device inventory store')
+    parser.add_argument('--db', required=True, help='Inventory database file')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    load_parser = subparsers.add_parser('load', help='Load device_inventory.py JSON inventories')
+    load_parser.add_argument('--devices', required=True, help='Device inventory JSON file')
+    load_parser.add_argument('--aps', help='Access point inventory JSON file')
+
+    count_parser = subparsers.add_parser('count', help='Count devices, e.g. per version per site')
+    count_parser.add_argument('--group-by', nargs='+', required=True, help='Columns to group by')
+    count_parser.add_argument('--where', nargs='*', default=[], help='column=value filters')
+
+    list_parser = subparsers.add_parser('list', help='List matching devices')
+    list_parser.add_argument('--where', nargs='*', default=[], help='column=value filters')
+    list_parser.add_argument('--columns', nargs='*', help='Columns to show')
+    list_parser.add_argument('--json', action='store_true', help='Print JSON instead of a table')
+
+    args = parser.parse_args()
+
+    try:
+        if args.command == 'load':
+            with open(args.devices, 'r') as f:
+                device_inventory = json.load(f)
+            ap_inventory = []
+            if args.aps:
+                with open(args.aps, 'r') as f:
+                    ap_inventory = json.load(f)
+            count = write_inventory(args.db, device_inventory, ap_inventory)
+            logger.info(f"Stored {count} records in {args.db}")
+        elif args.command == 'count':
+            print_table(count_by(args.db, args.group_by, parse_filters(args.where)))
+        else:
+            rows = select(args.db, parse_filters(args.where), args.columns)
+            if args.json:
+                print(json.dumps(rows, indent=2))
+            else:
+                print_table(rows)
+    except ValueError as e:
+        logger.error(str(e))
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
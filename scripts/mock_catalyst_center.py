@@ -0,0 +1,970 @@
+#!/usr/bin/env python3
+"""
+Mock Catalyst Center Server
+A local stand-in for the Catalyst Center (DNA Center) REST API, implementing the
+endpoints used by scripts/catalyst_center_client.py and templates/community/python,
+with configurable latency, rate limits, task completion times and fleet sizes.
+"""
+
+import sys
+import json
+import time
+import uuid
+import heapq
+import base64
+import random
+import logging
+import argparse
+import threading
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Any, Callable
+from urllib.parse import urlparse, parse_qs
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+MAX_PAGE_SIZE = 500
+ACCEPTED_MESSAGE = 'The request has been accepted for execution'
+
+DEVICE_MODELS = [
+    # (family, type, series, platformId, role, share)
+    ('Switches and Hubs', 'Cisco Catalyst 9300 Switch', 'Cisco Catalyst 9300 Series Switches',
+     'C9300-48U', 'ACCESS', 0.45),
+    ('Switches and Hubs', 'Cisco Catalyst 9500 Switch', 'Cisco Catalyst 9500 Series Switches',
+     'C9500-24Y4C', 'DISTRIBUTION', 0.10),
+    ('Routers', 'Cisco Catalyst 8000V Edge Software', 'Cisco Catalyst 8000V Edge Software',
+     'C8000V', 'BORDER ROUTER', 0.05),
+    ('Wireless Controller', 'Cisco Catalyst 9800-CL Wireless Controller for Cloud',
+     'Cisco Catalyst 9800 Wireless Controllers', 'C9800-CL-K9', 'ACCESS', 0.02),
+    ('Unified AP', 'Cisco Catalyst 9120AXI Unified Access Point', 'Cisco Catalyst 9120AX Series Unified Access Points',
+     'C9120AXI-B', 'ACCESS', 0.38),
+]
+SOFTWARE_VERSIONS = ['17.9.4a', '17.9.5', '17.12.2', '17.6.6', '17.3.8']
+COMPLIANCE_TYPES = ['IMAGE', 'RUNNING_CONFIG', 'PSIRT', 'EOX']
+
+
+def make_token(username: str, ttl: int) -> str:
+    """Build an unsigned JWT-style token carrying an 'exp' claim, like the controller issues."""
+    def encode(data):
+        return base64.urlsafe_b64encode(json.dumps(data).encode()).decode().rstrip('=')
+    now = int(time.time())
+    payload = {'sub': username, 'iat': now, 'exp': now + ttl, 'jti': str(uuid.uuid4())}
+    return f"{encode({'alg': 'none', 'typ': 'JWT'})}.{encode(payload)}.mock"
+
+
+class MockCatalystCenter:
+    """In-memory Catalyst Center controller state served over HTTP."""
+
+    def __init__(self, devices: int = 1000, sites: int = 20, latency: float = 0.0,
+                 jitter: float = 0.0, rate_limit: float = 0.0, burst: int = 0,
+                 task_time: float = 1.0, discovery_time: float = 30.0,
+                 discovery_failure_rate: float = 0.0, non_compliance_rate: float = 0.1,
+                 token_ttl: int = 3600, username: str = 'admin', password: str = 'C1sco12345',
+                 seed: int = 0):
+        """
+        Initialize the mock controller.
+
+        Args:
+            devices: Fleet size, number of managed network devices
+            sites: Number of buildings; every building gets an area parent and two floors
+            latency: Base response latency, in seconds
+            jitter: Random extra latency added to every response, in seconds
+            rate_limit: Sustained requests per second before HTTP 429 (0 disables)
+            burst: Token bucket size for the rate limiter (default: one second of requests)
+            task_time: Time for asynchronous tasks to complete, in seconds
+            discovery_time: Time for a discovery to collect all of its devices, in seconds
+            discovery_failure_rate: Share of discovered devices that fail to become managed
+            non_compliance_rate: Share of devices reported non-compliant per compliance type
+            token_ttl: Lifetime of issued tokens, in seconds
+            username: Accepted username
+            password: Accepted password
+            seed: Random seed for the generated fleet
+        """
+        self.latency = latency
+        self.jitter = jitter
+        self.rate_limit = rate_limit
+        self.burst = burst or max(1, int(rate_limit))
+        self.task_time = task_time
+        self.discovery_time = discovery_time
+        self.discovery_failure_rate = discovery_failure_rate
+        self.non_compliance_rate = non_compliance_rate
+        self.token_ttl = token_ttl
+        self.username = username
+        self.password = password
+
+        self.rng = random.Random(seed)
+        self.lock = threading.RLock()
+        self.stats = Counter()
+        self.tokens = {}
+        self.bucket_tokens = float(self.burst)
+        self.bucket_updated = time.monotonic()
+
+        self.sites = {}
+        self.site_by_name = {}
+        self.devices = []
+        self.device_by_id = {}
+        self.device_site = {}
+        self.projects = {}
+        self.templates = {}
+        self.deployments = {}
+        self.discoveries = {}
+        self.credentials = {'cli': [], 'snmp_v2_read': [], 'snmp_v2_write': []}
+        self.netconf_credentials = [{'id': self.new_id(), 'netconfPort': '830', 'credentialType': 'GLOBAL'}]
+        self.site_credentials = {}
+        self.running_configs = {}
+        self.tasks = {}
+        self.tasks_by_execution = {}
+        self.pending = []
+
+        self.build_sites(sites)
+        self.build_fleet(devices)
+        self.compliance = self.build_compliance()
+
+        self.server = None
+        self.thread = None
+
+    # ------------------------------------------------------------------
+    # fleet generation
+    # ------------------------------------------------------------------
+    def new_id(self) -> str:
+        """Return a new resource id."""
+        return str(uuid.UUID(int=self.rng.getrandbits(128)))
+
+    def add_site(self, name: str, parent_name: Optional[str], site_type: str,
+                 address: str = '') -> Dict[str, Any]:
+        """Add a site to the hierarchy and return it."""
+        parent = self.site_by_name.get(parent_name) if parent_name else None
+        hierarchy = f"{parent_name}/{name}" if parent_name else name
+        site = {
+            'id': self.new_id(),
+            'name': name,
+            'siteNameHierarchy': hierarchy,
+            'parentId': parent['id'] if parent else None,
+            'siteHierarchy': f"{parent['siteHierarchy']}/" if parent else '',
+            'additionalInfo': [{'nameSpace': 'Location', 'attributes': {'type': site_type, 'address': address}}],
+            'instanceTenantId': 'mock-tenant'
+        }
+        site['siteHierarchy'] += site['id']
+        self.sites[site['id']] = site
+        self.site_by_name[hierarchy] = site
+        return site
+
+    def build_sites(self, buildings: int):
+        """Build Global -> area -> building -> floor sites."""
+        self.add_site('Global', None, 'global')
+        areas = max(1, buildings // 10)
+        for area_index in range(areas):
+            self.add_site(f"Area-{area_index + 1}", 'Global', 'area')
+        self.floors = []
+        for building_index in range(buildings):
+            area = f"Global/Area-{building_index % areas + 1}"
+            self.add_site(f"Building-{building_index + 1}", area, 'building',
+                          f"{100 + building_index} Main Street")
+            for floor_index in range(2):
+                floor = self.add_site(f"Floor-{floor_index + 1}", f"{area}/Building-{building_index + 1}", 'floor')
+                self.floors.append(floor)
+
+    def make_device(self, index: int, ip_address: Optional[str] = None,
+                    model: Optional[tuple] = None) -> Dict[str, Any]:
+        """Build one network device record."""
+        if model is None:
+            model = self.rng.choices(DEVICE_MODELS, weights=[item[5] for item in DEVICE_MODELS])[0]
+        family, device_type, series, platform_id, role, _ = model
+        updated = int(time.time() * 1000) - self.rng.randint(0, 86400000)
+        return {
+            'id': self.new_id(),
+            'hostname': f"{'AP' if family == 'Unified AP' else 'SW'}-{index:05d}.dcloud.cisco.com",
+            'managementIpAddress': ip_address or f"10.{(index >> 16) & 255}.{(index >> 8) & 255}.{index & 255}",
+            'family': family,
+            'type': device_type,
+            'series': series,
+            'platformId': platform_id,
+            'role': role,
+            'softwareType': 'IOS-XE',
+            'softwareVersion': self.rng.choice(SOFTWARE_VERSIONS),
+            'serialNumber': f"FOC{index:08d}",
+            'reachabilityStatus': 'Reachable',
+            'collectionStatus': 'Managed',
+            'upTime': f"{self.rng.randint(1, 300)} days, 1:02:03.00",
+            'lastUpdateTime': updated,
+            'lastUpdated': time.strftime('%Y-%m-%d %H:%M:%S', time.gmtime(updated / 1000)),
+            'instanceUuid': None
+        }
+
+    def place_device(self, device: Dict[str, Any], site: Dict[str, Any]):
+        """Register a device in the inventory at a site."""
+        device['instanceUuid'] = device['id']
+        self.devices.append(device)
+        self.device_by_id[device['id']] = device
+        self.device_site[device['id']] = site['id']
+
+    def build_fleet(self, count: int):
+        """Build the managed device fleet, spread across floors."""
+        for index in range(count):
+            self.place_device(self.make_device(index), self.floors[index % len(self.floors)])
+
+    def build_compliance(self) -> Dict[str, Dict[str, str]]:
+        """Build per compliance type device id -> status."""
+        compliance = {}
+        for compliance_type in COMPLIANCE_TYPES:
+            compliance[compliance_type] = {
+                device['id']: 'NON_COMPLIANT' if self.rng.random() < self.non_compliance_rate else 'COMPLIANT'
+                for device in self.devices
+            }
+        return compliance
+
+    # ------------------------------------------------------------------
+    # tasks
+    # ------------------------------------------------------------------
+    def create_task(self, apply: Optional[Callable[[], Any]] = None, duration: Optional[float] = None,
+                    progress: str = 'Task accepted') -> str:
+        """
+        Create an asynchronous task that completes after {duration} seconds.
+
+        Args:
+            apply: Callback run when the task completes; returns (is_error, progress, data)
+            duration: Completion time, defaults to task_time
+            progress: Progress text reported while running
+
+        Returns:
+            The task id
+        """
+        task_id = self.new_id()
+        start = time.time()
+        done_at = time.monotonic() + (self.task_time if duration is None else duration)
+        self.tasks[task_id] = {
+            'id': task_id,
+            'startTime': int(start * 1000),
+            'done_at': done_at,
+            'apply': apply,
+            'isError': False,
+            'progress': progress,
+            'data': None,
+            'failureReason': None,
+            'endTime': None
+        }
+        heapq.heappush(self.pending, (done_at, task_id))
+        return task_id
+
+    def advance(self):
+        """Complete every task whose completion time has passed."""
+        now = time.monotonic()
+        while self.pending and self.pending[0][0] <= now:
+            _, task_id = heapq.heappop(self.pending)
+            task = self.tasks[task_id]
+            if task['apply']:
+                result = task['apply']()
+                if result:
+                    is_error, progress, data = result
+                    task.update({'isError': is_error, 'progress': progress, 'data': data})
+                    if is_error:
+                        task['failureReason'] = progress
+            task['endTime'] = int(time.time() * 1000)
+
+    def task_response(self, task_id: str) -> Dict[str, Any]:
+        """Return the task-accepted response body."""
+        return {'response': {'taskId': task_id, 'url': f'/api/v1/task/{task_id}'}, 'version': '1.0'}
+
+    def execution_response(self, task_id: str) -> Dict[str, Any]:
+        """Return the business API accepted response body, its execution status following the task."""
+        execution_id = self.new_id()
+        self.tasks_by_execution[execution_id] = task_id
+        return {'executionId': execution_id,
+                'executionStatusUrl': f'/dna/platform/management/business-api/v1/execution-status/{execution_id}',
+                'message': ACCEPTED_MESSAGE}
+
+    # ------------------------------------------------------------------
+    # http server
+    # ------------------------------------------------------------------
+    def start(self, host: str = '127.0.0.1', port: int = 0) -> str:
+        """
+        Start serving in a background thread.
+
+        Args:
+            host: Address to bind to
+            port: Port to bind to, 0 picks a free port
+
+        Returns:
+            Base URL of the mock controller
+        """
+        handler = type('BoundMockHandler', (MockHandler,), {'controller': self})
+        self.server = ThreadingHTTPServer((host, port), handler)
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        logger.info(f"Mock Catalyst Center listening on {self.base_url} "
+                    f"({len(self.devices)} devices, {len(self.sites)} sites)")
+        return self.base_url
+
+    def stop(self):
+        """Stop the background server."""
+        if self.server:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+
+    @property
+    def base_url(self) -> str:
+        """Base URL of the running server."""
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def take_rate_token(self) -> Optional[float]:
+        """Take a token from the rate limiter; returns the retry delay when none is left."""
+        if not self.rate_limit:
+            return None
+        now = time.monotonic()
+        self.bucket_tokens = min(self.burst, self.bucket_tokens + (now - self.bucket_updated) * self.rate_limit)
+        self.bucket_updated = now
+        if self.bucket_tokens >= 1:
+            self.bucket_tokens -= 1
+            return None
+        return (1 - self.bucket_tokens) / self.rate_limit
+
+    def check_token(self, token: Optional[str]) -> bool:
+        """Return True if {token} was issued by this controller and has not expired."""
+        expires = self.tokens.get(token)
+        return expires is not None and expires > time.time()
+
+    # ------------------------------------------------------------------
+    # authentication
+    # ------------------------------------------------------------------
+    def auth_token(self, request):
+        header = request.headers.get('Authorization', '')
+        if not header.startswith('Basic '):
+            return 401, {'error': 'Basic authentication required'}
+        username, _, password = base64.b64decode(header[6:]).decode().partition(':')
+        if username != self.username or password != self.password:
+            return 401, {'error': 'Authentication has failed. Please provide valid credentials.'}
+        token = make_token(username, self.token_ttl)
+        self.tokens[token] = time.time() + self.token_ttl
+        return 200, {'Token': token}
+
+    # ------------------------------------------------------------------
+    # inventory
+    # ------------------------------------------------------------------
+    def page(self, items: List[Any], query: Dict[str, str]) -> List[Any]:
+        """Apply 1-based offset/limit paging, capped at MAX_PAGE_SIZE."""
+        offset = max(1, int(query.get('offset', 1)))
+        limit = min(MAX_PAGE_SIZE, int(query.get('limit', MAX_PAGE_SIZE)))
+        return items[offset - 1:offset - 1 + limit]
+
+    def network_devices(self, request, device_id=None):
+        if device_id:
+            device = self.device_by_id.get(device_id)
+            if not device:
+                return 404, {'response': {'errorCode': 'Not found', 'message': 'Device not found'}}
+            return 200, {'response': device, 'version': '1.0'}
+        query = request.query
+        devices = self.devices
+        if 'id' in query:
+            ids = query['id'].split(',')
+            devices = [self.device_by_id[item] for item in ids if item in self.device_by_id]
+        for field in ('family', 'hostname', 'managementIpAddress', 'serialNumber', 'platformId', 'role'):
+            if field in query:
+                devices = [device for device in devices if device.get(field) == query[field]]
+        return 200, {'response': self.page(devices, query), 'version': '1.0'}
+
+    def network_device_count(self, request):
+        return 200, {'response': len(self.devices), 'version': '1.0'}
+
+    def network_device_by_ip(self, request, ip_address):
+        for device in self.devices:
+            if device['managementIpAddress'] == ip_address:
+                return 200, {'response': device, 'version': '1.0'}
+        return 404, {'response': {'errorCode': 'Not found', 'message': f'No device with IP {ip_address}'}}
+
+    def running_config(self, device: Dict[str, Any]) -> str:
+        """Return a device's running config, generating a baseline on first use."""
+        if device['id'] not in self.running_configs:
+            self.running_configs[device['id']] = '\n'.join([
+                f"hostname {device['hostname'].split('.')[0]}", '!',
+                'ip domain name dcloud.cisco.com', '!',
+                'interface Loopback0', f" ip address {device['managementIpAddress']} 255.255.255.255", '!',
+                'line vty 0 4', ' transport input ssh', '!', 'end'])
+        return self.running_configs[device['id']]
+
+    def network_device_config(self, request, device_id):
+        device = self.device_by_id.get(device_id)
+        if not device:
+            return 404, {'response': {'errorCode': 'Not found', 'message': 'Device not found'}}
+        return 200, {'response': self.running_config(device), 'version': '1.0'}
+
+    def device_detail(self, request):
+        device = self.device_by_id.get(request.query.get('searchBy', ''))
+        if not device:
+            return 404, {'response': {'errorCode': 'Not found'}}
+        site = self.sites[self.device_site[device['id']]]
+        return 200, {'response': {
+            'nwDeviceName': device['hostname'],
+            'managementIpAddr': device['managementIpAddress'],
+            'nwDeviceFamily': device['family'],
+            'platformId': device['platformId'],
+            'softwareVersion': device['softwareVersion'],
+            'location': site['siteNameHierarchy'],
+            'siteHierarchyGraphId': site['siteHierarchy']
+        }}
+
+    def compliance_detail(self, request):
+        compliance_type = request.query.get('complianceType')
+        status = request.query.get('complianceStatus')
+        records = []
+        for current_type, statuses in self.compliance.items():
+            if compliance_type and current_type != compliance_type:
+                continue
+            for device_id, device_status in statuses.items():
+                if status and device_status != status:
+                    continue
+                records.append({'deviceUuid': device_id, 'complianceType': current_type,
+                                'status': device_status, 'lastUpdateTime': int(time.time() * 1000)})
+        return 200, {'response': self.page(records, request.query), 'version': '1.0'}
+
+    def network_health(self, request):
+        return 200, {'response': [{'time': time.strftime('%Y-%m-%dT%H:%M:%S'), 'healthScore': 92,
+                                   'totalCount': len(self.devices), 'goodCount': len(self.devices)}]}
+
+    # ------------------------------------------------------------------
+    # sites
+    # ------------------------------------------------------------------
+    def get_sites(self, request):
+        query = request.query
+        sites = list(self.sites.values())
+        if 'name' in query:
+            site = self.site_by_name.get(query['name'])
+            if not site:
+                return 404, {'response': [], 'errorCode': 'Not found'}
+            sites = [site]
+        if 'siteId' in query:
+            sites = [self.sites[query['siteId']]] if query['siteId'] in self.sites else []
+        if 'type' in query:
+            sites = [site for site in sites
+                     if site['additionalInfo'][0]['attributes']['type'] == query['type']]
+        return 200, {'response': self.page(sites, query) if 'offset' in query or 'limit' in query else sites}
+
+    def create_site(self, request):
+        body = request.json or {}
+        site_type = body.get('type')
+        details = (body.get('site') or {}).get(site_type) or {}
+        name = details.get('name')
+        parent_name = details.get('parentName')
+
+        def apply():
+            hierarchy = f"{parent_name}/{name}"
+            if parent_name not in self.site_by_name:
+                return True, f'Parent site {parent_name} not found', None
+            if hierarchy in self.site_by_name:
+                return True, f'Site {hierarchy} already exists', None
+            site = self.add_site(name, parent_name, site_type, details.get('address', ''))
+            return False, f'Site {hierarchy} created', site['id']
+
+        return 202, self.execution_response(self.create_task(apply))
+
+    def execution_status(self, request, execution_id):
+        task = self.tasks.get(self.tasks_by_execution.get(execution_id))
+        if not task:
+            return 404, {'status': 'FAILURE', 'bapiError': 'Unknown execution id'}
+        if task['endTime'] is None:
+            status = 'IN_PROGRESS'
+        else:
+            status = 'FAILURE' if task['isError'] else 'SUCCESS'
+        return 200, {'bapiExecutionId': execution_id, 'status': status,
+                     'bapiError': task['failureReason'], 'startTime': task['startTime'],
+                     'endTime': task['endTime']}
+
+    def update_site_settings(self, request, site_id):
+        if site_id not in self.sites:
+            return 404, {'message': 'Site not found'}
+        return 202, self.execution_response(self.create_task(lambda: (False, 'Site settings updated', None)))
+
+    def site_membership(self, request, site_id):
+        site = self.sites.get(site_id)
+        if not site:
+            return 404, {'message': 'Site not found'}
+        children = [item for item in self.sites.values() if item['parentId'] == site_id]
+        devices = [self.device_by_id[device_id] for device_id, member_site in self.device_site.items()
+                   if member_site == site_id]
+        return 200, {'site': {'response': children, 'version': '1.0'},
+                     'device': [{'response': devices, 'version': '1.0', 'siteId': site_id}]}
+
+    def assign_devices(self, request, site_id):
+        if site_id not in self.sites:
+            return 404, {'message': 'Site not found'}
+        addresses = [item.get('ip') for item in (request.json or {}).get('device', [])]
+
+        def apply():
+            for device in self.devices:
+                if device['managementIpAddress'] in addresses:
+                    self.device_site[device['id']] = site_id
+            return False, 'Devices assigned', None
+
+        return 202, self.execution_response(self.create_task(apply))
+
+    # ------------------------------------------------------------------
+    # credentials
+    # ------------------------------------------------------------------
+    def get_credentials(self, request):
+        return 200, self.credentials
+
+    def create_credentials(self, request):
+        settings = (request.json or {}).get('settings', {})
+        mapping = {'cliCredential': 'cli', 'snmpV2cRead': 'snmp_v2_read', 'snmpV2cWrite': 'snmp_v2_write'}
+
+        def apply():
+            for key, target in mapping.items():
+                for item in settings.get(key) or []:
+                    if not item.get('description'):
+                        continue
+                    if any(existing['description'] == item['description'] for existing in self.credentials[target]):
+                        continue
+                    record = {'id': self.new_id(), 'description': item['description'],
+                              'credentialType': 'GLOBAL'}
+                    if 'username' in item:
+                        record['username'] = item['username']
+                    self.credentials[target].append(record)
+            return False, 'Credentials created', None
+
+        return 202, self.execution_response(self.create_task(apply))
+
+    def global_credentials(self, request):
+        if request.query.get('credentialSubType') == 'NETCONF':
+            return 200, {'response': self.netconf_credentials, 'version': '1.0'}
+        return 200, {'response': [dict(item, credentialSubType='CLI') for item in self.credentials['cli']]}
+
+    def assign_credentials(self, request, site_id):
+        if site_id not in self.sites:
+            return 404, {'message': 'Site not found'}
+        self.site_credentials[site_id] = request.json or {}
+        return 202, self.execution_response(self.create_task(lambda: (False, 'Credentials assigned', None)))
+
+    # ------------------------------------------------------------------
+    # discovery
+    # ------------------------------------------------------------------
+    def create_discovery(self, request):
+        body = request.json or {}
+        addresses = []
+        for item in (body.get('ipAddressList') or '').split(','):
+            start, _, end = item.partition('-')
+            if start:
+                addresses.append(start.strip())
+        discovery_id = str(len(self.discoveries) + 1)
+        created = time.monotonic()
+        results = []
+        for index, address in enumerate(addresses):
+            failed = self.rng.random() < self.discovery_failure_rate
+            ready_at = created + self.discovery_time * (index + 1) / max(1, len(addresses))
+            results.append({'ip': address, 'ready_at': ready_at, 'failed': failed, 'device': None})
+        discovery = {'id': discovery_id, 'name': body.get('name'), 'created': created,
+                     'done_at': created + self.discovery_time, 'results': results}
+        self.discoveries[discovery_id] = discovery
+
+        # Discovered devices join the inventory at their own pace, the task completes with the discovery
+        for result in results:
+            if not result['failed']:
+                heapq.heappush(self.pending, (result['ready_at'], self.create_discovery_event(result)))
+        task_id = self.create_task(lambda: (False, discovery_id, discovery_id), duration=0.1,
+                                   progress=discovery_id)
+        return 202, self.task_response(task_id)
+
+    def create_discovery_event(self, result: Dict[str, Any]) -> str:
+        """Create the internal task that adds one discovered device to the inventory."""
+        def apply():
+            device = self.make_device(len(self.devices) + 100000, ip_address=result['ip'], model=DEVICE_MODELS[0])
+            self.place_device(device, self.sites[self.site_by_name['Global']['id']])
+            result['device'] = device
+            return None
+        task_id = self.new_id()
+        self.tasks[task_id] = {'id': task_id, 'apply': apply, 'endTime': None, 'startTime': 0,
+                               'isError': False, 'progress': '', 'data': None, 'failureReason': None}
+        return task_id
+
+    def discovery_state(self, discovery: Dict[str, Any]) -> Dict[str, Any]:
+        """Return the discovery resource."""
+        done = time.monotonic() >= discovery['done_at']
+        return {'id': discovery['id'], 'name': discovery['name'],
+                'discoveryStatus': 'Inactive' if done else 'Active',
+                'discoveryCondition': 'Complete' if done else 'In Progress',
+                'numDevices': sum(1 for result in discovery['results'] if result['device'])}
+
+    def get_discovery(self, request, discovery_id):
+        discovery = self.discoveries.get(discovery_id)
+        if not discovery:
+            return 404, {'response': {'errorCode': 'Not found'}}
+        return 200, {'response': self.discovery_state(discovery), 'version': '1.0'}
+
+    def discovery_devices(self, request, discovery_id):
+        discovery = self.discoveries.get(discovery_id)
+        if not discovery:
+            return 404, {'response': {'errorCode': 'Not found'}}
+        now = time.monotonic()
+        devices = []
+        for result in discovery['results']:
+            if now < result['ready_at']:
+                status, reachability = 'In Progress', 'Reachable'
+            elif result['failed']:
+                status, reachability = 'Could Not Synchronize', 'Unreachable'
+            else:
+                status, reachability = 'Managed', 'Reachable'
+            devices.append({'id': result['device']['id'] if result['device'] else None,
+                            'managementIpAddress': result['ip'],
+                            'reachabilityStatus': reachability,
+                            'inventoryCollectionStatus': status,
+                            'inventoryReachabilityStatus': reachability})
+        return 200, {'response': devices, 'version': '1.0'}
+
+    # ------------------------------------------------------------------
+    # template programmer
+    # ------------------------------------------------------------------
+    def project_view(self, project: Dict[str, Any]) -> Dict[str, Any]:
+        """Return a project with its template summaries, as get_projects does."""
+        return {'name': project['name'], 'id': project['id'], 'isDeletable': True,
+                'templates': [{'name': self.templates[template_id]['name'], 'id': template_id,
+                               'composite': False, 'language': 'JINJA'}
+                              for template_id in project['templates']]}
+
+    def get_projects(self, request):
+        name = request.query.get('name')
+        projects = [self.project_view(project) for project in self.projects.values()
+                    if not name or project['name'] == name]
+        return 200, projects
+
+    def create_project(self, request):
+        body = request.json or {}
+        project_id = self.new_id()
+
+        def apply():
+            if any(project['name'] == body.get('name') for project in self.projects.values()):
+                return True, 'Project already exists', None
+            self.projects[project_id] = {'id': project_id, 'name': body.get('name'), 'templates': []}
+            return False, 'Successfully created project', project_id
+
+        return 202, self.task_response(self.create_task(apply))
+
+    def create_template(self, request, project_id):
+        body = dict(request.json or {})
+        template_id = self.new_id()
+
+        def apply():
+            project = self.projects.get(project_id)
+            if not project:
+                return True, 'Project not found', None
+            if any(self.templates[item]['name'] == body.get('name') for item in project['templates']):
+                return True, 'Template already exists', None
+            body.update({'id': template_id, 'projectId': project_id, 'projectName': project['name'],
+                         'versionsInfo': [], 'createTime': int(time.time() * 1000),
+                         'lastUpdateTime': int(time.time() * 1000)})
+            self.templates[template_id] = body
+            project['templates'].append(template_id)
+            return False, 'Successfully created template', template_id
+
+        return 202, self.task_response(self.create_task(apply))
+
+    def update_template(self, request):
+        body = dict(request.json or {})
+        template_id = body.get('id')
+
+        def apply():
+            template = self.templates.get(template_id)
+            if not template:
+                return True, 'Template not found', None
+            template.update(body)
+            template['lastUpdateTime'] = int(time.time() * 1000)
+            return False, 'Successfully updated template', template_id
+
+        return 202, self.task_response(self.create_task(apply))
+
+    def delete_template(self, request, template_id):
+        def apply():
+            template = self.templates.pop(template_id, None)
+            if not template:
+                return True, 'Template not found', None
+            self.projects[template['projectId']]['templates'].remove(template_id)
+            return False, 'Successfully deleted template', template_id
+
+        return 202, self.task_response(self.create_task(apply))
+
+    def get_template(self, request, template_id):
+        template = self.templates.get(template_id)
+        if not template:
+            return 404, {'response': {'errorCode': 'Not found'}}
+        return 200, template
+
+    def list_templates(self, request):
+        project_id = request.query.get('projectId')
+        return 200, [{'name': template['name'], 'templateId': template['id'],
+                      'projectName': template['projectName'], 'projectId': template['projectId'],
+                      'versionsInfo': template['versionsInfo']}
+                     for template in self.templates.values()
+                     if not project_id or template['projectId'] == project_id]
+
+    def version_template(self, request):
+        body = request.json or {}
+        template_id = body.get('templateId')
+
+        def apply():
+            template = self.templates.get(template_id)
+            if not template:
+                return True, 'Template not found', None
+            template['versionsInfo'].append({'id': self.new_id(), 'version': str(len(template['versionsInfo']) + 1),
+                                             'versionComment': body.get('comments', ''),
+                                             'versionTime': int(time.time() * 1000)})
+            return False, 'Successfully committed template', template_id
+
+        return 202, self.task_response(self.create_task(apply))
+
+    def deploy_template(self, request, version='v2'):
+        body = request.json or {}
+        template_id = body.get('templateId')
+        if template_id not in self.templates:
+            return 404, {'response': {'errorCode': 'Not found', 'message': 'Template not found'}}
+        deployment_id = self.new_id()
+        targets = body.get('targetInfo') or []
+        deployment = {'deploymentId': deployment_id, 'templateId': template_id, 'status': 'IN_PROGRESS',
+                      'startTime': int(time.time() * 1000), 'devices': []}
+        for target in targets:
+            device = None
+            if target.get('type') == 'MANAGED_DEVICE_IP':
+                device = next((item for item in self.devices
+                               if item['managementIpAddress'] == target.get('id')), None)
+            elif target.get('type') == 'MANAGED_DEVICE_UUID':
+                device = self.device_by_id.get(target.get('id'))
+            deployment['devices'].append({'deviceId': device['id'] if device else None,
+                                          'ipAddress': target.get('id'),
+                                          'status': 'IN_PROGRESS' if device else 'FAILURE',
+                                          'detailedStatusMessage': None if device else 'Device not found'})
+        self.deployments[deployment_id] = deployment
+
+        def apply():
+            failed = False
+            content = self.templates[template_id].get('templateContent') or ''
+            for device in deployment['devices']:
+                if device['status'] == 'IN_PROGRESS':
+                    device['status'] = 'SUCCESS'
+                    device['detailedStatusMessage'] = 'Provisioning success'
+                    # the template content lands in front of the final 'end' of the running config
+                    config = self.running_config(self.device_by_id[device['deviceId']])
+                    self.running_configs[device['deviceId']] = \
+                        config.rsplit('\nend', 1)[0] + '\n' + content.rstrip() + '\nend'
+                failed = failed or device['status'] == 'FAILURE'
+            deployment['status'] = 'FAILURE' if failed else 'SUCCESS'
+            deployment['endTime'] = int(time.time() * 1000)
+            return failed, f'Template Deployment Id: {deployment_id}', deployment_id
+
+        task_id = self.create_task(apply)
+        if version == 'v1':
+            return 202, {'deploymentId': deployment_id, 'status': 'IN_PROGRESS', 'taskId': task_id,
+                         'message': ACCEPTED_MESSAGE}
+        return 202, self.task_response(task_id)
+
+    def deploy_template_v1(self, request):
+        return self.deploy_template(request, version='v1')
+
+    def deployment_status(self, request, deployment_id):
+        deployment = self.deployments.get(deployment_id)
+        if not deployment:
+            return 404, {'response': {'errorCode': 'Not found'}}
+        return 200, deployment
+
+    # ------------------------------------------------------------------
+    # tasks and mock control
+    # ------------------------------------------------------------------
+    def get_task(self, request, task_id):
+        task = self.tasks.get(task_id)
+        if not task:
+            return 404, {'response': {'errorCode': 'Not found', 'message': f'Task {task_id} not found'}}
+        response = {'id': task['id'], 'startTime': task['startTime'], 'isError': task['isError'],
+                    'progress': task['progress'], 'version': task['startTime']}
+        if task['endTime'] is not None:
+            response['endTime'] = task['endTime']
+            if task['data'] is not None:
+                response['data'] = task['data']
+            if task['failureReason']:
+                response['failureReason'] = task['failureReason']
+        return 200, {'response': response, 'version': '1.0'}
+
+    def get_stats(self, request):
+        return 200, {'requests': dict(self.stats), 'total': sum(self.stats.values())}
+
+    def reset_stats(self, request):
+        self.stats.clear()
+        return 200, {'requests': {}, 'total': 0}
+
+
+ROUTES = [
+    # (method, path pattern, handler name, authenticated)
+    ('POST', '/dna/system/api/v1/auth/token', 'auth_token', False),
+    ('GET', '/dna/intent/api/v1/network-device', 'network_devices', True),
+    ('GET', '/dna/intent/api/v1/network-device/count', 'network_device_count', True),
+    ('GET', '/dna/intent/api/v1/network-device/ip-address/{}', 'network_device_by_ip', True),
+    ('GET', '/dna/intent/api/v1/network-device/{}', 'network_devices', True),
+    ('GET', '/dna/intent/api/v1/network-device/{}/config', 'network_device_config', True),
+    ('GET', '/dna/intent/api/v1/device-detail', 'device_detail', True),
+    ('GET', '/dna/intent/api/v1/compliance/detail', 'compliance_detail', True),
+    ('GET', '/dna/intent/api/v1/network-health', 'network_health', True),
+    ('GET', '/dna/intent/api/v1/site', 'get_sites', True),
+    ('POST', '/dna/intent/api/v1/site', 'create_site', True),
+    ('PUT', '/dna/intent/api/v1/site/{}', 'update_site_settings', True),
+    ('PUT', '/dna/intent/api/v1/network/{}', 'update_site_settings', True),
+    ('GET', '/dna/intent/api/v1/membership/{}', 'site_membership', True),
+    ('POST', '/dna/system/api/v1/site/{}/device', 'assign_devices', True),
+    ('GET', '/dna/platform/management/business-api/v1/execution-status/{}', 'execution_status', True),
+    ('GET', '/dna/intent/api/v1/device-credential', 'get_credentials', True),
+    ('POST', '/dna/intent/api/v1/device-credential', 'create_credentials', True),
+    ('GET', '/dna/intent/api/v1/global-credential', 'global_credentials', True),
+    ('POST', '/dna/intent/api/v1/credential-to-site/{}', 'assign_credentials', True),
+    ('POST', '/dna/intent/api/v1/discovery', 'create_discovery', True),
+    ('GET', '/dna/intent/api/v1/discovery/{}', 'get_discovery', True),
+    ('GET', '/dna/intent/api/v1/discovery/{}/network-device', 'discovery_devices', True),
+    ('GET', '/dna/intent/api/v1/template-programmer/project', 'get_projects', True),
+    ('POST', '/dna/intent/api/v1/template-programmer/project', 'create_project', True),
+    ('POST', '/dna/intent/api/v1/template-programmer/project/{}/template', 'create_template', True),
+    ('GET', '/dna/intent/api/v1/template-programmer/template', 'list_templates', True),
+    ('PUT', '/dna/intent/api/v1/template-programmer/template', 'update_template', True),
+    ('POST', '/dna/intent/api/v1/template-programmer/template/version', 'version_template', True),
+    ('POST', '/dna/intent/api/v1/template-programmer/template/deploy', 'deploy_template_v1', True),
+    ('POST', '/dna/intent/api/v2/template-programmer/template/deploy', 'deploy_template', True),
+    ('GET', '/dna/intent/api/v1/template-programmer/template/deploy/status/{}', 'deployment_status', True),
+    ('GET', '/dna/intent/api/v1/template-programmer/template/{}', 'get_template', True),
+    ('DELETE', '/dna/intent/api/v1/template-programmer/template/{}', 'delete_template', True),
+    ('GET', '/dna/intent/api/v1/task/{}', 'get_task', True),
+    ('GET', '/mock/stats', 'get_stats', False),
+    ('POST', '/mock/stats/reset', 'reset_stats', False),
+]
+
+
+def match_route(method: str, path: str):
+    """Return (handler name, authenticated, path arguments) for a request, or None."""
+    parts = path.rstrip('/').split('/')
+    for route_method, pattern, handler, authenticated in ROUTES:
+        if route_method != method:
+            continue
+        pattern_parts = pattern.split('/')
+        if len(pattern_parts) != len(parts):
+            continue
+        args = []
+        for pattern_part, part in zip(pattern_parts, parts):
+            if pattern_part == '{}':
+                args.append(part)
+            elif pattern_part != part:
+                break
+        else:
+            return handler, authenticated, args, pattern
+    return None
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    """HTTP request handler dispatching to the bound MockCatalystCenter."""
+
+    controller = None
+    protocol_version = 'HTTP/1.1'
+    # Headers and body go out in separate writes; without this keep-alive clients stall on delayed ACKs
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        logger.debug(format % args)
+
+    def handle_request(self, method: str):
+        controller = self.controller
+        parsed = urlparse(self.path)
+        self.query = {key: values[-1] for key, values in parse_qs(parsed.query).items()}
+        length = int(self.headers.get('Content-Length') or 0)
+        raw_body = self.rfile.read(length) if length else b''
+        try:
+            self.json = json.loads(raw_body) if raw_body else None
+        except ValueError:
+            self.json = None
+
+        route = match_route(method, parsed.path)
+        if not route:
+            return self.send_json(404, {'error': f'No mock route for {method} {parsed.path}'})
+        handler, authenticated, args, pattern = route
+
+        delay = controller.latency + (controller.rng.random() * controller.jitter if controller.jitter else 0)
+        if delay and not pattern.startswith('/mock'):
+            time.sleep(delay)
+
+        with controller.lock:
+            controller.stats[f'{method} {pattern}'] += 1
+            if not pattern.startswith('/mock'):
+                retry_after = controller.take_rate_token()
+                if retry_after is not None:
+                    controller.stats['429'] += 1
+                    return self.send_json(429, {'error': 'Too Many Requests'},
+                                          {'Retry-After': f'{retry_after:.3f}'})
+            if authenticated and not controller.check_token(self.headers.get('X-Auth-Token')):
+                controller.stats['401'] += 1
+                return self.send_json(401, {'error': 'Unauthorized', 'message': 'Invalid or expired token'})
+            controller.advance()
+            status, body = getattr(controller, handler)(self, *args)
+        self.send_json(status, body)
+
+    def send_json(self, status: int, body: Any, headers: Optional[Dict[str, str]] = None):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        self.handle_request('GET')
+
+    def do_POST(self):
+        self.handle_request('POST')
+
+    def do_PUT(self):
+        self.handle_request('PUT')
+
+    def do_DELETE(self):
+        self.handle_request('DELETE')
+
+
+def main():
+    """Run the mock controller from the command line."""
+    parser = argparse.ArgumentParser(description='Run a local mock Catalyst Center controller')
+    parser.add_argument('--host', default='127.0.0.1', help='Address to bind to')
+    parser.add_argument('--port', type=int, default=8443, help='Port to listen on')
+    parser.add_argument('--devices', type=int, default=1000, help='Fleet size')
+    parser.add_argument('--sites', type=int, default=20, help='Number of buildings')
+    parser.add_argument('--latency', type=float, default=0.0, help='Base response latency, seconds')
+    parser.add_argument('--jitter', type=float, default=0.0, help='Random extra latency, seconds')
+    parser.add_argument('--rate-limit', type=float, default=0.0, help='Requests per second before HTTP 429')
+    parser.add_argument('--burst', type=int, default=0, help='Rate limiter bucket size')
+    parser.add_argument('--task-time', type=float, default=1.0, help='Async task completion time, seconds')
+    parser.add_argument('--discovery-time', type=float, default=30.0, help='Discovery duration, seconds')
+    parser.add_argument('--discovery-failure-rate', type=float, default=0.0,
+                        help='Share of discovered devices that fail')
+    parser.add_argument('--token-ttl', type=int, default=3600, help='Token lifetime, seconds')
+    parser.add_argument('--username', default='admin', help='Accepted username')
+    parser.add_argument('--password', default='C1sco12345', help='Accepted password')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed for the fleet')
+    args = parser.parse_args()
+
+    controller = MockCatalystCenter(devices=args.devices, sites=args.sites, latency=args.latency,
+                                    jitter=args.jitter, rate_limit=args.rate_limit, burst=args.burst,
+                                    task_time=args.task_time, discovery_time=args.discovery_time,
+                                    discovery_failure_rate=args.discovery_failure_rate,
+                                    token_ttl=args.token_ttl, username=args.username,
+                                    password=args.password, seed=args.seed)
+    controller.start(args.host, args.port)
+    try:
+        controller.thread.join()
+    except KeyboardInterrupt:
+        controller.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,360 @@
+#!/usr/bin/env python3
+"""
+Mock GitHub Server
+A local stand-in for the GitHub Git Data API (refs, commits, trees and blobs)
+of a single repository, used to exercise scripts/github_sync.py without
+touching github.com.
+"""
+
+import sys
+import json
+import time
+import base64
+import hashlib
+import logging
+import argparse
+import threading
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional, Any
+from urllib.parse import urlparse, parse_qs
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+def object_sha(kind: str, data: bytes) -> str:
+    """Return the git-style object id of {data}."""
+    return hashlib.sha1(b'%s %d\0' % (kind.encode(), len(data)) + data).hexdigest()
+
+
+class MockGitHub:
+    """In-memory repository with one branch, served over HTTP."""
+
+    def __init__(self, repository: str = 'owner/repo', branch: str = 'main',
+                 files: Optional[Dict[str, bytes]] = None, latency: float = 0.0,
+                 token: Optional[str] = None, empty: bool = False):
+        """
+        Initialize the mock repository.
+
+        Args:
+            repository: Full repository name, 'owner/name'
+            branch: Default branch
+            files: Initial path -> content of the branch head
+            latency: Response latency, in seconds
+            token: Accepted token (default: any token)
+            empty: Start without any commit, like a freshly created repository
+        """
+        self.repository = repository
+        self.branch = branch
+        self.latency = latency
+        self.token = token
+        self.blobs: Dict[str, bytes] = {}
+        self.trees: Dict[str, Dict[str, str]] = {}
+        self.commits: Dict[str, Dict[str, Any]] = {}
+        self.refs: Dict[str, str] = {}
+        self.stats = Counter()
+        self.lock = threading.RLock()
+        # list at most this many entries per tree and flag the listing truncated, like GitHub's limits
+        self.tree_limit: Optional[int] = None
+        self.server = None
+        self.thread = None
+        if not empty:
+            tree_sha = self.store_tree({path: self.store_blob(content) for path, content in (files or {}).items()})
+            self.refs[branch] = self.store_commit('Initial commit', tree_sha, [])
+
+    # ------------------------------------------------------------------
+    # object store
+    # ------------------------------------------------------------------
+    def store_blob(self, content: bytes) -> str:
+        sha = object_sha('blob', content)
+        self.blobs[sha] = content
+        return sha
+
+    def store_tree(self, entries: Dict[str, str]) -> str:
+        """Store a flattened tree (path -> blob SHA)."""
+        sha = object_sha('tree', json.dumps(entries, sort_keys=True).encode())
+        self.trees[sha] = dict(entries)
+        return sha
+
+    def store_commit(self, message: str, tree_sha: str, parents: list) -> str:
+        commit = {'message': message, 'tree': tree_sha, 'parents': parents, 'time': time.time()}
+        sha = object_sha('commit', json.dumps(commit, sort_keys=True).encode())
+        self.commits[sha] = commit
+        return sha
+
+    def files(self, branch: Optional[str] = None) -> Dict[str, bytes]:
+        """Return path -> content at the head of {branch}."""
+        with self.lock:
+            tree = self.trees[self.commits[self.refs[branch or self.branch]]['tree']]
+            return {path: self.blobs[sha] for path, sha in tree.items()}
+
+    def commit_count(self, branch: Optional[str] = None) -> int:
+        """Return the number of commits reachable from {branch} along first parents."""
+        with self.lock:
+            count = 0
+            sha = self.refs[branch or self.branch]
+            while sha:
+                count += 1
+                parents = self.commits[sha]['parents']
+                sha = parents[0] if parents else None
+            return count
+
+    # ------------------------------------------------------------------
+    # route handlers, each returning (status, body)
+    # ------------------------------------------------------------------
+    def get_repo(self, request):
+        return 200, {'full_name': self.repository, 'default_branch': self.branch}
+
+    def get_ref(self, request, branch):
+        if not self.refs:
+            # like GitHub, the Git Data API refuses to work on a repository without commits
+            return 409, {'message': 'Git Repository is empty.'}
+        if branch not in self.refs:
+            return 404, {'message': 'Not Found'}
+        return 200, {'ref': f'refs/heads/{branch}', 'object': {'type': 'commit', 'sha': self.refs[branch]}}
+
+    def update_ref(self, request, branch):
+        sha = request.json['sha']
+        if sha not in self.commits:
+            return 422, {'message': 'Object does not exist'}
+        current = self.refs.get(branch)
+        if not request.json.get('force') and current and current not in self.commits[sha]['parents']:
+            return 422, {'message': 'Update is not a fast forward'}
+        self.refs[branch] = sha
+        return 200, {'ref': f'refs/heads/{branch}', 'object': {'type': 'commit', 'sha': sha}}
+
+    def create_ref(self, request):
+        branch = request.json['ref'][len('refs/heads/'):]
+        if branch in self.refs:
+            return 422, {'message': 'Reference already exists'}
+        if request.json['sha'] not in self.commits:
+            return 422, {'message': 'Object does not exist'}
+        self.refs[branch] = request.json['sha']
+        return 201, {'ref': request.json['ref'], 'object': {'type': 'commit', 'sha': request.json['sha']}}
+
+    def put_contents(self, request, path):
+        """Contents API create: the only way to make the first commit of an empty repository."""
+        branch = request.json.get('branch') or self.branch
+        parent = self.refs.get(branch)
+        entries = dict(self.trees[self.commits[parent]['tree']]) if parent else {}
+        entries[path] = self.store_blob(base64.b64decode(request.json['content']))
+        sha = self.store_commit(request.json['message'], self.store_tree(entries), [parent] if parent else [])
+        self.refs[branch] = sha
+        return 201, {'content': {'path': path, 'sha': entries[path]}, 'commit': {'sha': sha}}
+
+    def get_commit(self, request, sha):
+        commit = self.commits.get(sha)
+        if commit is None:
+            return 404, {'message': 'Not Found'}
+        return 200, {'sha': sha, 'message': commit['message'], 'tree': {'sha': commit['tree']},
+                     'parents': [{'sha': parent} for parent in commit['parents']]}
+
+    def create_commit(self, request):
+        body = request.json
+        if body['tree'] not in self.trees:
+            return 422, {'message': 'Tree SHA does not exist'}
+        sha = self.store_commit(body['message'], body['tree'], body.get('parents', []))
+        return 201, {'sha': sha, 'tree': {'sha': body['tree']}}
+
+    def get_tree(self, request, sha):
+        # like GitHub, accept a branch name or commit SHA as well as a tree SHA
+        sha = self.refs.get(sha, sha)
+        sha = self.commits[sha]['tree'] if sha in self.commits else sha
+        tree = self.trees.get(sha)
+        if tree is None:
+            return 404, {'message': 'Not Found'}
+        entries = [{'path': path, 'mode': '100644', 'type': 'blob', 'sha': blob_sha,
+                    'size': len(self.blobs[blob_sha])} for path, blob_sha in sorted(tree.items())]
+        if request.query.get('recursive') not in ('1', 'true'):
+            entries = [entry for entry in entries if '/' not in entry['path']]
+        truncated = self.tree_limit is not None and len(entries) > self.tree_limit
+        return 200, {'sha': sha, 'tree': entries[:self.tree_limit] if truncated else entries, 'truncated': truncated}
+
+    def create_tree(self, request):
+        body = request.json
+        if not self.refs:
+            return 409, {'message': 'Git Repository is empty.'}
+        entries = dict(self.trees[body['base_tree']]) if body.get('base_tree') else {}
+        for entry in body['tree']:
+            if 'content' in entry:
+                entries[entry['path']] = self.store_blob(entry['content'].encode('utf-8'))
+            elif entry.get('sha') is None:
+                entries.pop(entry['path'], None)
+            elif entry['sha'] in self.blobs:
+                entries[entry['path']] = entry['sha']
+            else:
+                return 422, {'message': f"Blob {entry['sha']} does not exist"}
+        return 201, {'sha': self.store_tree(entries)}
+
+    def get_blob(self, request, sha):
+        content = self.blobs.get(sha)
+        if content is None:
+            return 404, {'message': 'Not Found'}
+        return 200, {'sha': sha, 'size': len(content), 'encoding': 'base64',
+                     'content': base64.b64encode(content).decode()}
+
+    def create_blob(self, request):
+        body = request.json
+        if not self.refs:
+            return 409, {'message': 'Git Repository is empty.'}
+        content = (base64.b64decode(body['content']) if body.get('encoding') == 'base64'
+                   else body['content'].encode('utf-8'))
+        return 201, {'sha': self.store_blob(content)}
+
+    def get_stats(self, request):
+        return 200, {'requests': dict(self.stats), 'total': sum(self.stats.values())}
+
+    # ------------------------------------------------------------------
+    # http server
+    # ------------------------------------------------------------------
+    def start(self, host: str = '127.0.0.1', port: int = 0) -> str:
+        """Start serving in a background thread and return the API base URL."""
+        handler = type('BoundMockGitHubHandler', (MockGitHubHandler,), {'github': self})
+        self.server = ThreadingHTTPServer((host, port), handler)
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        logger.info(f"Mock GitHub serving {self.repository} on {self.base_url}")
+        return self.base_url
+
+    def stop(self):
+        """Stop the background server."""
+        if self.server:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+
+    @property
+    def base_url(self) -> str:
+        """Base URL of the running server."""
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+ROUTES = [
+    # (method, path pattern below /repos/{owner}/{name}, handler name)
+    ('GET', '', 'get_repo'),
+    ('GET', '/git/ref/heads/{}', 'get_ref'),
+    ('PATCH', '/git/refs/heads/{}', 'update_ref'),
+    ('POST', '/git/refs', 'create_ref'),
+    ('PUT', '/contents/{}', 'put_contents'),
+    ('GET', '/git/commits/{}', 'get_commit'),
+    ('POST', '/git/commits', 'create_commit'),
+    ('GET', '/git/trees/{}', 'get_tree'),
+    ('POST', '/git/trees', 'create_tree'),
+    ('GET', '/git/blobs/{}', 'get_blob'),
+    ('POST', '/git/blobs', 'create_blob'),
+]
+
+
+def match_route(method: str, path: str):
+    """Return (handler name, path arguments, pattern) for a repository API path, or None."""
+    parts = path.rstrip('/').split('/')
+    if path.startswith('/contents/'):
+        # file paths span several segments
+        parts = ['', 'contents', path[len('/contents/'):]]
+    for route_method, pattern, handler in ROUTES:
+        pattern_parts = pattern.split('/')
+        if route_method != method or len(pattern_parts) != len(parts):
+            continue
+        args = []
+        for pattern_part, part in zip(pattern_parts, parts):
+            if pattern_part == '{}':
+                args.append(part)
+            elif pattern_part != part:
+                break
+        else:
+            return handler, args, pattern
+    return None
+
+
+class MockGitHubHandler(BaseHTTPRequestHandler):
+    """HTTP request handler dispatching to the bound MockGitHub."""
+
+    github = None
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        logger.debug(format % args)
+
+    def handle_request(self, method: str):
+        github = self.github
+        parsed = urlparse(self.path)
+        self.query = {key: values[-1] for key, values in parse_qs(parsed.query).items()}
+        length = int(self.headers.get('Content-Length') or 0)
+        raw_body = self.rfile.read(length) if length else b''
+        self.json = json.loads(raw_body) if raw_body else None
+
+        if parsed.path == '/mock/stats':
+            with github.lock:
+                return self.send_json(*github.get_stats(self))
+        prefix = f'/repos/{github.repository}'
+        route = match_route(method, parsed.path[len(prefix):]) if parsed.path.startswith(prefix) else None
+        if not route:
+            return self.send_json(404, {'message': 'Not Found'})
+        handler, args, pattern = route
+
+        if github.latency:
+            time.sleep(github.latency)
+        authorization = self.headers.get('Authorization') or ''
+        if github.token and authorization.split(' ')[-1] != github.token:
+            return self.send_json(401, {'message': 'Bad credentials'})
+        with github.lock:
+            github.stats[f'{method} {pattern or "/"}'] += 1
+            status, body = getattr(github, handler)(self, *args)
+        self.send_json(status, body)
+
+    def send_json(self, status: int, body: Any):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        self.handle_request('GET')
+
+    def do_POST(self):
+        self.handle_request('POST')
+
+    def do_PATCH(self):
+        self.handle_request('PATCH')
+
+    def do_PUT(self):
+        self.handle_request('PUT')
+
+
+def main():
+    """Run the mock GitHub repository from the command line."""
+    parser = argparse.ArgumentParser(description='Run a local mock of the GitHub Git Data API')
+    parser.add_argument('--host', default='127.0.0.1', help='Address to bind to')
+    parser.add_argument('--port', type=int, default=8080, help='Port to listen on')
+    parser.add_argument('--repository', default='owner/repo', help='Full repository name')
+    parser.add_argument('--branch', default='main', help='Default branch')
+    parser.add_argument('--latency', type=float, default=0.0, help='Response latency, seconds')
+    args = parser.parse_args()
+
+    github = MockGitHub(repository=args.repository, branch=args.branch, latency=args.latency)
+    github.start(args.host, args.port)
+    try:
+        github.thread.join()
+    except KeyboardInterrupt:
+        github.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Template Dry Run
+Renders CLI templates locally for every deployment target (Jinja2, or
+Velocity when the optional airspeed package is installed) and compares the
+result with the device's last-known running config, parsed with
+ciscoconfparse, so deployments that would not change anything are skipped
+before they take a controller deploy slot. A template whose language is not
+known cannot be dry-run and is always deployed.
+"""
+
+import re
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple, Any
+
+import jinja2
+from ciscoconfparse import CiscoConfParse
+
+try:
+    import airspeed
+except ImportError:
+    airspeed = None
+
+try:
+    from .catalyst_center_session import CatalystCenterError, CatalystCenterSession
+except ImportError:
+    from catalyst_center_session import CatalystCenterError, CatalystCenterSession
+
+logger = logging.getLogger(__name__)
+
+DEVICE_BY_IP_PATH = '/dna/intent/api/v1/network-device/ip-address/{}'
+DEVICE_CONFIG_PATH = '/dna/intent/api/v1/network-device/{}/config'
+# lines that carry no configuration of their own
+IGNORED_LINES = ('!', 'end', 'exit', 'exit-address-family')
+VELOCITY_MARKUP = re.compile(r'\$!?\{?[A-Za-z_]|^\s*#', re.MULTILINE)
+
+JINJA = jinja2.Environment(undefined=jinja2.StrictUndefined, keep_trailing_newline=True)
+
+
+def render_template(content: str, language: Optional[str], params: Dict[str, Any]) -> Optional[str]:
+    """
+    Render a template the way the controller would.
+
+    Args:
+        content: Template content
+        language: 'JINJA' or 'VELOCITY', as the controller's template record says
+        params: Template variables; the target device record is available as __device
+
+    Returns:
+        The rendered CLI, or None when it cannot be rendered locally (an unknown
+        language, an undefined variable, a syntax error, or Velocity markup without
+        airspeed installed)
+    """
+    # no guessing from the content: Jinja without markup would pass for Velocity
+    if (language or '').upper() not in ('JINJA', 'VELOCITY'):
+        return None
+    try:
+        if language.upper() == 'JINJA':
+            return JINJA.from_string(content).render(**params)
+        if not VELOCITY_MARKUP.search(content):
+            return content
+        if airspeed is None:
+            return None
+        return airspeed.Template(content).merge(dict(params))
+    except Exception as e:
+        logger.debug(f"Template could not be rendered locally: {e}")
+        return None
+
+
+def config_paths(config: str) -> List[Tuple[str, ...]]:
+    """Return every configuration line as its path of parent lines, whitespace normalized, in order."""
+    parsed = CiscoConfParse(config.splitlines(), syntax='ios', ignore_blank_lines=False)
+    paths = []
+    for line in parsed.objs:
+        text = ' '.join(line.text.split())
+        if not text or text in IGNORED_LINES or text.startswith('!'):
+            continue
+        paths.append(tuple(' '.join(parent.text.split()) for parent in line.all_parents) + (text,))
+    return paths
+
+
+def effective_diff(rendered: str, running_config: str) -> List[str]:
+    """
+    Return the rendered lines that would change the running config.
+
+    A line is effective when its path (parents and line) is not in the running
+    config; a 'no ...' line is effective only when the line it negates is.
+
+    Args:
+        rendered: Rendered template CLI
+        running_config: Device running config
+
+    Returns:
+        Effective lines, as 'parent > child' strings
+    """
+    running = set(config_paths(running_config))
+    diff = []
+    for path in config_paths(rendered):
+        text = path[-1]
+        if text.startswith('no '):
+            if path[:-1] + (text[3:],) in running:
+                diff.append(' > '.join(path))
+        elif path not in running:
+            diff.append(' > '.join(path))
+    return diff
+
+
+def get_device_config(session: CatalystCenterSession, device_ip: str) -> Tuple[Dict[str, Any], Optional[str]]:
+    """
+    Return a device record and its last-known running config.
+
+    Raises:
+        CatalystCenterError: If the device is not in the inventory
+    """
+    device = session.get(DEVICE_BY_IP_PATH.format(device_ip))['response']
+    try:
+        return device, session.get(DEVICE_CONFIG_PATH.format(device['id']))['response']
+    except CatalystCenterError as e:
+        logger.warning(f"No running config for {device_ip}: {e}")
+        return device, None
+
+
+def dry_run(session: CatalystCenterSession, jobs: List[Dict[str, Any]], templates: Dict[str, Dict[str, Any]],
+            workers: int = 8) -> List[Dict[str, Any]]:
+    """
+    Render and diff every deployment job.
+
+    Each device's record and running config are fetched once, concurrently,
+    however many templates target it.
+
+    Args:
+        session: Controller session
+        jobs: Deployment jobs ({'device', 'template_id', optional 'params', ...}), see DeploymentScheduler.run()
+        templates: Template id -> template payload ({'templateContent', 'language'}); a template
+            without a known language is not rendered and its jobs are deployed
+        workers: Concurrent running config fetches
+
+    Returns:
+        The jobs, each copied with 'rendered' and 'diff' (effective lines, or None
+        when it could not be computed and the job has to be deployed) and 'skip'
+    """
+    def fetch(device_ip):
+        try:
+            return get_device_config(session, device_ip)
+        except CatalystCenterError as e:
+            logger.warning(f"Device {device_ip} not found: {e}")
+            return None, None
+
+    devices = list(dict.fromkeys(job['device'] for job in jobs))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        configs = dict(zip(devices, pool.map(fetch, devices)))
+
+    unknown = sorted({template.get('name') or template_id for template_id, template in templates.items()
+                      if (template.get('language') or '').upper() not in ('JINJA', 'VELOCITY')})
+    if unknown:
+        logger.info(f"Cannot dry-run templates of unknown language, they are deployed: {', '.join(unknown)}")
+
+    results = []
+    for job in jobs:
+        device, running_config = configs[job['device']]
+        template = templates[job['template_id']]
+        rendered = None
+        if device is not None:
+            rendered = render_template(template.get('templateContent') or '', template.get('language'),
+                                       dict(job.get('params') or {}, __device=device))
+        diff = effective_diff(rendered, running_config) if rendered is not None and running_config is not None \
+            else None
+        results.append(dict(job, rendered=rendered, diff=diff, skip=diff == []))
+    skipped = sum(1 for result in results if result['skip'])
+    logger.info(f"Dry run: {len(results) - skipped} of {len(results)} deployments change the running config")
+    return results
@@ -0,0 +1,98 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Copyright (c) 2022 Cisco and/or its affiliates.
+This software is licensed to you under the terms of the Cisco Sample
+Code License, Version 1.1 (the "License"). You may obtain a copy of the
+License at
+               https://developer.cisco.com/docs/licenses
+All use of the material herein must be in accordance with the terms of
+the License. All rights not expressly granted by the License are
+reserved. Unless required by applicable law or agreed to separately in
+writing, software distributed under the License is distributed on an "AS
+IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express
+or implied.
+"""
+
+__author__ = "Keith Baldwin SE, CA-CoE"
+__email__ = "kebaldwi@cisco.com"
+__version__ = "0.1.0"
+__copyright__ = "Copyright (c) 2022 Cisco and/or its affiliates."
+__license__ = "Cisco Sample Code License, Version 1.1"
+
+import os
+import time
+import urllib3
+import json
+import sys
+import logging
+import datetime
+import yaml
+
+from urllib3.exceptions import InsecureRequestWarning  # for insecure https warnings
+from datetime import datetime
+from pathlib import Path  # used for relative path to "templates_jenkins" folder
+
+urllib3.disable_warnings(InsecureRequestWarning)  # disable insecure https warnings
+
+# pooled session and the provisioning graph, from the repository scripts/ folder
+sys.path.insert(0, str(Path(__file__).resolve().parents[3] / 'scripts'))
+from catalyst_center_session import shared_session  # noqa: E402
+from catalyst_center_sites import read_hierarchy_csv  # noqa: E402
+from catalyst_center_provisioning import Day0Provisioner  # noqa: E402
+
+os.environ['TZ'] = 'America/Los_Angeles'  # define the timezone for PST
+time.tzset()  # adjust the timezone, more info https://help.pythonanywhere.com/pages/SettingTheTimezone/
+
+# project path
+project_details_path = Path(__file__).parent/'../DEVWKS-2176/project_details.yml'
+with open(project_details_path, 'r') as file:
+    project_data = yaml.safe_load(file)
+DNAC_URL = 'https://' + project_data['dna_center']['ip_address']
+DNAC_USER = project_data['dna_center']['username']
+DNAC_PASS = project_data['dna_center']['password']
+
+# template project for the templates defined in the CSV
+TEMPLATE_PROJECT = 'DEVNET-IGNITE'
+# provisioning steps running at once, across sites
+MAX_WORKERS = 16
+# step results of the last run
+REPORT_PATH = Path(__file__).parent/'../DEVWKS-2176/reports/day0_provisioning.json'
+
+def main():
+    """
+    This app will provision everything DNAC-Design-Settings.csv describes, in one run:
+    site hierarchy, network settings, credentials, device discovery, site assignment and
+    template deployment. The CSV is read once and every site runs its own chain of steps,
+    each starting as soon as the steps it depends on are done, instead of the separate
+    deploy_hierarchy.py, deploy_settings.py and device_discovery.py runs with fixed sleeps.
+    """
+
+    # logging basic
+    logging.basicConfig(level=logging.INFO)
+
+    current_time = str(datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
+    logging.info('App "day0_provisioning.py" Start, ' + current_time)
+
+    # parse the input data
+    rows = read_hierarchy_csv('DNAC-Design-Settings.csv')
+
+    # pooled controller session with a cached token
+    session = shared_session(DNAC_URL, DNAC_USER, DNAC_PASS, verify=False)
+
+    # build and run the provisioning graph
+    results = Day0Provisioner(session, rows, project_name=TEMPLATE_PROJECT, workers=MAX_WORKERS).run()
+
+    # save the step results
+    os.makedirs(REPORT_PATH.parent, exist_ok=True)
+    with open(REPORT_PATH, 'w') as f:
+        json.dump({name: {key: value for key, value in result.items() if key != 'result'}
+                   for name, result in results.items()}, f, indent=4)
+    logging.info('  Step results saved to ' + str(REPORT_PATH))
+
+    date_time = str(datetime.now().replace(microsecond=0))
+    logging.info('  App "day0_provisioning.py" end, : ' + date_time)
+    return 0 if all(result['status'] == 'SUCCESS' for result in results.values()) else 1
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -61,6 +61,14 @@ DNAC_PASS = project_data['dna_center']['password']
 
 DNAC_AUTH = HTTPBasicAuth(DNAC_USER, DNAC_PASS)
 
+# pooled session and site hierarchy index, from the repository scripts/ folder
+sys.path.insert(0, str(Path(__file__).resolve().parents[3] / 'scripts'))
+from catalyst_center_session import shared_session  # noqa: E402
+from catalyst_center_sites import SiteIndex, row_site_path  # noqa: E402
+
+# site hierarchy index, see site_index()
+SITE_INDEX = None
+
 # get_dnac_token
 def get_dnac_token(dnac_auth):
     """
@@ -76,62 +84,31 @@ def get_dnac_token(dnac_auth):
     dnac_jwt_token = response_json['Token']
     return dnac_jwt_token
 
-# get_site_hierarchy
-def get_site_hierarchy(dnac_token):
+# site_index
+def site_index():
     """
-    This function will return the site hierarchy
-    :param dnac_token: Cisco DNA Center auth token
-    :return: response in JSON
+    Return the site hierarchy index shared by every row of the run, fetched once
+    :return: SiteIndex with exact lookups by siteNameHierarchy, id and parent
     """
-    url = (f"{DNAC_URL}/dna/intent/api/v1/site")
-    header = {'content-type': 'application/json', 'x-auth-token': dnac_token}
-    response = requests.get(url, headers=header, verify=False)
-    response_json = response.json()
-    return response_json, response.status_code
+    global SITE_INDEX
+    if SITE_INDEX is None:
+        SITE_INDEX = SiteIndex.fetch(shared_session(DNAC_URL, DNAC_USER, DNAC_PASS, verify=False))
+    return SITE_INDEX
 
 # get_target_site_id
 def get_target_site_id(dnac_token, parent_name, area_name, building_name, floor_name):
-    response, status_code = get_site_hierarchy(dnac_token)
-    #print(f"Looking in: {response}")
-    #print(f"looking for:{parent_name},{area_name},{building_name},{floor_name}")
-    # Get the target site id
-    #jsonData = json.loads(responseBody)
-    parent = parent_name
-    if area_name != "":
-        area = (f"{parent_name}/{area_name}")
-    else:
-        area = ""
-    if building_name != "":
-        bldg = (f"{parent_name}/{area_name}/{building_name}")
-    else:
-        bldg = ""
-    if floor_name != "":
-        floor = (f"{parent_name}/{area_name}/{building_name}/{floor_name}")
-    else:
-        floor = ""
-    #print(f"parent: {parent}, area: {area}, bldg: {bldg}, floor: {floor}")
-    if parent_name == "Global":
-        if area_name != "":
-            for i in range(len(response["response"])):
-                if response["response"][i]["siteNameHierarchy"] == area:
-                    TargetSiteId = response["response"][i]["id"]
-                    logging.info('Area Site Id acquired.')
-                    #print(TargetSiteId)
-                    break
-        else:
-            for i in range(len(response["response"])):
-                if response["response"][i]["siteNameHierarchy"] == parent:
-                    TargetSiteId = response["response"][i]["id"]
-                    logging.info('Global Site Id acquired.')
-                    #print(TargetSiteId)
-                    break
+    """
+    Return the id of the deepest site named, e.g. the floor of parent/area/building/floor
+    :return: site id, or None when the site does not exist
+    """
+    site_path = row_site_path({'HierarchyParent': parent_name, 'HierarchyArea': area_name,
+                               'HierarchyBldg': building_name, 'HierarchyFloor': floor_name})
+    # sites created since the index was built, e.g. by another script, are fetched on a miss
+    TargetSiteId = site_index().find(shared_session(DNAC_URL, DNAC_USER, DNAC_PASS, verify=False), site_path)
+    if TargetSiteId:
+        logging.info('Site Id acquired for ' + site_path)
     else:
-        for i in range(len(response["response"])):
-            if response["response"][i]["siteNameHierarchy"] == floor:
-                TargetSiteId = response["response"][i]["id"]
-                logging.info('Floor Site Id acquired.')
-                #print(TargetSiteId)
-                break
+        logging.info('Site not found: ' + site_path)
     return TargetSiteId
 
 # create_site_settings    
@@ -36,18 +36,46 @@ import json
 import datetime
 import yaml
 import logging
+import argparse
 from template_sync import github_pull
 
 from datetime import datetime
 from urllib3.exceptions import InsecureRequestWarning  # for insecure https warnings
-from dnacentersdk import DNACenterAPI   
 from pprint import pprint
 from pathlib import Path  # used for relative path to "templates_jenkins" folder
 urllib3.disable_warnings(InsecureRequestWarning)  # disable insecure https warnings
 
+# pooled session and template operations that wait on their tasks, from the repository scripts/ folder
+sys.path.insert(0, str(Path(__file__).resolve().parents[3] / 'scripts'))
+from catalyst_center_session import shared_session  # noqa: E402
+from catalyst_center_templates import TemplateIndex, sync_template, template_digest, DeploymentScheduler  # noqa: E402
+from template_dry_run import dry_run  # noqa: E402
+from deployment_journal import DeploymentJournal  # noqa: E402
+
 os.environ['TZ'] = 'America/Los_Angeles'  # define the timezone for PST
 time.tzset()  # adjust the timezone, more info https://help.pythonanywhere.com/pages/SettingTheTimezone/
 
+# template deployments submitted to the controller at once, across devices
+MAX_IN_FLIGHT = 8
+
+# persist the project/template name -> id index between runs, e.g. 'reports/template_index.json'; None keeps it per run
+TEMPLATE_INDEX_CACHE = None
+
+# render every template locally and diff it against the device running config before deploying;
+# deployments that would not change the running config are skipped. Templates whose language the
+# controller does not report (e.g. right after they were created) cannot be dry-run and are deployed
+SKIP_UNCHANGED = True
+
+# render and diff only, write the reports with the effective diff and deploy nothing
+DRY_RUN = False
+
+# a role configured with a single template deploys it to the first device of the role only (as always);
+# True deploys it to every device of the role, in one grouped deploy request
+SINGLE_TEMPLATE_TO_ROLE = False
+
+# append-only record of submitted deployment tasks and their final statuses, read back by --resume
+DEPLOYMENT_JOURNAL = Path(__file__).parent/'../DEVWKS-2176/reports/deployment_journal.jsonl'
+
 # directory search for files
 def search_files(directory):
     files = []
@@ -69,7 +97,13 @@ def main():
      - verify the device hostname is valid
      - deploy the template
      - verify completion and status of the template deployment
+    With --resume, deployments that finished in the interrupted previous run are skipped and
+    deployments still in flight are followed to completion instead of being submitted again.
     """
+    parser = argparse.ArgumentParser(description='Sync and deploy the CLI templates of the pod')
+    parser.add_argument('--resume', action='store_true',
+                        help='continue the previous run from the deployment journal')
+    args = parser.parse_args()
 
     # logging, debug level, to file {application_run.log}
     logging.basicConfig(level=logging.INFO)
@@ -98,33 +132,27 @@ def main():
     logging.info('Project Name: ' + PROJECT_NAME)
     logging.info('Pod Name: ' + POD_NAME)
 
-    # Create a DNACenterAPI "Connection Object"
-    dnac_api = DNACenterAPI(username=DNAC_USER, password=DNAC_PASS, base_url=DNAC_URL, version='2.2.2.3', verify=False)
+    # pooled controller session with a cached token
+    session = shared_session(DNAC_URL, DNAC_USER, DNAC_PASS, verify=False)
 
     # creating unique project name based on the pod name
     TEMPLATE_PROJECT_NAME = PROJECT_NAME + '-' + POD_NAME
     logging.info('Template Project Name: ' + TEMPLATE_PROJECT_NAME)
 
+    # project and template name -> id index, one project listing per run (or none with a persisted index)
+    template_index = TemplateIndex(session, cache_path=TEMPLATE_INDEX_CACHE)
+
     # check if existing project, if not create a new project
-    response = dnac_api.configuration_templates.get_projects(name=TEMPLATE_PROJECT_NAME)
-    if response == []:
-        # project does not exist, create project
-        payload_data = {'name': TEMPLATE_PROJECT_NAME}
-        response = dnac_api.configuration_templates.create_project(payload=payload_data)
+    if template_index.project_id(TEMPLATE_PROJECT_NAME) is None:
+        # project does not exist, create project and wait for the task
+        project_id = template_index.ensure_project(TEMPLATE_PROJECT_NAME)
         logging.info('  Template Project Name: ' + TEMPLATE_PROJECT_NAME + ' created')
-        time.sleep(15)
-        response = dnac_api.configuration_templates.get_projects(name=TEMPLATE_PROJECT_NAME)
     else:
+        project_id = template_index.project_id(TEMPLATE_PROJECT_NAME)
         logging.info('  Template Project Name: ' + TEMPLATE_PROJECT_NAME + ' already exists')
-    project_id = response[0]['id']
     logging.info('    Template Project Name: ' + TEMPLATE_PROJECT_NAME)
     logging.info('    Template Project ID : ' + project_id)
 
-    # verify if template exist, delete if it does
-    response = dnac_api.configuration_templates.get_projects(name=TEMPLATE_PROJECT_NAME)
-    templates_list = response[0]['templates']
-    template_id = None
-
     # get the template information
     #border_templates_list = project_data['template_info']['border']['templates']
     #edge_templates_list = project_data['template_info']['edge']['templates']
@@ -145,17 +173,10 @@ def main():
     edge_template_file_names = edge_templates_list.split(',')
     template_name_list = border_template_file_names + edge_template_file_names
     
-    for template in templates_list:
-        for template_name in template_name_list:
-            if template['name'] == template_name:
-                template_id = template['id']
-                response = dnac_api.configuration_templates.deletes_the_template(template_id=template_id)
-                logging.info('Template found on DNA Center and deleted')
-                time.sleep(15)
-            #elif template_id is not None:
-                #response = dnac_api.configuration_templates.deletes_the_template(template_id=template_id)
-                #logging.info('Template found and deleted')
-                #time.sleep(15)
+    # existing templates of the project, updated in place instead of deleted and recreated
+    for template_name in template_name_list:
+        if template_index.template_id(TEMPLATE_PROJECT_NAME, template_name):
+            logging.info('Template found on DNA Center: ' + template_name)
 
     # sync templates from GitHub repo to local folder if not already done
     directory = '../DEVWKS-2176/templates'
@@ -181,9 +202,10 @@ def main():
         logging.info('No files found in directory: ' + directory)
         github_pull()
     
-    # create the new CLI templates
-    logging.info('Creating Templates on DNA Center in Project: ' + TEMPLATE_PROJECT_NAME)
+    # create or update the CLI templates, only templates whose content or parameters changed are updated and committed
+    logging.info('Syncing Templates on DNA Center in Project: ' + TEMPLATE_PROJECT_NAME)
     deployment_cli_config_commands = []
+    template_payloads = []
 
     for template_name in template_name_list:
         template_file_path = Path(__file__).parent/f'../DEVWKS-2176/templates/{template_name}'
@@ -212,111 +234,123 @@ def main():
             "parentTemplateId": project_id,
             "templateParams": []
         }
-        response = dnac_api.configuration_templates.create_template(project_id=project_id,payload=payload_template)
-        task_id = response['response']['taskId']
-        logging.info('    Created template: ' + template_name + ' in project: ' + TEMPLATE_PROJECT_NAME)
-        time.sleep(15)
-
-        # check the task result
-        response = dnac_api.configuration_templates.get_projects(name=TEMPLATE_PROJECT_NAME)
-        templates_list = response[0]['templates']
-        template_id = None
-        for template in templates_list:
-            if template['name'] == template_name:
-                template_id = template['id']
-        
-        # commit the template
-        commit_payload = {
-            'comments': 'Jenkins committed',
-            'templateId': template_id
-        }
-        response = dnac_api.configuration_templates.version_template(payload=commit_payload)
-        logging.info('      Template committed')
-        time.sleep(5)
+        result = sync_template(session, project_id, payload_template,
+                               template_index.template_id(TEMPLATE_PROJECT_NAME, template_name),
+                               comments='Jenkins committed')
+        # the dry run renders a template only in the language the controller's record gives it
+        template_payloads.append(dict(payload_template, language=result['language']))
+        if result['action'] == 'created':
+            template_index.add_template(TEMPLATE_PROJECT_NAME, template_name, result['id'])
+        logging.info('    Template ' + template_name + ' ' + result['action'] + ' in project: ' + TEMPLATE_PROJECT_NAME)
+        if result['committed']:
+            logging.info('      Template committed')
 
     # deploy the templates
     logging.info('Deploying templates from project: ' + TEMPLATE_PROJECT_NAME)
-    response = dnac_api.configuration_templates.get_projects(name=TEMPLATE_PROJECT_NAME)
-    templates_list = response[0]['templates']
-    template_id = []
     device_ip = []
-    
+
     # Gathering the template IDs
     logging.info('  Acquiring template IDs from project')
-    for template_name in template_name_list:
-        for template in templates_list:
-            if template['name'] == template_name:
-                template_id.append(template['id'])
-                break
+    template_id = [template_index.template_id(TEMPLATE_PROJECT_NAME, template_name)
+                   for template_name in template_name_list]
     logging.info('  Acquired template IDs from project')
 
     # Gathering the device targets IDs
     logging.info('  Acquiring device IDs from targets')
-    for template_name in template_name_list:        
+    for template_name in template_name_list:
+        tgt_devices = []
         # check if template is a border template
         if template_name in border_template_file_names:
             if template_name == border_templates_list:
-                tgt_device = border_devices_list[0]
-                device_ip.append(tgt_device)
-                logging.info('    Acquired device ' + str(tgt_device) + ' target for template: ' + template_name)
+                tgt_devices = list(border_devices_list) if SINGLE_TEMPLATE_TO_ROLE else [border_devices_list[0]]
             else:
-                for i in range(len(border_template_file_names)):
-                    if template_name == border_template_file_names[i]:
-                        tgt_device = border_devices_list[i]
-                        device_ip.append(tgt_device)
-                        logging.info('    Acquired device ' + str(tgt_device) + ' target for template: ' + template_name)
+                tgt_devices = [border_devices_list[i] for i in range(len(border_template_file_names))
+                               if template_name == border_template_file_names[i]]
         elif template_name in edge_template_file_names:
             # check if template is an edge template
             if template_name == edge_templates_list:
-                tgt_device = edge_devices_list[0]
-                device_ip.append(tgt_device)
-                logging.info('    Acquired device ' + str(tgt_device) + ' target for template: ' + template_name)
+                tgt_devices = list(edge_devices_list) if SINGLE_TEMPLATE_TO_ROLE else [edge_devices_list[0]]
             else:
-                for i in range(len(edge_template_file_names)):
-                    if template_name == edge_template_file_names[i]:
-                        tgt_device = edge_devices_list[i]
-                        device_ip.append(tgt_device)
-                        logging.info('    Acquired device ' + str(tgt_device) + ' target for template: ' + template_name)
+                tgt_devices = [edge_devices_list[i] for i in range(len(edge_template_file_names))
+                               if template_name == edge_template_file_names[i]]
+        # one entry per template, empty for a template of neither role, so device_ip lines up with template_id
+        device_ip.append(tgt_devices)
+        logging.info('    Acquired devices ' + str(tgt_devices) + ' target for template: ' + template_name)
 
     # Deploying templates to device targets IDs
     logging.info('  Deploying templates to device IDs')
-    
-    for i in range(len(device_ip)):
-        deploy_payload = {
-                "forcePushTemplate": True,
-                "targetInfo": [
-                    {
-                        "id": device_ip[i],
-                        "type": "MANAGED_DEVICE_IP"
-                    }
-                ],
-                "templateId": template_id[i]
-            }
-        response = dnac_api.configuration_templates.deploy_template_v2(payload=deploy_payload)
-        task_id = response['response']['taskId']
-        logging.info('    Deployed template to device: ' + device_ip[i])
-        time.sleep(15)
-        
-        # retrieve the deployment status
-        response = dnac_api.task.get_task_by_id(task_id=task_id)
-        deployment_status = response['response']['isError']
-        if deployment_status is False:
-            logging.info('      Deployment successful')
+
+    # save each deployment report to file as soon as its task ends
+    journal = DeploymentJournal(str(DEPLOYMENT_JOURNAL))
+
+    def save_report(result):
+        if result['status'] != 'DRY_RUN':
+            journal.completed(result)
+        i = result['index']
+        deployment_status = result['status'] not in ('SUCCESS', 'SKIPPED', 'DRY_RUN')
+        if result['status'] == 'SKIPPED':
+            logging.info('    Skipped template for device: ' + result['device'])
+            logging.info('      No change to the running configuration')
+        elif result['status'] == 'DRY_RUN':
+            logging.info('    Dry run of template for device: ' + result['device'])
+            logging.info('      Effective changes: ' + str(result['diff']))
         else:
-            logging.info('      Deployment not successful')
-            
-        # save deployment report to file
+            logging.info('    Deployed template to device: ' + result['device'])
+            if deployment_status is False:
+                logging.info('      Deployment successful')
+            else:
+                logging.info('      Deployment not successful: ' + str(result['error']))
+
         deployment_report = {
             'timestamp': current_time,
             'template_content': deployment_cli_config_commands[i],
             'report': deployment_status}
-        report_file_path = Path(__file__).parent/f'../DEVWKS-2176/reports/{device_ip[i]}_{date_time_str}_deployment_report.json'
+        if 'diff' in result:
+            deployment_report['status'] = result['status']
+            deployment_report['effective_diff'] = result['diff']
+        report_file_path = Path(__file__).parent/f'../DEVWKS-2176/reports/{result["device"]}_{date_time_str}_deployment_report.json'
         with open(report_file_path, 'w', encoding='utf-8') as f:
             f.write(json.dumps(deployment_report))
-        
-        logging.info(f'Deployment Report Created for {device_ip[i]}:')
+
+        logging.info(f'Deployment Report Created for {result["device"]}:')
         logging.info(json.dumps(deployment_report))
-    
+
+    # every template goes out in one deploy request for all of its devices, the per-device statuses are
+    # fanned back out; templates for the same device run in order, one shared poller follows every task;
+    # the digest of the committed content lets --resume tell an edited template from the one it deployed
+    jobs = [{'index': i, 'device': tgt_device, 'template_id': template_id[i],
+             'digest': template_digest(template_payloads[i])}
+            for i in range(len(template_id)) for tgt_device in device_ip[i]]
+
+    # pick up an interrupted run: finished deployments are skipped, in-flight tasks are reattached to
+    if args.resume and not DRY_RUN:
+        jobs, done_jobs = journal.resume(jobs)
+        for job in done_jobs:
+            logging.info('    Already deployed template to device: ' + job['device'] + ', ' + job['status'])
+    elif not DRY_RUN:
+        journal.start()
+
+    # local render and diff against the last-known running configs, unchanged targets are not deployed
+    if SKIP_UNCHANGED or DRY_RUN:
+        logging.info('  Rendering templates and diffing against device running configs')
+        planned = dry_run(session, [job for job in jobs if 'task_id' not in job],
+                          {template_id[i]: template_payloads[i] for i in range(len(template_id))},
+                          workers=MAX_IN_FLIGHT)
+        changed_jobs = []
+        for job in planned:
+            job = {key: value for key, value in job.items() if key not in ('rendered', 'skip')}
+            if DRY_RUN or job['diff'] == []:
+                save_report(dict(job, status='DRY_RUN' if DRY_RUN else 'SKIPPED', error=None))
+            else:
+                changed_jobs.append(job)
+        logging.info('  ' + str(len(changed_jobs)) + ' of ' + str(len(planned)) + ' deployments to run')
+        jobs = [job for job in jobs if 'task_id' in job] + changed_jobs
+
+    scheduler = DeploymentScheduler(session, max_in_flight=MAX_IN_FLIGHT, on_complete=save_report, grouped=True,
+                                    on_submit=journal.submitted)
+    scheduler.run(jobs)
+    journal.close()
+
     date_time = str(datetime.now().replace(microsecond=0))
     logging.info('End of Application "deploy_templates.py" Run: ' + date_time)
     return
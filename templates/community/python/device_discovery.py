@@ -23,6 +23,7 @@ __license__ = "Cisco Sample Code License, Version 1.1"
 import json
 import logging
 import os
+import sys
 import time
 import yaml
 import base64
@@ -38,6 +39,11 @@ from dnacentersdk import DNACenterAPI
 #from dotenv import load_dotenv
 from requests.auth import HTTPBasicAuth  # for Basic Auth
 
+# discovery watcher, from the repository scripts/ folder
+sys.path.insert(0, str(Path(__file__).resolve().parents[3] / 'scripts'))
+from catalyst_center_session import CatalystCenterError  # noqa: E402
+from catalyst_center_provisioning import discovery_id_of, watch_discovery  # noqa: E402
+
 #load_dotenv('environment.env')
 
 # project path
@@ -51,6 +57,9 @@ GITHUB_USERNAME = project_data['github']['username']
 GITHUB_TOKEN = project_data['github']['token']
 GITHUB_REPO = project_data['github']['repository']
 
+# a device still collecting inventory this many seconds after the discovery found it is reported as failed
+DEVICE_TIMEOUT = 600
+
 # Example from .env
 """
 DNAC_URL = os.getenv('DNAC_URL')
@@ -66,9 +75,25 @@ time.tzset()  # adjust the timezone, more info https://help.pythonanywhere.com/p
 
 DNAC_AUTH = HTTPBasicAuth(DNAC_USER, DNAC_PASS)
 
+def assign_site_device(dnac_auth, TargetSiteId, site_hierarchy, devices, responsecheck):
+    """
+    This function will assign devices to a site and log the outcome
+    :param dnac_auth: Cisco DNA Center auth token
+    :param TargetSiteId: Cisco DNA Center site id
+    :param site_hierarchy: site name hierarchy, for the log
+    :param devices: list of device ip addresses
+    :param responsecheck: message of an accepted request
+    """
+    response, status_code = assign_device(dnac_auth, TargetSiteId, ','.join(devices))
+    if responsecheck in response.get('message', '') and status_code == 202:
+        logging.info('    Device ' + ', '.join(devices) + ' successfully assigned to ' + site_hierarchy)
+    else:
+        logging.error('    Device ' + ', '.join(devices) + ' failed to assign to ' + site_hierarchy)
+
 def main():
     """
-    This app will create a new discovery if the devices in the file do not exist in the inventory
+    This app will create a new discovery if the devices in the file do not exist in the inventory,
+    follow it device by device and assign every device to its site as soon as it is managed
     """
 
     # logging basic
@@ -148,24 +173,30 @@ def main():
                             logging.info('    Device ' + device + ' needs to be added to inventory')
                         else:
                             logging.info('    Device ' + device + ' already exists in inventory')
+                    # devices already in the inventory are assigned right away
+                    device_present = [device for device in devices if device not in device_missing]
+                    if device_present:
+                        assign_site_device(dnac_auth, TargetSiteId, site_hierarchy, device_present, responsecheck)
                     if device_missing:
                         response = create_discovery(dnac_auth, site_hierarchy, device_missing, dcloud_user_id, dcloud_snmp_RO_id, dcloud_snmp_RW_id, dcloud_netconf_id)
-                        response = json.dumps(response)
-                        if 'taskId' in response:
-                            logging.info('    Discovery successfully created for ' + str(device_missing))
-                        else:
+                        if 'taskId' not in json.dumps(response):
                             logging.info('    Discovery failed to create for ' + str(device_missing))
-                        time.sleep(15)
-                    logging.info('    *** Waiting 5 mins for Discovery to finish ***')
-                    time.sleep(300)
-                    # assign the device to the site
-                    response, status_code = assign_device(dnac_auth, TargetSiteId, device_list) 
-                    if responsecheck in response['message'] and status_code == 202:
-                        logging.info('    Device successfully assigned to ' + site_hierarchy)
-                    else:
-                        logging.info('    Device failed to assign to ' + site_hierarchy)
-                    time.sleep(15)
-    
+                            continue
+                        # a discovery that fails to start, times out or cannot be polled only stops its own row
+                        try:
+                            discovery_id = discovery_id_of(dnac_session(), response)
+                            logging.info('    Discovery ' + discovery_id + ' successfully created for ' + str(device_missing))
+                            # follow the discovery device by device, assigning each one as soon as it is managed
+                            for result in watch_discovery(dnac_session(), discovery_id, device_missing, device_timeout=DEVICE_TIMEOUT):
+                                if result['status'] == 'MANAGED':
+                                    logging.info('    Device ' + result['ip'] + ' is managed')
+                                    assign_site_device(dnac_auth, TargetSiteId, site_hierarchy, [result['ip']], responsecheck)
+                                else:
+                                    logging.error('    Device ' + result['ip'] + ' discovery ' + result['status'] + ': ' + str(result['error']))
+                        except CatalystCenterError as e:
+                            logging.error('    Discovery failed for ' + str(device_missing) + ': ' + str(e))
+                            continue
+
     #get_device_inventory()
     date_time = str(datetime.now().replace(microsecond=0))
     logging.info('  App "device_discovery.py" end, : ' + date_time)
@@ -22,8 +22,10 @@ __license__ = "Cisco Sample Code License, Version 1.1"
 
 
 import json
+import asyncio
 import logging
 import os
+import sys
 import time
 import yaml
 import base64
@@ -31,7 +33,6 @@ import requests
 import datetime
 
 from pprint import pprint
-from github import Github
 from pathlib import Path  # used for relative path to "templates_jenkins" folder
 
 from dnacentersdk import DNACenterAPI
@@ -51,6 +52,7 @@ DNAC_PASS = project_data['dna_center']['password']
 GITHUB_USERNAME = project_data['github']['username']
 GITHUB_TOKEN = project_data['github']['token']
 GITHUB_REPO = project_data['github']['repository']
+GITHUB_API = project_data['github'].get('api_url', 'https://api.github.com')
 DEVNET_POD = project_data['project']['pod']
 
 # Example from .env
@@ -68,6 +70,27 @@ time.tzset()  # adjust the timezone, more info https://help.pythonanywhere.com/p
 
 DNAC_AUTH = HTTPBasicAuth(DNAC_USER, DNAC_PASS)
 
+# concurrent device list page requests
+PAGE_WORKERS = 8
+
+# collect with the asyncio pipeline (needs httpx), e.g. for controllers where per-device calls are unavoidable
+ASYNC_COLLECTOR = False
+ASYNC_CONCURRENCY = 32
+ASYNC_RATE_LIMIT = 0  # requests per second, 0 for no client-side limit
+
+# incremental mode: keep a rolling snapshot keyed by device id, revisit only devices whose lastUpdateTime changed,
+# and write/push a delta file plus the snapshot instead of full timestamped inventories
+INCREMENTAL = False
+
+# pooled session and paged inventory helpers from the repository scripts/ folder
+sys.path.insert(0, str(Path(__file__).resolve().parents[3] / 'scripts'))
+from catalyst_center_session import shared_session  # noqa: E402
+from catalyst_center_inventory import (get_device_count, collect_inventory, collect_inventory_delta,  # noqa: E402
+                                       load_snapshot, save_snapshot, split_inventory,
+                                       get_compliance_details, compliance_matrix, non_compliant)
+from github_sync import GitHubRepo, repo_full_name  # noqa: E402
+from inventory_store import write_inventory  # noqa: E402
+
 
 def time_sleep(time_sec):
     """
@@ -85,6 +108,19 @@ def time_sleep(time_sec):
     return
 
 
+async def collect_inventory_with_asyncio():
+    """
+    Collect the device and AP inventories with the asyncio pipeline
+    :return: device inventory, ap inventory
+    """
+    from catalyst_center_async import AsyncCatalystCenterSession, collect_inventory_async
+
+    async with AsyncCatalystCenterSession(DNAC_URL, DNAC_USER, DNAC_PASS, verify=False,
+                                          concurrency=ASYNC_CONCURRENCY,
+                                          rate_limit=ASYNC_RATE_LIMIT) as session:
+        return await collect_inventory_async(session)
+
+
 def main():
     """
     This application will automate Day N operations, creating device inventories, using the Cisco DNA Center REST APIs
@@ -106,101 +142,81 @@ def main():
     date_time_str = str(datetime.now().strftime('%m-%d-%Y_%H-%M-%S'))
     logging.info('  App "device_inventory.py" run start, ' + current_time)
 
-    # create a DNACenterAPI "Connection Object" to use the Python SDK
-    dnac_api = DNACenterAPI(username=DNAC_USER, password=DNAC_PASS, base_url=DNAC_URL, version='2.2.3.3',
-                            verify=False)
+    # pooled session with a cached token for the paged device list
+    dnac_session = shared_session(DNAC_URL, DNAC_USER, DNAC_PASS, verify=False)
 
     # get the device count
-    response = dnac_api.devices.get_device_count()
-    device_count = response['response']
+    device_count = get_device_count(dnac_session)
     logging.info('  Number of devices managed by Cisco DNA Center: ' + str(device_count))
 
-    # get the device info list
-    offset = 1
-    limit = 500
-    device_list = []
-    while offset <= device_count:
-        response = dnac_api.devices.get_device_list(offset=offset)
-        offset += limit
-        device_list.extend(response['response'])
-    logging.info('  Collected the device list from Cisco DNA Center')
-
     # create device inventory [{"hostname": "", "device_ip": "","device_id": "", "version": "", "device_family": "",
     #  "role": "", "site": "", "site_id": ""},...]
-    device_inventory = []
-    ap_inventory = []
-    for device in device_list:
-        # select which inventory to add the device to
-        if device.family != "Unified AP":
-            device_details = {'hostname': device['hostname']}
-            device_details.update({'device_ip': device['managementIpAddress']})
-            device_details.update({'device_id': device['id']})
-            device_details.update({'version': device['softwareVersion']})
-            device_details.update({'device_family': device['type']})
-            device_details.update({'role': device['role']})
-
-            # get the device site hierarchy
-            response = dnac_api.devices.get_device_detail(identifier='uuid', search_by=device['id'])
-            site = response['response']['location']
-            device_details.update({'site': site})
-
-            # get the site id
-            response = dnac_api.sites.get_site(name=site)
-            site_id = response['response'][0]['id']
-            device_details.update({'site_id': site_id})
-            device_inventory.append(device_details)
+    # the device list pages are fetched concurrently and streamed in order; sites come from one hierarchy
+    # fetch and one membership call per site, instead of a device detail and a site lookup per device
+    written_files = []
+    if INCREMENTAL:
+        snapshot_file = f'{DEVNET_POD}_inventory_snapshot.json'
+        delta, snapshot = collect_inventory_delta(dnac_session, load_snapshot(f'inventory/{snapshot_file}'),
+                                                  workers=PAGE_WORKERS, device_count=device_count)
+        device_inventory, ap_inventory = split_inventory(snapshot)
+        logging.info('  Updated the device inventory snapshot from Cisco DNA Center')
+
+        # save the delta, only when something changed, and the rolling snapshot
+        if delta['added'] or delta['changed'] or delta['removed']:
+            delta_file = f'{DEVNET_POD}-{date_time_str}_inventory_delta.json'
+            with open(f'inventory/{delta_file}', 'w') as f:
+                f.write(json.dumps(delta))
+            written_files.append(delta_file)
+            logging.info(f'  Saved the inventory delta to file "{delta_file}"')
+        save_snapshot(f'inventory/{snapshot_file}', snapshot)
+        written_files.append(snapshot_file)
+        logging.info(f'  Saved the inventory snapshot to file "{snapshot_file}"')
+    else:
+        if ASYNC_COLLECTOR:
+            device_inventory, ap_inventory = asyncio.run(collect_inventory_with_asyncio())
         else:
-            device_details = {'hostname': device['hostname']}
-            device_details.update({'device_ip': device['managementIpAddress']})
-            device_details.update({'device_id': device['id']})
-            device_details.update({'version': device['softwareVersion']})
-            device_details.update({'device_family': device['type']})
-            device_details.update({'role': device['role']})
-
-            # get the device site hierarchy
-            response = dnac_api.devices.get_device_detail(identifier='uuid', search_by=device['id'])
-            site = response['response']['location']
-            device_details.update({'site': site})
-
-            # get the site id
-            response = dnac_api.sites.get_site(name=site)
-            site_id = response['response'][0]['id']
-            device_details.update({'site_id': site_id})
-            ap_inventory.append(device_details)
-
-    logging.info('  Collected the device inventory from Cisco DNA Center')
-
-    # save device inventory to json and yaml formatted files
-    with open(f'inventory/{DEVNET_POD}-{date_time_str}_device_inventory.json', 'w') as f:
-        f.write(json.dumps(device_inventory))
-    logging.info(f'  Saved the device inventory to file "{DEVNET_POD}-{date_time_str}_device_inventory.json"')
-
-    with open(f'inventory/{DEVNET_POD}-{date_time_str}_device_inventory.yaml', 'w') as f:
-        f.write(f'{DEVNET_POD}-device_inventory:\n' + yaml.dump(device_inventory, sort_keys=False))
-    logging.info(f'  Saved the device inventory to file "{DEVNET_POD}-{date_time_str}_device_inventory.yaml"')
-
-    # save ap inventory to json and yaml formatted files
-    with open(f'inventory/{DEVNET_POD}-{date_time_str}_ap_inventory.json', 'w') as f:
-        f.write(json.dumps(ap_inventory))
-    logging.info(f'  Saved the device inventory to file "{DEVNET_POD}-{date_time_str}_ap_inventory.json"')
-
-    with open(f'inventory/{DEVNET_POD}-{date_time_str}_ap_inventory.yaml', 'w') as f:
-        f.write(f'{DEVNET_POD}-ap_inventory:\n' + yaml.dump(ap_inventory, sort_keys=False))
-    logging.info(f'  Saved the device inventory to file "{DEVNET_POD}-{date_time_str}_ap_inventory.yaml"')
-
-    # retrieve the device image compliance state
-    image_non_compliant_devices = []
-    response = dnac_api.compliance.get_compliance_detail(compliance_type='IMAGE', compliance_status='NON_COMPLIANT')
-    image_non_compliant_list = response['response']
-    for device in image_non_compliant_list:
-        device_id = device['deviceUuid']
-        for item_device in device_inventory:
-            if device_id == item_device['device_id']:
-                image_non_compliant_devices.append(item_device)
+            device_inventory, ap_inventory = collect_inventory(dnac_session, workers=PAGE_WORKERS,
+                                                               device_count=device_count)
+
+        logging.info('  Collected the device inventory from Cisco DNA Center')
+
+        # save device inventory to json and yaml formatted files
+        with open(f'inventory/{DEVNET_POD}-{date_time_str}_device_inventory.json', 'w') as f:
+            f.write(json.dumps(device_inventory))
+        logging.info(f'  Saved the device inventory to file "{DEVNET_POD}-{date_time_str}_device_inventory.json"')
+
+        with open(f'inventory/{DEVNET_POD}-{date_time_str}_device_inventory.yaml', 'w') as f:
+            f.write(f'{DEVNET_POD}-device_inventory:\n' + yaml.dump(device_inventory, sort_keys=False))
+        logging.info(f'  Saved the device inventory to file "{DEVNET_POD}-{date_time_str}_device_inventory.yaml"')
+
+        # save ap inventory to json and yaml formatted files
+        with open(f'inventory/{DEVNET_POD}-{date_time_str}_ap_inventory.json', 'w') as f:
+            f.write(json.dumps(ap_inventory))
+        logging.info(f'  Saved the device inventory to file "{DEVNET_POD}-{date_time_str}_ap_inventory.json"')
+
+        with open(f'inventory/{DEVNET_POD}-{date_time_str}_ap_inventory.yaml', 'w') as f:
+            f.write(f'{DEVNET_POD}-ap_inventory:\n' + yaml.dump(ap_inventory, sort_keys=False))
+        logging.info(f'  Saved the device inventory to file "{DEVNET_POD}-{date_time_str}_ap_inventory.yaml"')
+
+    # save both inventories to the indexed SQLite store, queried with scripts/inventory_store.py
+    inventory_db = f'inventory/{DEVNET_POD}_inventory.db'
+    write_inventory(inventory_db, device_inventory, ap_inventory)
+    logging.info(f'  Saved the device inventory to the inventory store "{inventory_db}"')
+
+    # retrieve the compliance state of every compliance type concurrently, and join it to the inventory on device id
+    compliance = get_compliance_details(dnac_session)
+    device_compliance = compliance_matrix(device_inventory + ap_inventory, compliance)
+    with open(f'inventory/{DEVNET_POD}-{date_time_str}_compliance_matrix.json', 'w') as f:
+        f.write(json.dumps(device_compliance))
+    logging.info(f'  Saved the device compliance matrix to file "{DEVNET_POD}-{date_time_str}_compliance_matrix.json"')
+    written_files.append(f'{DEVNET_POD}-{date_time_str}_compliance_matrix.json')
+
+    # the device image compliance state
+    image_non_compliant_devices = non_compliant(device_inventory, compliance, 'IMAGE')
     logging.info('  Number of devices image non-compliant: ' + str(len(image_non_compliant_devices)))
     logging.info('  Image non-compliant devices: ')
     for device in image_non_compliant_devices:
-        logging.info('      ' + device['hostname'] + ', Site Hierarchy: ' + device['site'])
+        logging.info('      ' + device['hostname'] + ', Site Hierarchy: ' + str(device['site']))
 
     # save non compliant devices to json and yaml formatted files
     with open(f'inventory/{DEVNET_POD}-{date_time_str}_non_compliant_devices.json', 'w') as f:
@@ -210,35 +226,28 @@ def main():
     with open(f'inventory/{DEVNET_POD}-{date_time_str}_non_compliant_devices.yaml', 'w') as f:
         f.write(f'{DEVNET_POD}-non_compliant:\n' + yaml.dump(image_non_compliant_devices, sort_keys=False))
     logging.info(f'  Saved the image non-compliant device inventory to file "{DEVNET_POD}-{date_time_str}_non_compliant_devices.yaml" ')
+    written_files.append(f'{DEVNET_POD}-{date_time_str}_non_compliant_devices.json')
+    written_files.append(f'{DEVNET_POD}-{date_time_str}_non_compliant_devices.yaml')
 
-    # push all files to GitHub repo
+    # push all files to GitHub repo, in incremental mode only the files written by this run
     os.chdir('inventory')
-    files_list = os.listdir()
-
-    # authenticate to github
-    g = Github(GITHUB_USERNAME, GITHUB_TOKEN)
-
-    # searching for my repository
-    repo = g.search_repositories(GITHUB_REPO)[0]
+    files_list = written_files if INCREMENTAL else os.listdir()
+    files_list = [filename for filename in files_list if not filename.endswith('.db')]
 
-    # update inventory files
+    # commit every changed inventory file in one commit through the Git Data API; files whose content
+    # matches the repository are skipped, and nothing is committed when none changed
+    files = {}
     for filename in files_list:
-        try:
-            contents = repo.get_contents(filename)
-            if '.txt' not in filename:
-                repo.delete_file(contents.path, 'remove' + filename, contents.sha)
-        except:
-            logging.info('  File does not exist: ' + filename)
-        
         if '.txt' not in filename:
-            with open(filename) as f:
-                file_content = f.read()
-            file_bytes = file_content.encode('ascii')
-            base64_bytes = base64.b64encode(file_bytes)
-    
-            # create a file and commit n push
-            repo.create_file(filename, "committed by Jenkins - Device Inventory build", file_content)
-            logging.info('  GitHub push for file: ' + filename)
+            with open(filename, 'rb') as f:
+                files[filename] = f.read()
+    repo = GitHubRepo(repo_full_name(GITHUB_USERNAME, GITHUB_REPO), GITHUB_TOKEN, api_url=GITHUB_API)
+    commit_sha = repo.push_files(files, "committed by Jenkins - Device Inventory build")
+    repo.close()
+    if commit_sha:
+        logging.info('  GitHub push of ' + str(len(files)) + ' files, commit: ' + commit_sha)
+    else:
+        logging.info('  GitHub push skipped, inventory files unchanged')
 
     date_time = str(datetime.now().replace(microsecond=0))
     logging.info('  App "device_inventory.py" run end: ' + date_time)
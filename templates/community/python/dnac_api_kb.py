@@ -35,7 +35,6 @@ import yaml
 import csv
 import re
 import base64
-from github import *
 
 from urllib3.exceptions import InsecureRequestWarning  # for insecure https warnings
 #from dotenv import load_dotenv
@@ -60,6 +59,30 @@ DNAC_PASS = project_data['dna_center']['password']
 
 DNAC_AUTH = HTTPBasicAuth(DNAC_USER, DNAC_PASS)
 
+# pooled session with a cached token and paged inventory helpers, shared with scripts/catalyst_center_client.py
+sys.path.insert(0, str(Path(__file__).resolve().parents[3] / 'scripts'))
+from catalyst_center_session import shared_session  # noqa: E402
+from catalyst_center_inventory import (get_device_count, collect_inventory, get_compliance_details,  # noqa: E402
+                                       compliance_matrix, non_compliant)
+from github_sync import GITHUB_API_URL, GitHubRepo, repo_full_name  # noqa: E402
+from catalyst_center_sites import SiteIndex, row_site_path  # noqa: E402
+
+# concurrent device list page requests
+PAGE_WORKERS = 8
+
+# site hierarchy index, see site_index()
+SITE_INDEX = None
+
+
+def dnac_session():
+    """
+    Return the shared Cisco DNA Center session: one keep-alive connection pool and one cached token
+    Every helper sends its requests through it, so a token that expires during a long run is refreshed
+    (and HTTP 429 backed off) here; the token parameters of the helpers are only kept for existing callers
+    :return: CatalystCenterSession
+    """
+    return shared_session(DNAC_URL, DNAC_USER, DNAC_PASS, verify=False)
+
 # logging, debug level, to file {application_run.log}
 def logging_start(module_name):
     logging.basicConfig(level=logging.INFO)
@@ -81,12 +104,8 @@ def get_dnac_token(dnac_auth):
     :param dnac_auth - Cisco DNA Center Basic Auth string
     :return Cisco DNA Center Token
     """
-    url = DNAC_URL + '/dna/system/api/v1/auth/token'
-    header = {'content-type': 'application/json'}
-    response = requests.post(url, auth=dnac_auth, headers=header, verify=False)
-    response_json = response.json()
-    dnac_jwt_token = response_json['Token']
-    return dnac_jwt_token
+    session = shared_session(DNAC_URL, dnac_auth.username, dnac_auth.password, verify=False)
+    return session.get_token()
 
 
 # get_site_hierarchy
@@ -97,54 +116,36 @@ def get_site_hierarchy(dnac_token):
     :return: response in JSON
     """
     url = (f"{DNAC_URL}/dna/intent/api/v1/site")
-    header = {'content-type': 'application/json', 'x-auth-token': dnac_token}
-    response = requests.get(url, headers=header, verify=False)
+    response = dnac_session().request('GET', url, check=False)
     response_json = response.json()
     return response_json, response.status_code
 
+# site_index
+def site_index(refresh=False):
+    """
+    Return the site hierarchy index shared by every site lookup of the run, fetched once
+    :param refresh: fetch the hierarchy again
+    :return: SiteIndex with exact lookups by siteNameHierarchy, id and parent
+    """
+    global SITE_INDEX
+    if SITE_INDEX is None or refresh:
+        SITE_INDEX = SiteIndex.fetch(dnac_session())
+    return SITE_INDEX
+
 # get_target_site_id
 def get_target_site_id(dnac_token, parent_name, area_name, building_name, floor_name):
-    response, status_code = get_site_hierarchy(dnac_token)
-    #print(f"Looking in: {response}")
-    #print(f"looking for:{parent_name},{area_name},{building_name},{floor_name}")
-    # Get the target site id
-    #jsonData = json.loads(responseBody)
-    parent = parent_name
-    if area_name != "":
-        area = (f"{parent_name}/{area_name}")
-    else:
-        area = ""
-    if building_name != "":
-        bldg = (f"{parent_name}/{area_name}/{building_name}")
-    else:
-        bldg = ""
-    if floor_name != "":
-        floor = (f"{parent_name}/{area_name}/{building_name}/{floor_name}")
-    else:
-        floor = ""
-    #print(f"parent: {parent}, area: {area}, bldg: {bldg}, floor: {floor}")
-    if parent_name == "Global":
-        if area_name != "":
-            for i in range(len(response["response"])):
-                if response["response"][i]["siteNameHierarchy"] == area:
-                    TargetSiteId = response["response"][i]["id"]
-                    logging.info('Area Site Id acquired.')
-                    #print(TargetSiteId)
-                    break
-        else:
-            for i in range(len(response["response"])):
-                if response["response"][i]["siteNameHierarchy"] == parent:
-                    TargetSiteId = response["response"][i]["id"]
-                    logging.info('Global Site Id acquired.')
-                    #print(TargetSiteId)
-                    break
+    """
+    Return the id of the deepest site named, e.g. the floor of parent/area/building/floor
+    :return: site id, or None when the site does not exist
+    """
+    site_path = row_site_path({'HierarchyParent': parent_name, 'HierarchyArea': area_name,
+                               'HierarchyBldg': building_name, 'HierarchyFloor': floor_name})
+    # sites created since the index was built, e.g. by another script, are fetched on a miss
+    TargetSiteId = site_index().find(dnac_session(), site_path)
+    if TargetSiteId:
+        logging.info('Site Id acquired for ' + site_path)
     else:
-        for i in range(len(response["response"])):
-            if response["response"][i]["siteNameHierarchy"] == floor:
-                TargetSiteId = response["response"][i]["id"]
-                logging.info('Floor Site Id acquired.')
-                #print(TargetSiteId)
-                break
+        logging.info('Site not found: ' + site_path)
     return TargetSiteId
 
 # create_site_settings    
@@ -204,8 +205,7 @@ def create_site_settings(dnac_token, TargetSiteId, domainName, dnsServer1, dnsSe
             "sharedSecret": aaaSecret
 		} 
     url = DNAC_URL + f'/dna/intent/api/v1/site/{TargetSiteId}'
-    header = {'content-type': 'application/json', 'x-auth-token': dnac_token}
-    response = requests.put(url, data=json.dumps(payload), headers=header, verify=False)
+    response = dnac_session().request('PUT', url, json_body=payload, check=False)
     response_json = response.json()
     return response_json, response.status_code
 
@@ -245,8 +245,7 @@ def create_credentials(dnac_token, dcloudUser=None, dcloudPwd=None, dcloudSnmpRO
         ]
     
     url = DNAC_URL + '/dna/intent/api/v1/device-credential'
-    header = {'content-type': 'application/json', 'x-auth-token': dnac_token}
-    response = requests.post(url, data=json.dumps(payload), headers=header, verify=False)
+    response = dnac_session().request('POST', url, json_body=payload, check=False)
     response_json = response.json()
     return response_json, response.status_code
 
@@ -280,8 +279,7 @@ def create_all_credentials(dnac_token, dcloudUser, dcloudPwd, dcloudSnmpRO_desc,
         }
     }
     url = DNAC_URL + '/dna/intent/api/v1/device-credential'
-    header = {'content-type': 'application/json', 'x-auth-token': dnac_token}
-    response = requests.post(url, data=json.dumps(payload), headers=header, verify=False)
+    response = dnac_session().request('POST', url, json_body=payload, check=False)
     response_json = response.json()
     return response_json, response.status_code
 
@@ -291,8 +289,7 @@ def get_credentials(dnac_token):
     This function will return the credentials
     """
     url = DNAC_URL + f'/dna/intent/api/v1/device-credential'
-    header = {'content-type': 'application/json', 'x-auth-token': dnac_token}
-    response = requests.get(url, headers=header, verify=False)
+    response = dnac_session().request('GET', url, check=False)
     response_json = response.json()
     return response_json, response.status_code
 
@@ -302,8 +299,7 @@ def get_netconf_credential(dnac_token):
     This function will return the netconf credential
     """
     url = DNAC_URL + f'/dna/intent/api/v1/global-credential?credentialSubType=NETCONF'
-    header = {'content-type': 'application/json', 'x-auth-token': dnac_token}
-    response = requests.get(url, headers=header, verify=False)
+    response = dnac_session().request('GET', url, check=False)
     response_json = response.json()
     return response_json, response.status_code
 
@@ -439,8 +435,7 @@ def assign_site_credentials(dnac_token, TargetSiteId, SiteCredentialCli, SiteCre
         "snmpV2WriteId": SiteCredentialSnmpRW
     }
     url = DNAC_URL + f'/dna/intent/api/v1/credential-to-site/{TargetSiteId}'
-    header = {'content-type': 'application/json', 'x-auth-token': dnac_token}
-    response = requests.post(url, data=json.dumps(payload), headers=header, verify=False)
+    response = dnac_session().request('POST', url, json_body=payload, check=False)
     response_json = response.json()
     return response_json, response.status_code
 
@@ -489,8 +484,7 @@ def create_site(dnac_token, type, parent_name, type_name, address):
         }
     
     url = DNAC_URL + '/dna/intent/api/v1/site'
-    header = {'content-type': 'application/json', 'x-auth-token': dnac_token}
-    response = requests.post(url, data=json.dumps(payload), headers=header, verify=False)
+    response = dnac_session().request('POST', url, json_body=payload, check=False)
     response_json = response.json()
     return response_json
 
@@ -501,67 +495,18 @@ def get_device_list():
     :param dnac_token: Cisco DNA Center auth token
     :return: response in JSON
     """
-    # create a DNACenterAPI "Connection Object" to use the Python SDK
-    dnac_api = DNACenterAPI(username=DNAC_USER, password=DNAC_PASS, base_url=DNAC_URL, version='2.2.3.3',
-                            verify=False)
+    # pooled session with a cached token for the paged device list
+    session = shared_session(DNAC_URL, DNAC_USER, DNAC_PASS, verify=False)
 
     # get the device count
-    response = dnac_api.devices.get_device_count()
-    device_count = response['response']
+    device_count = get_device_count(session)
     logging.info('  Number of devices managed by Cisco DNA Center: ' + str(device_count))
 
-    # get the device info list
-    offset = 1
-    limit = 500
-    device_list = []
-    while offset <= device_count:
-        response = dnac_api.devices.get_device_list(offset=offset)
-        offset += limit
-        device_list.extend(response['response'])
-    logging.info('  Collected the device list from Cisco DNA Center')
-
     # create device inventory [{"hostname": "", "device_ip": "","device_id": "", "version": "", "device_family": "",
     #  "role": "", "site": "", "site_id": ""},...]
-    device_inventory = []
-    ap_inventory = []
-    for device in device_list:
-        # select which inventory to add the device to
-        if device.family != "Unified AP":
-            device_details = {'hostname': device['hostname']}
-            device_details.update({'device_ip': device['managementIpAddress']})
-            device_details.update({'device_id': device['id']})
-            device_details.update({'version': device['softwareVersion']})
-            device_details.update({'device_family': device['type']})
-            device_details.update({'role': device['role']})
-
-            # get the device site hierarchy
-            response = dnac_api.devices.get_device_detail(identifier='uuid', search_by=device['id'])
-            site = response['response']['location']
-            device_details.update({'site': site})
-
-            # get the site id
-            response = dnac_api.sites.get_site(name=site)
-            site_id = response['response'][0]['id']
-            device_details.update({'site_id': site_id})
-            device_inventory.append(device_details)
-        else:
-            device_details = {'hostname': device['hostname']}
-            device_details.update({'device_ip': device['managementIpAddress']})
-            device_details.update({'device_id': device['id']})
-            device_details.update({'version': device['softwareVersion']})
-            device_details.update({'device_family': device['type']})
-            device_details.update({'role': device['role']})
-
-            # get the device site hierarchy
-            response = dnac_api.devices.get_device_detail(identifier='uuid', search_by=device['id'])
-            site = response['response']['location']
-            device_details.update({'site': site})
-
-            # get the site id
-            response = dnac_api.sites.get_site(name=site)
-            site_id = response['response'][0]['id']
-            device_details.update({'site_id': site_id})
-            ap_inventory.append(device_details)
+    # the device list pages are fetched concurrently and streamed in order; sites come from one hierarchy
+    # fetch and one membership call per site, instead of a device detail and a site lookup per device
+    device_inventory, ap_inventory = collect_inventory(session, workers=PAGE_WORKERS, device_count=device_count)
 
     logging.info('  Collected the device inventory from Cisco DNA Center')
     # return the device inventory
@@ -580,67 +525,18 @@ def get_device_inventory():
     GITHUB_TOKEN = project_data['github']['token']
     GITHUB_REPO = project_data['github']['repository']
 
-    # create a DNACenterAPI "Connection Object" to use the Python SDK
-    dnac_api = DNACenterAPI(username=DNAC_USER, password=DNAC_PASS, base_url=DNAC_URL, version='2.2.3.3',
-                            verify=False)
+    # pooled session with a cached token for the paged device list
+    session = shared_session(DNAC_URL, DNAC_USER, DNAC_PASS, verify=False)
 
     # get the device count
-    response = dnac_api.devices.get_device_count()
-    device_count = response['response']
+    device_count = get_device_count(session)
     logging.info('  Number of devices managed by Cisco DNA Center: ' + str(device_count))
 
-    # get the device info list
-    offset = 1
-    limit = 500
-    device_list = []
-    while offset <= device_count:
-        response = dnac_api.devices.get_device_list(offset=offset)
-        offset += limit
-        device_list.extend(response['response'])
-    logging.info('  Collected the device list from Cisco DNA Center')
-
     # create device inventory [{"hostname": "", "device_ip": "","device_id": "", "version": "", "device_family": "",
     #  "role": "", "site": "", "site_id": ""},...]
-    device_inventory = []
-    ap_inventory = []
-    for device in device_list:
-        # select which inventory to add the device to
-        if device.family != "Unified AP":
-            device_details = {'hostname': device['hostname']}
-            device_details.update({'device_ip': device['managementIpAddress']})
-            device_details.update({'device_id': device['id']})
-            device_details.update({'version': device['softwareVersion']})
-            device_details.update({'device_family': device['type']})
-            device_details.update({'role': device['role']})
-
-            # get the device site hierarchy
-            response = dnac_api.devices.get_device_detail(identifier='uuid', search_by=device['id'])
-            site = response['response']['location']
-            device_details.update({'site': site})
-
-            # get the site id
-            response = dnac_api.sites.get_site(name=site)
-            site_id = response['response'][0]['id']
-            device_details.update({'site_id': site_id})
-            device_inventory.append(device_details)
-        else:
-            device_details = {'hostname': device['hostname']}
-            device_details.update({'device_ip': device['managementIpAddress']})
-            device_details.update({'device_id': device['id']})
-            device_details.update({'version': device['softwareVersion']})
-            device_details.update({'device_family': device['type']})
-            device_details.update({'role': device['role']})
-
-            # get the device site hierarchy
-            response = dnac_api.devices.get_device_detail(identifier='uuid', search_by=device['id'])
-            site = response['response']['location']
-            device_details.update({'site': site})
-
-            # get the site id
-            response = dnac_api.sites.get_site(name=site)
-            site_id = response['response'][0]['id']
-            device_details.update({'site_id': site_id})
-            ap_inventory.append(device_details)
+    # the device list pages are fetched concurrently and streamed in order; sites come from one hierarchy
+    # fetch and one membership call per site, instead of a device detail and a site lookup per device
+    device_inventory, ap_inventory = collect_inventory(session, workers=PAGE_WORKERS, device_count=device_count)
 
     logging.info('  Collected the device inventory from Cisco DNA Center')
 
@@ -662,19 +558,19 @@ def get_device_inventory():
         f.write('ap_inventory:\n' + yaml.dump(ap_inventory, sort_keys=False))
     logging.info('  Saved the device inventory to file "ap_inventory.yaml"')
 
-    # retrieve the device image compliance state
-    image_non_compliant_devices = []
-    response = dnac_api.compliance.get_compliance_detail(compliance_type='IMAGE', compliance_status='NON_COMPLIANT')
-    image_non_compliant_list = response['response']
-    for device in image_non_compliant_list:
-        device_id = device['deviceUuid']
-        for item_device in device_inventory:
-            if device_id == item_device['device_id']:
-                image_non_compliant_devices.append(item_device)
+    # retrieve the compliance state of every compliance type concurrently, and join it to the inventory on device id
+    compliance = get_compliance_details(session)
+    device_compliance = compliance_matrix(device_inventory + ap_inventory, compliance)
+    with open('inventory/compliance_matrix.json', 'w') as f:
+        f.write(json.dumps(device_compliance))
+    logging.info('  Saved the device compliance matrix to file "compliance_matrix.json"')
+
+    # the device image compliance state
+    image_non_compliant_devices = non_compliant(device_inventory, compliance, 'IMAGE')
     logging.info('  Number of devices image non-compliant: ' + str(len(image_non_compliant_devices)))
     logging.info('  Image non-compliant devices: ')
     for device in image_non_compliant_devices:
-        logging.info('      ' + device['hostname'] + ', Site Hierarchy: ' + device['site'])
+        logging.info('      ' + device['hostname'] + ', Site Hierarchy: ' + str(device['site']))
 
     # save non compliant devices to json and yaml formatted files
     with open('inventory/non_compliant_devices.json', 'w') as f:
@@ -690,29 +586,16 @@ def get_device_inventory():
     os.chdir('inventory')
     files_list = os.listdir()
 
-    # authenticate to github
-    g = Github(GITHUB_USERNAME, GITHUB_TOKEN)
-
-    # searching for my repository
-    repo = g.search_repositories(GITHUB_REPO)[0]
-
-    # update inventory files
-
+    # commit every changed inventory file in one commit through the Git Data API
+    files = {}
     for filename in files_list:
-        try:
-            contents = repo.get_contents(filename)
-            repo.delete_file(contents.path, 'remove' + filename, contents.sha)
-        except:
-            print('File does not exist')
-
-        with open(filename) as f:
-            file_content = f.read()
-        file_bytes = file_content.encode('ascii')
-        base64_bytes = base64.b64encode(file_bytes)
-        logging.info('  GitHub push for file: ' + filename)
-
-        # create a file and commit n push
-        repo.create_file(filename, "committed by Jenkins - Device Inventory build", file_content)
+        with open(filename, 'rb') as f:
+            files[filename] = f.read()
+    repo = GitHubRepo(repo_full_name(GITHUB_USERNAME, GITHUB_REPO), GITHUB_TOKEN,
+                      api_url=project_data['github'].get('api_url', GITHUB_API_URL))
+    commit_sha = repo.push_files(files, "committed by Jenkins - Device Inventory build")
+    repo.close()
+    logging.info('  GitHub push, commit: ' + str(commit_sha or 'none, inventory files unchanged'))
 
     date_time = str(datetime.now().replace(microsecond=0))
     logging.info('  App "device_inventory.py" run end: ' + date_time)
@@ -757,8 +640,7 @@ def create_discovery(dnac_token, site_hierarchy, device_list, dcloud_user_id, dc
     }
 
     url = DNAC_URL + '/dna/intent/api/v1/discovery'
-    header = {'content-type': 'application/json', 'x-auth-token': dnac_token}
-    response = requests.post(url, data=json.dumps(payload), headers=header, verify=False)
+    response = dnac_session().request('POST', url, json_body=payload, check=False)
     response_json = response.json()
     return response_json
 
@@ -779,10 +661,8 @@ def assign_device(dnac_auth, TargetSiteId, device_list):
     payload = { 
         "device": Devices 
         }
-    payload = json.dumps(payload)
     url = DNAC_URL + f'/dna/system/api/v1/site/{TargetSiteId}/device'
-    header = {'content-type': 'application/json', 'x-auth-token': dnac_auth}
-    response = requests.post(url, data=payload, headers=header, verify=False)
+    response = dnac_session().request('POST', url, json_body=payload, check=False)
     response_json = response.json()
     return response_json, response.status_code
 
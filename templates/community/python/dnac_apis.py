@@ -31,6 +31,9 @@ import time
 import requests
 import urllib3
 import os
+import sys
+
+from pathlib import Path
 
 from dotenv import load_dotenv
 from requests.auth import HTTPBasicAuth  # for Basic Auth
@@ -46,6 +49,20 @@ DNAC_AUTH = HTTPBasicAuth(DNAC_USER, DNAC_PASS)
 
 urllib3.disable_warnings(InsecureRequestWarning)  # disable insecure https warnings
 
+# pooled session with a cached token, shared with scripts/catalyst_center_client.py
+sys.path.insert(0, str(Path(__file__).resolve().parents[3] / 'scripts'))
+from catalyst_center_session import shared_session  # noqa: E402
+
+
+def dnac_session():
+    """
+    Return the shared Cisco DNA Center session: one keep-alive connection pool and one cached token
+    Every helper sends its requests through it, so a token that expires during a long run is refreshed
+    (and HTTP 429 backed off) here; the token parameters of the helpers are only kept for existing callers
+    :return: CatalystCenterSession
+    """
+    return shared_session(DNAC_URL, DNAC_USER, DNAC_PASS, verify=False)
+
 
 def get_dnac_jwt_token(dnac_auth):
     """
@@ -55,11 +72,8 @@ def get_dnac_jwt_token(dnac_auth):
     :return: Cisco DNA Center JWT token
     """
 
-    url = DNAC_URL + '/dna/system/api/v1/auth/token'
-    header = {'content-type': 'application/json'}
-    response = requests.post(url, auth=dnac_auth, headers=header, verify=False)
-    dnac_jwt_token = response.json()['Token']
-    return dnac_jwt_token
+    session = shared_session(DNAC_URL, dnac_auth.username, dnac_auth.password, verify=False)
+    return session.get_token()
 
 
 def get_device_info(device_id, dnac_jwt_token):
@@ -70,8 +84,7 @@ def get_device_info(device_id, dnac_jwt_token):
     :return: device info
     """
     url = DNAC_URL + '/dna/intent/api/v1/network-device?id=' + device_id
-    header = {'content-type': 'application/json', 'x-auth-token': dnac_jwt_token}
-    device_response = requests.get(url, headers=header, verify=False)
+    device_response = dnac_session().request('GET', url, check=False)
     device_info = device_response.json()
     return device_info['response'][0]
 
@@ -104,8 +117,7 @@ def get_device_info_ip(ip_address, dnac_jwt_token):
     :return: device information, or None
     """
     url = DNAC_URL + '/dna/intent/api/v1/network-device/ip-address/' + ip_address
-    header = {'content-type': 'application/json', 'x-auth-token': dnac_jwt_token}
-    response = requests.get(url, headers=header, verify=False)
+    response = dnac_session().request('GET', url, check=False)
     response_json = response.json()
     device_info = response_json['response']
     if 'errorCode' == 'Not found':
@@ -121,8 +133,7 @@ def get_physical_topology(dnac_jwt_token):
     :return: topology links - all the layer 2 topology
     """
     url = DNAC_URL + '/dna/intent/api/v1/topology/physical-topology'
-    header = {'content-type': 'application/json', 'x-auth-token': dnac_jwt_token}
-    response = requests.get(url, headers=header, verify=False)
+    response = dnac_session().request('GET', url, check=False)
     topology_json = response.json()['response']
     topology_links = topology_json['links']
     return topology_links
@@ -153,8 +164,7 @@ def sync_device(device_name, dnac_jwt_token):
     device_id = get_device_id_name(device_name, dnac_jwt_token)
     param = [device_id]
     url = DNAC_URL + '/dna/intent/api/v1/network-device/sync?forceSync=true'
-    header = {'content-type': 'application/json', 'x-auth-token': dnac_jwt_token}
-    sync_response = requests.put(url, data=json.dumps(param), headers=header, verify=False)
+    sync_response = dnac_session().request('PUT', url, json_body=param, check=False)
     task = sync_response.json()['response']['taskId']
     return sync_response.status_code, task
 
@@ -166,8 +176,7 @@ def get_all_device_info(dnac_jwt_token):
     :return: DNA C device inventory info
     """
     url = DNAC_URL + '/dna/intent/api/v1/network-device'
-    header = {'content-type': 'application/json', 'x-auth-token': dnac_jwt_token}
-    all_device_response = requests.get(url, headers=header, verify=False)
+    all_device_response = dnac_session().request('GET', url, check=False)
     all_device_info = all_device_response.json()
     return all_device_info['response']
 
@@ -180,8 +189,7 @@ def get_device_info_family(family, dnac_jwt_token):
     :return: DNA C device inventory info
     """
     url = DNAC_URL + '/dna/intent/api/v1/network-device?family=' + family
-    header = {'content-type': 'application/json', 'x-auth-token': dnac_jwt_token}
-    all_device_response = requests.get(url, headers=header, verify=False)
+    all_device_response = dnac_session().request('GET', url, check=False)
     all_device_info = all_device_response.json()
     return all_device_info['response']
 
@@ -196,8 +204,7 @@ def update_interface_admin(interface_id, admin_status, dnac_jwt_token):
     """
     url = DNAC_URL + '/dna/intent/api/v1/interface/' + interface_id
     param = {'adminStatus': admin_status}
-    header = {'content-type': 'application/json', 'x-auth-token': dnac_jwt_token}
-    response = requests.put(url, data=json.dumps(param), headers=header, verify=False)
+    response = dnac_session().request('PUT', url, json_body=param, check=False)
     response_json = response.json()['response']
     task_id = response_json['response']['taskId']
     return task_id
@@ -0,0 +1,123 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Copyright (c) 2022 Cisco and/or its affiliates.
+This software is licensed to you under the terms of the Cisco Sample
+Code License, Version 1.1 (the "License"). You may obtain a copy of the
+License at
+               https://developer.cisco.com/docs/licenses
+All use of the material herein must be in accordance with the terms of
+the License. All rights not expressly granted by the License are
+reserved. Unless required by applicable law or agreed to separately in
+writing, software distributed under the License is distributed on an "AS
+IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express
+or implied.
+"""
+
+__author__ = "Keith Baldwin SE, CA-CoE"
+__email__ = "kebaldwi@cisco.com"
+__version__ = "0.1.0"
+__copyright__ = "Copyright (c) 2022 Cisco and/or its affiliates."
+__license__ = "Cisco Sample Code License, Version 1.1"
+
+import os
+import time
+import urllib3
+import json
+import sys
+import logging
+import datetime
+import yaml
+
+from urllib3.exceptions import InsecureRequestWarning  # for insecure https warnings
+from datetime import datetime
+from pathlib import Path  # used for relative path to "templates_jenkins" folder
+
+urllib3.disable_warnings(InsecureRequestWarning)  # disable insecure https warnings
+
+# per-pod sessions and the provisioning graph, from the repository scripts/ folder
+sys.path.insert(0, str(Path(__file__).resolve().parents[3] / 'scripts'))
+from catalyst_center_session import CatalystCenterSession  # noqa: E402
+from catalyst_center_sites import read_hierarchy_csv  # noqa: E402
+from catalyst_center_provisioning import provision_pods  # noqa: E402
+
+os.environ['TZ'] = 'America/Los_Angeles'  # define the timezone for PST
+time.tzset()  # adjust the timezone, more info https://help.pythonanywhere.com/pages/SettingTheTimezone/
+
+# project path
+project_details_path = Path(__file__).parent/'../DEVWKS-2176/project_details.yml'
+with open(project_details_path, 'r') as file:
+    project_data = yaml.safe_load(file)
+DNAC_USER = project_data['dna_center']['username']
+DNAC_PASS = project_data['dna_center']['password']
+
+# one controller per pod, from project_details.yml, e.g.
+#   pods:
+#     POD0: {ip_address: 198.18.129.100}
+#     POD1: {ip_address: 198.18.129.101, username: admin, password: C1sco12345}
+# username and password default to the dna_center ones
+PODS = project_data.get('pods') or {}
+# design settings of each pod
+PODS_CSV_PATH = Path(__file__).parent/'../postman/DEVNET-IGNITE/PODS'
+POD_CSV = 'POD{}_CCC-Design-Settings-v3.csv'
+POD_COUNT = 10
+
+# template project for the templates defined in the CSVs
+TEMPLATE_PROJECT = 'DEVNET-IGNITE'
+# provisioning steps running at once, per pod
+MAX_WORKERS = 16
+# seconds between aggregate progress lines
+PROGRESS_INTERVAL = 10
+# step results of the last run
+REPORT_PATH = Path(__file__).parent/'../DEVWKS-2176/reports/multi_pod_provisioning.json'
+
+def main():
+    """
+    This app will provision every lab pod from its own POD<n>_CCC-Design-Settings-v3.csv,
+    each pod on its own controller. All pods run at the same time, each with its own
+    session (token, connection pool and rate limit backoff), so ten pods take about as
+    long as the slowest one; progress is logged across all pods.
+    """
+
+    # logging basic
+    logging.basicConfig(level=logging.INFO)
+
+    current_time = str(datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
+    logging.info('App "multi_pod_provisioning.py" Start, ' + current_time)
+
+    pods = {}
+    for number in range(POD_COUNT):
+        pod = 'POD' + str(number)
+        controller = PODS.get(pod)
+        if not controller or not controller.get('ip_address'):
+            logging.info('  ' + pod + ': no controller in project_details.yml, skipping.')
+            continue
+        # parse the input data
+        rows = read_hierarchy_csv(str(PODS_CSV_PATH/POD_CSV.format(number)))
+        session = CatalystCenterSession('https://' + controller['ip_address'],
+                                        controller.get('username') or DNAC_USER,
+                                        controller.get('password') or DNAC_PASS, verify=False)
+        pods[pod] = {'session': session, 'rows': rows}
+
+    # provision all pods at once
+    results = provision_pods(pods, project_name=TEMPLATE_PROJECT, workers=MAX_WORKERS,
+                             interval=PROGRESS_INTERVAL)
+    for pod, steps in results.items():
+        failed = [name for name, result in steps.items() if result['status'] != 'SUCCESS']
+        logging.info('  ' + pod + ': ' + str(len(steps) - len(failed)) + ' of ' + str(len(steps)) +
+                     ' steps done' + (', not done: ' + ', '.join(failed) if failed else ''))
+
+    # save the step results
+    os.makedirs(REPORT_PATH.parent, exist_ok=True)
+    with open(REPORT_PATH, 'w') as f:
+        json.dump({pod: {name: {key: value for key, value in result.items() if key != 'result'}
+                         for name, result in steps.items()} for pod, steps in results.items()}, f, indent=4)
+    logging.info('  Step results saved to ' + str(REPORT_PATH))
+
+    date_time = str(datetime.now().replace(microsecond=0))
+    logging.info('  App "multi_pod_provisioning.py" end, : ' + date_time)
+    failed = any(result['status'] != 'SUCCESS' for steps in results.values() for result in steps.values())
+    return 1 if failed or not pods else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,26 @@
+"""Shared fixtures: the scripts/ modules on the path and an in-process mock controller."""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / 'scripts'))
+
+from catalyst_center_session import CatalystCenterSession  # noqa: E402
+from mock_catalyst_center import MockCatalystCenter  # noqa: E402
+
+
+@pytest.fixture
+def controller():
+    """A small mock Catalyst Center with fast tasks, stopped after the test."""
+    controller = MockCatalystCenter(devices=20, sites=2, task_time=0.1, discovery_time=1.0)
+    controller.start()
+    yield controller
+    controller.stop()
+
+
+@pytest.fixture
+def session(controller):
+    """A session logged in to the mock controller."""
+    return CatalystCenterSession(controller.base_url, 'admin', 'C1sco12345')
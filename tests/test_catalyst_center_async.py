@@ -0,0 +1,67 @@
+"""Tests for the asyncio inventory collector."""
+
+import asyncio
+
+import pytest
+
+pytest.importorskip('httpx')
+
+from catalyst_center_async import AsyncCatalystCenterSession, collect_inventory_async  # noqa: E402
+from catalyst_center_inventory import collect_inventory  # noqa: E402
+
+DEVICE_PATH = '/dna/intent/api/v1/network-device'
+
+
+def run(controller, work, **kwargs):
+    """Run work(async session) on a fresh event loop."""
+    async def main():
+        async with AsyncCatalystCenterSession(controller.base_url, 'admin', 'C1sco12345', **kwargs) as session:
+            return await work(session)
+    return asyncio.run(main())
+
+
+def test_async_collector_matches_the_synchronous_one(controller, session):
+    expected = collect_inventory(session, workers=4)
+
+    assert run(controller, collect_inventory_async) == expected
+    assert run(controller, lambda async_session: collect_inventory_async(async_session, device_detail=True)) \
+        == expected
+
+
+def test_get_pages_reads_past_a_stale_total(controller):
+    items = run(controller, lambda async_session: async_session.get_pages(DEVICE_PATH, 8, page_size=3, window=2))
+
+    assert [device['id'] for device in items] == [device['id'] for device in controller.devices]
+
+
+def test_get_pages_bounds_the_pages_in_flight(controller):
+    in_flight, peak = 0, 0
+
+    async def work(async_session):
+        nonlocal in_flight, peak
+        get = async_session.get
+
+        async def counting_get(path, params=None):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            try:
+                return await get(path, params)
+            finally:
+                in_flight -= 1
+
+        async_session.get = counting_get
+        return await async_session.get_pages(DEVICE_PATH, 20, page_size=2, window=3)
+
+    assert len(run(controller, work)) == 20
+    assert peak <= 3
+
+
+def test_concurrent_401s_refresh_the_token_once(controller):
+    async def work(async_session):
+        await async_session.get('/dna/intent/api/v1/network-device/count')
+        controller.tokens.clear()
+        await asyncio.gather(*(async_session.get('/dna/intent/api/v1/network-device/count') for _ in range(8)))
+        return async_session.logins
+
+    assert run(controller, work) == 2
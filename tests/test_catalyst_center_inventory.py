@@ -0,0 +1,37 @@
+"""Tests for the inventory snapshot change detection."""
+
+from catalyst_center_inventory import collect_inventory_delta, device_stamp, device_unchanged, iter_devices
+
+
+def test_device_stamp_prefers_last_update_time():
+    assert device_stamp({'lastUpdateTime': 5, 'lastUpdated': '2024-01-01'}) == 5
+    assert device_stamp({'lastUpdated': '2024-01-01'}) == '2024-01-01'
+    assert device_stamp({}) is None
+
+
+def test_device_without_stamp_counts_as_changed():
+    assert not device_unchanged({'last_update': None}, {})
+    assert not device_unchanged(None, {'lastUpdateTime': 5})
+    assert device_unchanged({'last_update': 5}, {'lastUpdateTime': 5})
+
+
+def test_delta_refreshes_devices_without_stamp(controller, session):
+    _, snapshot = collect_inventory_delta(session, {})
+    assert len(snapshot) == len(controller.devices)
+
+    stale = controller.devices[0]
+    stale.pop('lastUpdateTime')
+    stale.pop('lastUpdated')
+    stale['hostname'] = 'renamed.dcloud.cisco.com'
+    delta, snapshot = collect_inventory_delta(session, snapshot)
+    assert [entry['hostname'] for entry in delta['changed']] == ['renamed.dcloud.cisco.com']
+
+    # still no stamp: refreshed again on the next run instead of kept forever
+    delta, _ = collect_inventory_delta(session, snapshot)
+    assert [entry['device_id'] for entry in delta['changed']] == [stale['id']]
+
+
+def test_iter_devices_streams_or_fetches_every_device(controller, session):
+    expected = [device['id'] for device in controller.devices]
+    assert [device['id'] for device in iter_devices(session, page_size=6)] == expected
+    assert [device['id'] for device in iter_devices(session, workers=3, page_size=6)] == expected
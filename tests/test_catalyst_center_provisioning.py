@@ -0,0 +1,106 @@
+"""Tests for the provisioning step graph and the Day0 provisioner."""
+
+import threading
+
+import pytest
+
+import catalyst_center_provisioning
+from catalyst_center_provisioning import Day0Provisioner, Pipeline, start_discovery, watch_discovery
+
+
+def fail(inputs):
+    raise RuntimeError('boom')
+
+
+def test_pipeline_runs_steps_after_their_dependencies():
+    order = []
+    lock = threading.Lock()
+
+    def step(name, value):
+        def run(inputs):
+            with lock:
+                order.append(name)
+            return value + sum(inputs.values())
+        return run
+
+    pipeline = Pipeline(workers=4)
+    pipeline.add('a', step('a', 1))
+    pipeline.add('b', step('b', 2), ['a'])
+    pipeline.add('c', step('c', 3), ['a', None])
+    pipeline.add('d', step('d', 4), ['b', 'c'])
+    results = pipeline.run()
+
+    assert all(result['status'] == 'SUCCESS' for result in results.values())
+    assert results['d']['result'] == 4 + (2 + 1) + (3 + 1)
+    assert order[0] == 'a' and order[-1] == 'd'
+
+
+def test_pipeline_skips_every_step_after_a_failure():
+    done = []
+    pipeline = Pipeline(workers=4)
+    pipeline.add('a', fail)
+    pipeline.add('b', lambda inputs: 'b', ['a'])
+    pipeline.add('c', lambda inputs: 'c', ['b'])
+    pipeline.add('other', lambda inputs: 'other')
+    results = pipeline.run(on_done=lambda name, result: done.append(name))
+
+    assert results['a']['status'] == 'FAILURE' and results['a']['error'] == 'boom'
+    assert results['b']['status'] == 'SKIPPED' and results['b']['error'] == 'a did not succeed'
+    assert results['c']['status'] == 'SKIPPED' and results['c']['error'] == 'b did not succeed'
+    assert results['other']['status'] == 'SUCCESS'
+    assert sorted(done) == ['a', 'b', 'c', 'other']
+
+
+def test_pipeline_rejects_unknown_dependencies():
+    pipeline = Pipeline()
+    pipeline.add('a', lambda inputs: None, ['missing'])
+    with pytest.raises(ValueError):
+        pipeline.run()
+
+
+def test_provisioner_discovers_without_a_credentials_step(controller, session):
+    # one managed device, one the discovery has to find
+    addresses = [controller.devices[0]['managementIpAddress'], '192.168.100.1']
+    rows = [{'HierarchyParent': 'Global', 'HierarchyArea': 'Area-1', 'HierarchyBldg': 'Building-1',
+             'DeviceList': ', '.join(addresses)}]
+    provisioner = Day0Provisioner(session, rows, workers=4, timeout=10)
+    pipeline = provisioner.build()
+    results = provisioner.run(pipeline)
+
+    assert 'credentials' not in pipeline
+    assert results['discovery Global/Area-1/Building-1']['status'] == 'SUCCESS'
+    assert results['discovery Global/Area-1/Building-1']['result'] == addresses
+
+
+@pytest.fixture
+def fast_discovery_polls(monkeypatch):
+    monkeypatch.setattr(catalyst_center_provisioning, 'DISCOVERY_INITIAL_DELAY', 0.05)
+    monkeypatch.setattr(catalyst_center_provisioning, 'DISCOVERY_MAX_DELAY', 0.1)
+
+
+def collecting_discovery(controller, session, addresses, collection_time):
+    """Start a discovery that completes at once while its devices keep collecting inventory."""
+    discovery_id = start_discovery(session, 'test', addresses, [])
+    discovery = controller.discoveries[discovery_id]
+    discovery['done_at'] = discovery['created']
+    for result in discovery['results']:
+        result['ready_at'] = discovery['created'] + collection_time
+    return discovery_id
+
+
+def test_watch_discovery_waits_for_devices_collecting_after_completion(controller, session, fast_discovery_polls):
+    discovery_id = collecting_discovery(controller, session, ['192.168.100.1'], collection_time=0.5)
+    results = {result['ip']: result for result in
+               watch_discovery(session, discovery_id, ['192.168.100.1', '192.168.100.2'], device_timeout=5)}
+
+    assert results['192.168.100.1']['status'] == 'MANAGED'
+    assert results['192.168.100.2']['status'] == 'FAILURE'
+    assert results['192.168.100.2']['error'] == 'Not found by the discovery'
+
+
+def test_watch_discovery_times_out_devices_collecting_too_long(controller, session, fast_discovery_polls):
+    discovery_id = collecting_discovery(controller, session, ['192.168.100.1'], collection_time=30)
+    results = list(watch_discovery(session, discovery_id, ['192.168.100.1'], device_timeout=0.3))
+
+    assert [result['status'] for result in results] == ['TIMEOUT']
+    assert results[0]['error'].startswith('Still In Progress')
@@ -0,0 +1,83 @@
+"""Tests for the pooled, token-caching controller session."""
+
+import threading
+
+COUNT_PATH = '/dna/intent/api/v1/network-device/count'
+DEVICE_PATH = '/dna/intent/api/v1/network-device'
+
+
+def test_token_is_cached_across_requests(session):
+    for _ in range(5):
+        assert session.get(COUNT_PATH)['response'] == 20
+    assert session.logins == 1
+
+
+def test_concurrent_401s_refresh_the_token_once(controller, session):
+    session.get(COUNT_PATH)
+    controller.tokens.clear()
+
+    barrier = threading.Barrier(8)
+    results = []
+
+    def worker():
+        barrier.wait()
+        results.append(session.get(COUNT_PATH)['response'])
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == [20] * 8
+    assert controller.stats['401'] >= 1
+    assert session.logins == 2
+
+
+def test_429_is_backed_off_and_retried(controller, session):
+    session.get(COUNT_PATH)
+    controller.rate_limit, controller.burst, controller.bucket_tokens = 50.0, 1, 1.0
+
+    assert [session.get(COUNT_PATH)['response'] for _ in range(10)] == [20] * 10
+    assert controller.stats['429'] > 0
+    assert session.backoff.throttled_count > 0
+
+
+def test_unchecked_request_returns_the_error_response(controller, session):
+    controller.tokens.clear()
+    response = session.request('GET', controller.base_url + '/dna/intent/api/v1/network-device/ip-address/1.2.3.4',
+                               check=False)
+
+    # the expired token is still refreshed, only the error status is left to the caller
+    assert response.status_code == 404
+    assert response.json()['response']['errorCode'] == 'Not found'
+
+
+def device_ids(pages):
+    return [device['id'] for page in pages for device in page]
+
+
+def test_iter_pages_yields_every_page_in_order(controller, session):
+    pages = list(session.iter_pages(DEVICE_PATH, page_size=7))
+
+    assert [len(page) for page in pages] == [7, 7, 6]
+    assert device_ids(pages) == [device['id'] for device in controller.devices]
+
+
+def test_iter_pages_stops_on_an_empty_page_without_yielding_it(controller, session):
+    for prefetch in (True, False):
+        pages = list(session.iter_pages(DEVICE_PATH, page_size=5, prefetch=prefetch))
+        assert [len(page) for page in pages] == [5, 5, 5, 5]
+
+
+def test_fetch_pages_yields_in_order(controller, session):
+    pages = list(session.fetch_pages(DEVICE_PATH, 20, page_size=3, workers=4))
+
+    assert device_ids(pages) == [device['id'] for device in controller.devices]
+
+
+def test_fetch_pages_reads_past_a_stale_total(controller, session):
+    # devices added after the count was read are still returned
+    pages = list(session.fetch_pages(DEVICE_PATH, 8, page_size=3, workers=2))
+
+    assert device_ids(pages) == [device['id'] for device in controller.devices]
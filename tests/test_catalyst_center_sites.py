@@ -0,0 +1,67 @@
+"""Tests for the site hierarchy index."""
+
+from catalyst_center_sites import SiteIndex, create_hierarchy, plan_hierarchy
+
+
+def test_find_fetches_sites_missing_from_the_index(controller, session):
+    index = SiteIndex.fetch(session)
+    created = controller.add_site('Floor-3', 'Global/Area-1/Building-1', 'floor')
+
+    assert 'Global/Area-1/Building-1/Floor-3' not in index
+    assert index.find(session, 'Global/Area-1/Building-1/Floor-3') == created['id']
+    assert index.site_id('Global/Area-1/Building-1/Floor-3') == created['id']
+
+
+def test_find_returns_none_for_unknown_sites(session):
+    index = SiteIndex.fetch(session)
+
+    assert index.find(session, 'Global/Area-1/Building-1') == index.site_id('Global/Area-1/Building-1')
+    assert index.find(session, 'Global/Area-9/Building-9') is None
+
+
+def row(area, building='', floor=''):
+    return {'HierarchyParent': 'Global', 'HierarchyArea': area, 'HierarchyBldg': building,
+            'HierarchyFloor': floor, 'HierarchyBldgAddress': '1 Main Street' if building else ''}
+
+
+ROWS = [row('Area-1', 'Building-1', 'Floor-1'), row('West', 'B1', 'F1'), row('West', 'B1', 'F2'),
+        row('Area-1', 'Building-9'), row('Broken', 'B2', 'F1')]
+
+
+def test_plan_lists_each_missing_site_once_by_depth(session):
+    levels = plan_hierarchy(ROWS, SiteIndex.fetch(session))
+
+    assert [[site['path'] for site in level] for level in levels] == [
+        ['Global/West', 'Global/Broken'],
+        ['Global/West/B1', 'Global/Area-1/Building-9', 'Global/Broken/B2'],
+        ['Global/West/B1/F1', 'Global/West/B1/F2', 'Global/Broken/B2/F1']]
+    assert [site['type'] for level in levels for site in level] == \
+        ['area', 'area', 'building', 'building', 'building', 'floor', 'floor', 'floor']
+
+
+def test_create_hierarchy_skips_the_children_of_a_failed_parent(controller, session):
+    create = controller.create_site
+
+    def create_site(request):
+        if (request.json['site'].get('area') or {}).get('name') == 'Broken':
+            return 500, {'message': 'Internal error'}
+        return create(request)
+
+    controller.create_site = create_site
+    index = SiteIndex.fetch(session)
+    results = {result['path']: result for result in create_hierarchy(session, ROWS, index=index)}
+
+    assert {path: result['status'] for path, result in results.items()} == {
+        'Global/West': 'SUCCESS', 'Global/West/B1': 'SUCCESS', 'Global/Area-1/Building-9': 'SUCCESS',
+        'Global/West/B1/F1': 'SUCCESS', 'Global/West/B1/F2': 'SUCCESS',
+        'Global/Broken': 'FAILURE', 'Global/Broken/B2': 'SKIPPED', 'Global/Broken/B2/F1': 'SKIPPED'}
+    assert results['Global/Broken/B2/F1']['error'] == 'Parent Global/Broken/B2 was not created'
+    # created sites land in the index and on the controller, with the right parents
+    for path in ('Global/West/B1/F2', 'Global/Area-1/Building-9'):
+        assert index.site_id(path) == controller.site_by_name[path]['id']
+    assert index.parent(index.site_id('Global/West/B1/F2'))['siteNameHierarchy'] == 'Global/West/B1'
+    assert 'Global/Broken/B2' not in controller.site_by_name
+
+    # nothing left to do on a second run
+    controller.create_site = create
+    assert plan_hierarchy(ROWS[:4], index) == []
@@ -0,0 +1,57 @@
+"""Tests for the shared task poller."""
+
+import threading
+
+import pytest
+
+import catalyst_center_tasks
+from catalyst_center_tasks import TaskPoller, TaskTimeout
+
+
+class FakeSession:
+    """Stands in for CatalystCenterSession; tasks are served by get_task(), patched per test."""
+
+
+def test_poller_resolves_finished_tasks(monkeypatch):
+    monkeypatch.setattr(catalyst_center_tasks, 'get_task',
+                        lambda session, task_id: {'id': task_id, 'endTime': 1, 'isError': False})
+    with TaskPoller(FakeSession(), initial_delay=0.01) as poller:
+        assert poller.wait('t1')['id'] == 't1'
+
+
+def test_close_during_poll_fails_running_tasks(monkeypatch):
+    polling, release = threading.Event(), threading.Event()
+
+    def slow_get_task(session, task_id):
+        polling.set()
+        release.wait(5)
+        return {'id': task_id, 'endTime': None, 'progress': 'running'}
+
+    monkeypatch.setattr(catalyst_center_tasks, 'get_task', slow_get_task)
+    poller = TaskPoller(FakeSession(), initial_delay=0.01)
+    future = poller.submit('t1')
+    assert polling.wait(5)
+    closer = threading.Thread(target=poller.close)
+    closer.start()
+    # close() has emptied the schedule while the entry is out being polled
+    while not poller.closed:
+        pass
+    release.set()
+    closer.join(5)
+    with pytest.raises(TaskTimeout, match='poller closed'):
+        future.result(timeout=5)
+
+
+def test_bad_task_does_not_stop_the_thread(monkeypatch):
+    def get_task(session, task_id):
+        if task_id == 'bad':
+            return None
+        return {'id': task_id, 'endTime': 1}
+
+    monkeypatch.setattr(catalyst_center_tasks, 'get_task', get_task)
+    with TaskPoller(FakeSession(), initial_delay=0.01) as poller:
+        bad = poller.submit('bad')
+        with pytest.raises(Exception):
+            bad.result(timeout=5)
+        assert poller.wait('good')['id'] == 'good'
+        assert poller.thread.is_alive()
@@ -0,0 +1,134 @@
+"""Tests for the template index, template sync and the deployment scheduler."""
+
+import pytest
+
+from catalyst_center_templates import DeploymentScheduler, TemplateIndex, sync_template
+
+PROJECT = 'Tests'
+CONTENT = {'ntp': 'ntp server 10.0.0.1', 'logging': 'logging host 10.0.0.2'}
+DEPLOY_REQUESTS = 'POST /dna/intent/api/v2/template-programmer/template/deploy'
+
+
+def template_payload(name, content):
+    return {'name': name, 'templateContent': content, 'language': 'VELOCITY', 'templateParams': [],
+            'deviceTypes': [{'productFamily': 'Switches and Hubs'}], 'softwareType': 'IOS-XE'}
+
+
+@pytest.fixture
+def templates(session):
+    """Committed templates on the mock controller, name -> id."""
+    index = TemplateIndex(session)
+    project_id = index.ensure_project(PROJECT)
+    return {name: sync_template(session, project_id, template_payload(name, content))['id']
+            for name, content in CONTENT.items()}
+
+
+def addresses(controller, count):
+    return [device['managementIpAddress'] for device in controller.devices[:count]]
+
+
+def running_config(controller, address):
+    device = next(device for device in controller.devices if device['managementIpAddress'] == address)
+    return controller.running_config(device)
+
+
+def test_scheduler_runs_each_device_chain_in_order(controller, session, templates):
+    devices = addresses(controller, 3)
+    jobs = [{'device': device, 'template_id': templates[name]} for device in devices for name in ('ntp', 'logging')]
+    completed = []
+    results = DeploymentScheduler(session, max_in_flight=4, on_complete=completed.append).run(jobs)
+
+    assert [result['status'] for result in results] == ['SUCCESS'] * 6
+    assert [(result['device'], result['template_id']) for result in results] == \
+        [(job['device'], job['template_id']) for job in jobs]
+    assert len(completed) == 6 and controller.stats[DEPLOY_REQUESTS] == 6
+    for device in devices:
+        config = running_config(controller, device)
+        assert config.index(CONTENT['ntp']) < config.index(CONTENT['logging'])
+
+
+def test_scheduler_reports_a_failed_device_without_stopping_the_others(controller, session, templates):
+    jobs = [{'device': device, 'template_id': templates['ntp']} for device in addresses(controller, 2)]
+    jobs.append({'device': '192.168.100.1', 'template_id': templates['ntp']})
+    results = DeploymentScheduler(session).run(jobs)
+
+    assert [result['status'] for result in results] == ['SUCCESS', 'SUCCESS', 'FAILURE']
+
+
+def test_grouped_scheduler_sends_one_request_per_template_and_level(controller, session, templates):
+    first, second = addresses(controller, 2)
+    jobs = [{'device': first, 'template_id': templates['ntp']},
+            {'device': first, 'template_id': templates['logging']},
+            {'device': second, 'template_id': templates['ntp']},
+            {'device': second, 'template_id': templates['logging']},
+            {'device': '192.168.100.1', 'template_id': templates['ntp']}]
+    submitted = []
+    results = DeploymentScheduler(session, grouped=True, on_submit=lambda group, task_id: submitted.append(
+        [job['device'] for job in group])).run(jobs)
+
+    # level 0: ntp to all three targets, level 1: logging to the two devices
+    assert submitted == [[first, second, '192.168.100.1'], [first, second]]
+    assert controller.stats[DEPLOY_REQUESTS] == 2
+    # the per-device statuses are fanned back out to the jobs
+    assert [result['status'] for result in results] == ['SUCCESS'] * 4 + ['FAILURE']
+    assert results[4]['error'] == 'Device not found'
+    config = running_config(controller, first)
+    assert config.index(CONTENT['ntp']) < config.index(CONTENT['logging'])
+
+
+def test_grouped_scheduler_keeps_each_device_sequence(controller, session, templates):
+    first, second = addresses(controller, 2)
+    jobs = [{'device': first, 'template_id': templates['ntp']},
+            {'device': first, 'template_id': templates['logging']},
+            {'device': second, 'template_id': templates['logging']}]
+    results = DeploymentScheduler(session, grouped=True).run(jobs)
+
+    # logging is at a different position for the two devices: no merge across levels
+    assert controller.stats[DEPLOY_REQUESTS] == 3
+    assert [result['status'] for result in results] == ['SUCCESS'] * 3
+    config = running_config(controller, first)
+    assert config.index(CONTENT['ntp']) < config.index(CONTENT['logging'])
+
+
+def test_template_index_reads_the_projects_once(controller, session, templates, tmp_path):
+    cache_path = str(tmp_path / 'template_index.json')
+    controller.stats.clear()
+    index = TemplateIndex(session, cache_path)
+
+    assert index.templates(PROJECT) == templates
+    assert index.template_id(PROJECT, 'ntp') == templates['ntp']
+    assert index.template_id(PROJECT, 'missing') is None and index.project_id('missing') is None
+    assert controller.stats['GET /dna/intent/api/v1/template-programmer/project'] == 1
+
+    # a later run reuses the cache without listing the projects
+    cached = TemplateIndex(session, cache_path)
+    assert cached.projects == index.projects
+    assert controller.stats['GET /dna/intent/api/v1/template-programmer/project'] == 1
+
+
+def test_template_index_tracks_its_own_changes(session, templates, tmp_path):
+    cache_path = str(tmp_path / 'template_index.json')
+    index = TemplateIndex(session, cache_path)
+    project_id = index.ensure_project('Other')
+    assert index.ensure_project('Other') == project_id
+
+    result = sync_template(session, project_id, template_payload('ntp', CONTENT['ntp']))
+    index.add_template('Other', 'ntp', result['id'])
+    index.delete_template(PROJECT, 'logging')
+
+    assert TemplateIndex(session, cache_path).projects == index.projects
+    fresh = TemplateIndex(session)
+    assert fresh.templates('Other') == {'ntp': result['id']}
+    assert fresh.templates(PROJECT) == {'ntp': templates['ntp']}
+
+
+def test_sync_template_recreates_a_stale_template_id(session, templates):
+    index = TemplateIndex(session)
+    project_id = index.project_id(PROJECT)
+    index.delete_template(PROJECT, 'ntp')
+
+    result = sync_template(session, project_id, template_payload('ntp', CONTENT['ntp']), templates['ntp'])
+    assert result['action'] == 'created' and result['id'] != templates['ntp']
+
+    again = sync_template(session, project_id, template_payload('ntp', CONTENT['ntp']), result['id'])
+    assert again == dict(result, action='unchanged', committed=False)
@@ -0,0 +1,53 @@
+"""Tests for the deployment journal and resuming from it."""
+
+from deployment_journal import DeploymentJournal
+
+
+def job(device, digest='v1'):
+    return {'index': 0, 'device': device, 'template_id': 't1', 'digest': digest}
+
+
+def test_resume_skips_finished_and_reattaches_in_flight(tmp_path):
+    path = str(tmp_path / 'journal.jsonl')
+    with DeploymentJournal(path) as journal:
+        journal.start()
+        journal.submitted([job('10.0.0.1'), job('10.0.0.2')], 'task-1')
+        journal.completed(dict(job('10.0.0.1'), status='SUCCESS'))
+
+    with DeploymentJournal(path) as journal:
+        pending, done = journal.resume([job('10.0.0.1'), job('10.0.0.2'), job('10.0.0.3')])
+
+    assert [j['device'] for j in done] == ['10.0.0.1']
+    assert [(j['device'], j.get('task_id')) for j in pending] == [('10.0.0.2', 'task-1'), ('10.0.0.3', None)]
+
+
+def test_resume_redeploys_an_edited_template(tmp_path):
+    path = str(tmp_path / 'journal.jsonl')
+    with DeploymentJournal(path) as journal:
+        journal.start()
+        journal.submitted([job('10.0.0.1'), job('10.0.0.2')], 'task-1')
+        journal.completed(dict(job('10.0.0.1'), status='SUCCESS'))
+
+    with DeploymentJournal(path) as journal:
+        pending, done = journal.resume([job('10.0.0.1', 'v2'), job('10.0.0.2', 'v2')])
+
+    # neither the finished deployment nor the in-flight task of the old version counts for the new one
+    assert done == []
+    assert [(j['device'], j.get('task_id')) for j in pending] == [('10.0.0.1', None), ('10.0.0.2', None)]
+
+
+def test_resume_ignores_earlier_runs_and_torn_lines(tmp_path):
+    path = str(tmp_path / 'journal.jsonl')
+    with DeploymentJournal(path) as journal:
+        journal.start()
+        journal.completed(dict(job('10.0.0.1'), status='SUCCESS'))
+        journal.start()
+        journal.completed(dict(job('10.0.0.2'), status='SUCCESS'))
+    with open(path, 'a') as f:
+        f.write('{"event": "compl')
+
+    with DeploymentJournal(path) as journal:
+        pending, done = journal.resume([job('10.0.0.1'), job('10.0.0.2')])
+
+    assert [j['device'] for j in done] == ['10.0.0.2']
+    assert [j['device'] for j in pending] == ['10.0.0.1']
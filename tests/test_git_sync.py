@@ -0,0 +1,101 @@
+"""Tests for git_sync against a bare repository on disk."""
+
+import os
+import subprocess
+
+import pytest
+
+from git_sync import EXPORTED_REF, GitSync, GitSyncError
+
+PREFIX = 'templates/git_pull'
+
+
+def git(cwd, *args):
+    env = dict(os.environ, GIT_AUTHOR_NAME='Test', GIT_AUTHOR_EMAIL='test@localhost',
+               GIT_COMMITTER_NAME='Test', GIT_COMMITTER_EMAIL='test@localhost')
+    return subprocess.run(['git', '-C', str(cwd), *args], check=True, capture_output=True, text=True,
+                          env=env).stdout.strip()
+
+
+@pytest.fixture
+def remote(tmp_path):
+    """A bare repository with one template, and a second clone to make upstream edits from."""
+    bare = tmp_path / 'templates.git'
+    subprocess.run(['git', 'init', '--quiet', '--bare', '--initial-branch=main', str(bare)], check=True)
+    upstream = tmp_path / 'upstream'
+    subprocess.run(['git', 'clone', '--quiet', str(bare), str(upstream)], check=True, capture_output=True)
+    git(upstream, 'checkout', '--quiet', '-B', 'main')
+    (upstream / PREFIX).mkdir(parents=True)
+    (upstream / PREFIX / 'a.j2').write_text('hostname a\n')
+    git(upstream, 'add', '-A')
+    git(upstream, 'commit', '--quiet', '-m', 'initial')
+    git(upstream, 'push', '--quiet', 'origin', 'main')
+    return bare, upstream
+
+
+def upstream_edit(upstream, name, content):
+    git(upstream, 'pull', '--quiet', 'origin', 'main')
+    (upstream / PREFIX / name).write_text(content)
+    git(upstream, 'add', '-A')
+    git(upstream, 'commit', '--quiet', '-m', f'edit {name}')
+    git(upstream, 'push', '--quiet', 'origin', 'main')
+
+
+def test_pull_exports_everything_then_nothing(remote, tmp_path):
+    sync = GitSync(str(remote[0]), str(tmp_path / 'clone'))
+    target = tmp_path / 'export'
+    assert sync.export(PREFIX, str(target), sync.pull(PREFIX)) == ['a.j2']
+    assert (target / 'a.j2').read_text() == 'hostname a\n'
+    changes = sync.pull(PREFIX)
+    assert (changes['changed'], changes['removed']) == ([], [])
+
+
+def test_upstream_edit_after_push_is_exported(remote, tmp_path):
+    bare, upstream = remote
+    sync = GitSync(str(bare), str(tmp_path / 'clone'))
+    target = tmp_path / 'export'
+    sync.export(PREFIX, str(target), sync.pull(PREFIX))
+
+    # push from the clone, then someone edits a template upstream
+    assert sync.push({'templates/git_push/inventory.json': b'{}'}, 'inventory')
+    upstream_edit(upstream, 'a.j2', 'hostname a2\n')
+
+    changes = sync.pull(PREFIX)
+    assert changes['changed'] == [f'{PREFIX}/a.j2']
+    sync.export(PREFIX, str(target), changes)
+    assert (target / 'a.j2').read_text() == 'hostname a2\n'
+    assert sync.rev_parse(EXPORTED_REF) == git(bare, 'rev-parse', 'main')
+
+
+def test_push_then_pull_reports_upstream_changes_made_before_the_push(remote, tmp_path):
+    bare, upstream = remote
+    sync = GitSync(str(bare), str(tmp_path / 'clone'))
+    target = tmp_path / 'export'
+    sync.export(PREFIX, str(target), sync.pull(PREFIX))
+
+    # the push fast-forwards over the upstream edit; the export still has to pick it up
+    upstream_edit(upstream, 'b.j2', 'hostname b\n')
+    sync.push({'templates/git_push/inventory.json': b'{}'}, 'inventory')
+    changes = sync.pull(PREFIX)
+    assert changes['changed'] == [f'{PREFIX}/b.j2']
+    sync.export(PREFIX, str(target), changes)
+    assert (target / 'b.j2').read_text() == 'hostname b\n'
+
+
+def test_rejected_push_leaves_the_clone_in_sync(remote, tmp_path):
+    bare, upstream = remote
+    sync = GitSync(str(bare), str(tmp_path / 'clone'))
+    sync.pull(PREFIX)
+
+    hook = bare / 'hooks' / 'pre-receive'
+    hook.write_text('#!/bin/sh\nexit 1\n')
+    hook.chmod(0o755)
+    with pytest.raises(GitSyncError):
+        sync.push({'templates/git_push/inventory.json': b'{}'}, 'inventory')
+    assert sync.rev_parse('HEAD') == git(bare, 'rev-parse', 'main')
+    hook.unlink()
+
+    # later syncs still fast-forward
+    upstream_edit(upstream, 'a.j2', 'hostname a3\n')
+    assert f'{PREFIX}/a.j2' in sync.pull(PREFIX)['changed']
+    assert sync.push({'templates/git_push/inventory.json': b'{}'}, 'inventory')
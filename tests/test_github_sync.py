@@ -0,0 +1,124 @@
+"""Tests for github_sync against the local GitHub stand-in (scripts/mock_github.py)."""
+
+import pytest
+
+from github_sync import GitHubRepo, git_blob_sha
+from mock_github import MockGitHub
+
+FILES = {'templates/a.txt': b'hostname a\n', 'templates/b.txt': b'hostname b\n'}
+
+
+@pytest.fixture
+def github():
+    with MockGitHub(files=FILES) as github:
+        yield github
+
+
+@pytest.fixture
+def repo(github):
+    repo = GitHubRepo(github.repository, 'token', api_url=github.base_url)
+    yield repo
+    repo.close()
+
+
+def test_git_blob_sha_matches_git():
+    # git hash-object of 'hello\n'
+    assert git_blob_sha(b'hello\n') == 'ce013625030ba8dba906f756967f9e9ca394464a'
+
+
+def test_push_unchanged_files_makes_no_commit(github, repo):
+    assert repo.push_files(dict(FILES), 'no-op') is None
+    assert github.commit_count() == 1
+    assert github.stats['POST /git/commits'] == 0
+
+
+def test_push_changed_files_in_one_commit(github, repo):
+    files = dict(FILES, **{'templates/b.txt': b'hostname b2\n', 'templates/c.txt': b'hostname c\n'})
+    sha = repo.push_files(files, 'update', delete=['templates/a.txt', 'templates/missing.txt'])
+    assert sha == github.refs['main']
+    assert github.commit_count() == 2
+    assert github.files() == {'templates/b.txt': b'hostname b2\n', 'templates/c.txt': b'hostname c\n'}
+
+
+def test_push_binary_file_as_blob(github, repo):
+    content = bytes(range(256))
+    repo.push_files({'archive/config.bin': content}, 'binary')
+    assert github.files()['archive/config.bin'] == content
+    assert github.stats['POST /git/blobs'] == 1
+    # pushing the same bytes again is recognised as unchanged
+    assert repo.push_files({'archive/config.bin': content}, 'binary again') is None
+
+
+def test_push_retries_when_branch_moves(github, repo):
+    update_ref = github.update_ref
+    calls = []
+
+    def racing_update_ref(request, branch):
+        if not calls:
+            # someone else pushes between our head read and our ref update
+            tree = github.store_tree(dict(github.trees[github.commits[github.refs[branch]]['tree']],
+                                          **{'templates/other.txt': github.store_blob(b'other\n')}))
+            github.refs[branch] = github.store_commit('concurrent', tree, [github.refs[branch]])
+        calls.append(branch)
+        return update_ref(request, branch)
+
+    github.update_ref = racing_update_ref
+    repo.push_files(dict(FILES, **{'templates/a.txt': b'hostname a2\n'}), 'update')
+    assert len(calls) == 2
+    files = github.files()
+    assert files['templates/a.txt'] == b'hostname a2\n'
+    assert files['templates/other.txt'] == b'other\n'
+    assert github.commit_count() == 3
+
+
+def test_push_to_empty_repository():
+    with MockGitHub(empty=True) as github:
+        repo = GitHubRepo(github.repository, 'token', api_url=github.base_url)
+        sha = repo.push_files({'templates/a.txt': b'a\n', 'templates/b.bin': b'\xff\x00'}, 'first')
+        assert sha == github.refs['main']
+        assert github.files() == {'templates/a.txt': b'a\n', 'templates/b.bin': b'\xff\x00'}
+        assert github.commit_count() == 2
+
+
+def test_push_single_file_to_empty_repository():
+    with MockGitHub(empty=True) as github:
+        repo = GitHubRepo(github.repository, 'token', api_url=github.base_url)
+        assert repo.push_files({'a.txt': b'a\n'}, 'first') == github.refs['main']
+        assert github.commit_count() == 1
+
+
+def test_push_creates_missing_branch(github):
+    repo = GitHubRepo(github.repository, 'token', api_url=github.base_url, branch='reports')
+    sha = repo.push_files({'report.json': b'{}'}, 'first report')
+    assert github.refs['reports'] == sha
+    assert github.files('reports') == {'report.json': b'{}'}
+
+
+def test_pull_downloads_only_changed_files(github, repo, tmp_path):
+    target, manifest = tmp_path / 'pull', str(tmp_path / 'manifest.json')
+    first = repo.pull_files('templates', str(target), manifest)
+    assert sorted(first['downloaded']) == ['a.txt', 'b.txt']
+    assert (target / 'a.txt').read_bytes() == b'hostname a\n'
+
+    repo.push_files({'templates/b.txt': b'hostname b2\n'}, 'edit b', delete=['templates/a.txt'])
+    blobs = github.stats['GET /git/blobs/{}']
+    second = repo.pull_files('templates', str(target), manifest)
+    assert second == {'downloaded': ['b.txt'], 'removed': ['a.txt'], 'unchanged': []}
+    assert github.stats['GET /git/blobs/{}'] == blobs + 1
+    assert not (target / 'a.txt').exists()
+    assert (target / 'b.txt').read_bytes() == b'hostname b2\n'
+
+
+def test_pull_keeps_files_when_listing_is_truncated(github, repo, tmp_path):
+    target, manifest = tmp_path / 'pull', str(tmp_path / 'manifest.json')
+    repo.pull_files('templates', str(target), manifest)
+
+    github.tree_limit = 1
+    result = repo.pull_files('templates', str(target), manifest)
+    assert result['removed'] == []
+    assert (target / 'a.txt').exists() and (target / 'b.txt').exists()
+
+    # once the listing is complete again nothing is downloaded twice or lost
+    github.tree_limit = None
+    result = repo.pull_files('templates', str(target), manifest)
+    assert result == {'downloaded': [], 'removed': [], 'unchanged': ['a.txt', 'b.txt']}
@@ -0,0 +1,57 @@
+"""Tests for the SQLite inventory store."""
+
+from collections import Counter
+
+import pytest
+
+from catalyst_center_inventory import collect_inventory
+from inventory_store import count_by, parse_filters, select, write_inventory
+
+
+@pytest.fixture
+def store(tmp_path, session):
+    """An inventory database filled from the mock controller, with the records it was written from."""
+    path = str(tmp_path / 'inventory.db')
+    device_inventory, ap_inventory = collect_inventory(session, workers=4)
+    assert write_inventory(path, device_inventory, ap_inventory) == len(device_inventory) + len(ap_inventory)
+    return path, device_inventory + ap_inventory
+
+
+def test_count_by_groups_like_the_records(store):
+    path, records = store
+    expected = Counter((record['version'], record['site']) for record in records)
+
+    rows = count_by(path, ['version', 'site'])
+
+    assert {(row['version'], row['site']): row['devices'] for row in rows} == expected
+    assert [row['devices'] for row in rows] == sorted(expected.values(), reverse=True)
+
+
+def test_count_by_and_select_filter(store):
+    path, records = store
+    version = records[0]['version']
+    matching = sorted(record['hostname'] for record in records if record['version'] == version)
+
+    assert count_by(path, ['version'], {'version': version}) == [{'version': version, 'devices': len(matching)}]
+    assert [row['hostname'] for row in select(path, {'version': version}, ['hostname'])] == matching
+
+
+def test_write_replaces_the_previous_run(store):
+    path, records = store
+    write_inventory(path, records[:3], [])
+
+    assert sum(row['devices'] for row in count_by(path, ['kind'])) == 3
+
+
+def test_unknown_columns_are_rejected(store):
+    path, _ = store
+    with pytest.raises(ValueError):
+        count_by(path, ['version; DROP TABLE devices'])
+    with pytest.raises(ValueError):
+        select(path, {'nope': 'x'})
+
+
+def test_parse_filters():
+    assert parse_filters(['version=17.9.4a', 'role=ACCESS']) == {'version': '17.9.4a', 'role': 'ACCESS'}
+    with pytest.raises(ValueError):
+        parse_filters(['version'])
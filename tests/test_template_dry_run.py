@@ -0,0 +1,55 @@
+"""Tests for the local render-and-diff stage of template deployments."""
+
+from template_dry_run import dry_run, effective_diff, render_template
+
+RUNNING_CONFIG = '\n'.join([
+    'hostname edge-1', '!',
+    'interface Loopback0', ' ip address 10.0.0.1 255.255.255.255', '!',
+    'line vty 0 4', ' transport input ssh', '!', 'end'])
+
+
+def test_lines_already_configured_are_not_effective():
+    assert effective_diff('hostname edge-1\nline vty 0 4\n transport input ssh\n', RUNNING_CONFIG) == []
+
+
+def test_lines_are_compared_under_their_parents():
+    rendered = 'interface Loopback0\n description mgmt\nline vty 0 4\n  transport input   ssh\n'
+
+    assert effective_diff(rendered, RUNNING_CONFIG) == ['interface Loopback0 > description mgmt']
+
+
+def test_no_line_counts_only_when_it_negates_a_present_line():
+    rendered = 'line vty 0 4\n no transport input ssh\n no exec-timeout 5 0\nno ip domain lookup\n'
+
+    assert effective_diff(rendered, RUNNING_CONFIG) == ['line vty 0 4 > no transport input ssh']
+
+
+def test_render_needs_a_known_language():
+    assert render_template('hostname {{ name }}', 'JINJA', {'name': 'edge-1'}) == 'hostname edge-1'
+    assert render_template('hostname edge-1', 'VELOCITY', {}) == 'hostname edge-1'
+    # unmarked content would pass for Velocity, but the language is not guessed
+    assert render_template('hostname edge-1', None, {}) is None
+    assert render_template('hostname edge-1', 'PYTHON', {}) is None
+    assert render_template('hostname {{ missing }}', 'JINJA', {}) is None
+
+
+def test_dry_run_skips_only_known_templates_with_an_empty_diff(controller, session):
+    device = controller.devices[0]
+    address = device['managementIpAddress']
+    hostname = f"hostname {device['hostname'].split('.')[0]}"
+    templates = {'same': {'templateContent': hostname, 'language': 'VELOCITY'},
+                 'jinja': {'templateContent': 'hostname {{ __device.hostname.split(".")[0] }}', 'language': 'JINJA'},
+                 'unknown': {'templateContent': hostname},
+                 'change': {'templateContent': 'ip domain lookup', 'language': 'VELOCITY'}}
+    jobs = [{'device': address, 'template_id': template_id} for template_id in templates]
+    jobs.append({'device': '192.168.100.1', 'template_id': 'same'})
+
+    results = {(result['device'], result['template_id']): result for result in dry_run(session, jobs, templates)}
+
+    assert results[address, 'same']['skip'] and results[address, 'same']['diff'] == []
+    assert results[address, 'jinja']['skip']
+    assert results[address, 'unknown']['diff'] is None and not results[address, 'unknown']['skip']
+    assert results[address, 'change']['diff'] == ['ip domain lookup'] and not results[address, 'change']['skip']
+    assert results['192.168.100.1', 'same']['diff'] is None and not results['192.168.100.1', 'same']['skip']
+    # one running config fetch per device, however many templates target it
+    assert controller.stats['GET /dna/intent/api/v1/network-device/{}/config'] == 1